@@ -1,16 +1,15 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
-from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from dotenv import load_dotenv
 import os
+from .models import db
 
 # Load environment variables
 load_dotenv()
 
 # Initialize Flask extensions
-db = SQLAlchemy()
 migrate = Migrate()
 login_manager = LoginManager()
 
@@ -23,12 +22,35 @@ def create_app():
     app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///agendify.db')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
+    # Engine profile (DATABASE_PROFILE) and optional read replica bind
+    from .services import database
+    database.configure(app)
+    
+    # Request, SQL and Google API timings at /metrics (registered first so the
+    # timer wraps every other hook)
+    from .services import metrics
+    metrics.init_app(app)
+    
+    # Opt-in slow query / N+1 profiler
+    from .services import query_profiler
+    query_profiler.init_app(app)
+    
+    # Fast JSON serialization (orjson when installed) and response compression
+    from .services import compression, json_provider
+    json_provider.init_app(app)
+    compression.init_app(app)
+    
     # Initialize extensions
     db.init_app(app)
+    database.init_app(app, db)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     login_manager.login_view = 'auth.login'
     
+    # Sessions resolve from signed claims and a per-process user cache
+    from .services import session_auth
+    session_auth.init_app(app, login_manager)
+    
     # CORS configuration
     CORS(app, origins=[os.getenv('FRONTEND_URL', 'http://localhost:3000')])
     
@@ -37,16 +59,37 @@ def create_app():
     from .routes.calendar import calendar_bp
     from .routes.tasks import tasks_bp
     from .routes.notifications import notifications_bp
+    from .routes.agenda import agenda_bp
+    from .routes.email import email_bp
     
     app.register_blueprint(auth_bp, url_prefix='/auth')
     app.register_blueprint(calendar_bp, url_prefix='/api/calendar')
     app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
     app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
+    app.register_blueprint(agenda_bp, url_prefix='/api/agenda')
+    app.register_blueprint(email_bp, url_prefix='/api/email')
+    
+    # Daily digest command and scheduler
+    from .services import digest
+    digest.init_app(app)
+    
+    # Incremental Gmail scanning (flask scan-email)
+    from .services import gmail_scan
+    gmail_scan.init_app(app)
+    
+    # Background OAuth token refresher
+    from .services import token_manager
+    token_manager.init_app(app)
+    
+    # Minute-accurate reminders for every user
+    from .services import reminder_scheduler
+    reminder_scheduler.init_app(app)
     
     # Health check endpoint
     @app.route('/health')
     def health_check():
-        return jsonify({'status': 'healthy', 'service': 'Agendify Backend'})
+        from .services.cache import get_cache
+        return jsonify({'status': 'healthy', 'service': 'Agendify Backend', 'cache': get_cache().stats()})
     
     return app
 
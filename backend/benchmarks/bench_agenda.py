@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark dashboard polling: two list endpoints vs /api/agenda with ETags
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_agenda --tasks 200 --events 30 --polls 500
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from .bench_calendar_fanout import FakeCalendarService
+from .common import create_bench_app, create_user, login_client
+from ..services.event_cache import event_store
+
+def seed_tasks(app, db, user_id, count, day_start):
+    from ..models import Task
+    with app.app_context():
+        db.session.add_all([
+            Task(user_id=user_id, title=f'Task {i}', due_at=day_start + timedelta(minutes=(i * 37) % 1440))
+            for i in range(count)
+        ])
+        db.session.commit()
+
+def measure(name, polls, poll):
+    start = time.perf_counter()
+    transferred = 0
+    for _ in range(polls):
+        transferred += poll()
+    elapsed = time.perf_counter() - start
+    print(f"{name:32s} {elapsed / polls * 1000:7.2f}ms/poll  {transferred / polls / 1024:7.1f} KiB/poll")
+
+def main():
+    parser = argparse.ArgumentParser(description='Dashboard poll cost')
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--events', type=int, default=30)
+    parser.add_argument('--polls', type=int, default=500)
+    args = parser.parse_args()
+
+    app, db = create_bench_app()
+    user_id = create_user(app, db)
+    day_start = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    seed_tasks(app, db, user_id, args.tasks, day_start)
+    service = FakeCalendarService({'primary': 0}, 1, args.events, day_start + timedelta(hours=8))
+    event_store.service_factory = lambda user: service
+    client = login_client(app, user_id)
+
+    print(f"📊 {args.tasks} tasks + {args.events} events today, {args.polls} polls")
+    print("=" * 72)
+
+    def two_requests():
+        size = 0
+        for url in ('/api/calendar/events/today', '/api/tasks/today'):
+            response = client.get(url)
+            assert response.status_code == 200
+            size += len(response.data)
+        return size
+
+    def agenda_full():
+        response = client.get('/api/agenda')
+        assert response.status_code == 200
+        return len(response.data)
+
+    etag = client.get('/api/agenda').headers['ETag']
+
+    def agenda_unchanged():
+        response = client.get('/api/agenda', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        return len(response.data)
+
+    measure('events/today + tasks/today', args.polls, two_requests)
+    measure('/api/agenda (200)', args.polls, agenda_full)
+    measure('/api/agenda (304)', args.polls, agenda_unchanged)
+
+if __name__ == '__main__':
+    main()
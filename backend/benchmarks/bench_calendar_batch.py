@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Count Calendar API round-trips: one call per page vs batched requests
+
+Runs a local mock of the Calendar API (including the multipart batch endpoint)
+and points a real googleapiclient service at it, so the numbers are actual
+HTTP round-trips made by the client library.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_calendar_batch --calendars 10 --pages 3
+"""
+
+import argparse
+import copy
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, unquote, urlparse
+
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+
+from .common import create_bench_app
+from ..services.calendar_aggregate import CalendarAggregator
+from ..services.event_cache import EventStore
+from ..services.google_client import get_discovery_document
+
+class MockCalendarAPI(ThreadingHTTPServer):
+    """events.list with paging, sync tokens, a missing calendar and a batch endpoint"""
+
+    daemon_threads = True
+
+    def __init__(self, pages, per_page, latency):
+        super().__init__(('127.0.0.1', 0), MockCalendarHandler)
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.round_trips = 0
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.now = datetime.utcnow()
+
+    def count(self, calls):
+        with self.lock:
+            self.round_trips += 1
+            self.calls += calls
+
+    def events_list(self, path, query):
+        """Return (status, body) for GET /calendar/v3/calendars/{id}/events"""
+        calendar_id = unquote(path.split('/')[4])
+        if calendar_id.startswith('missing'):
+            return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+        if query.get('syncToken') == ['expired']:
+            return 410, {'error': {'code': 410, 'message': 'Sync token is no longer valid'}}
+
+        page = int(query.get('pageToken', ['0'])[0])
+        items = []
+        if 'syncToken' not in query:
+            for i in range(self.per_page):
+                start = self.now + timedelta(minutes=(page * self.per_page + i) * 7 % 1440)
+                items.append({
+                    'id': f'{calendar_id}-{page}-{i}',
+                    'summary': f'Event {i}',
+                    'start': {'dateTime': start.isoformat() + 'Z'},
+                    'end': {'dateTime': (start + timedelta(minutes=30)).isoformat() + 'Z'}
+                })
+        body = {'items': items}
+        if 'syncToken' not in query and page + 1 < self.pages:
+            body['nextPageToken'] = str(page + 1)
+        else:
+            body['nextSyncToken'] = 'sync-1'
+        return 200, body
+
+    @property
+    def root_url(self):
+        return f'http://127.0.0.1:{self.server_port}/'
+
+class MockCalendarHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.count(1)
+        time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        status, body = self.server.events_list(url.path, parse_qs(url.query))
+        self._reply(status, 'application/json', json.dumps(body).encode())
+
+    def do_POST(self):
+        content = self.rfile.read(int(self.headers['Content-Length']))
+        message = BytesParser().parsebytes(
+            b'Content-Type: ' + self.headers['Content-Type'].encode() + b'\r\n\r\n' + content
+        )
+        parts = message.get_payload()
+        self.server.count(len(parts))
+        time.sleep(self.server.latency)
+
+        boundary = 'batch_mock_boundary'
+        chunks = []
+        for part in parts:
+            request_line = part.get_payload().split('\n', 1)[0].strip()
+            url = urlparse(request_line.split(' ')[1])
+            status, body = self.server.events_list(url.path, parse_qs(url.query))
+            content_id = part['Content-ID'][1:-1]
+            chunks.append(
+                f'--{boundary}\r\nContent-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id}>\r\n\r\n'
+                f'HTTP/1.1 {status} {"OK" if status == 200 else "Error"}\r\n'
+                f'Content-Type: application/json\r\n\r\n{json.dumps(body)}\r\n'
+            )
+        chunks.append(f'--{boundary}--\r\n')
+        self._reply(200, f'multipart/mixed; boundary={boundary}', ''.join(chunks).encode())
+
+    def _reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def mock_service_factory(api):
+    """Real Calendar client whose discovery document points at the mock server"""
+    document = copy.deepcopy(get_discovery_document('calendar', 'v3'))
+    document['rootUrl'] = api.root_url
+    credentials = Credentials(token='mock-token')
+
+    def factory(user):
+        return build_from_document(document, http=AuthorizedHttp(credentials, http=httplib2.Http()))
+    return factory
+
+def measure(api, name, fn):
+    round_trips, calls = api.round_trips, api.calls
+    start = time.perf_counter()
+    errors = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:36s} {api.round_trips - round_trips:5d} round-trips  {api.calls - calls:5d} calls  "
+          f"{elapsed * 1000:7.0f}ms  errors: {sorted(errors) if errors else '-'}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Calendar API round-trips with and without batching')
+    parser.add_argument('--calendars', type=int, default=10)
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--per-page', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.03, help='Mock server latency per round-trip')
+    args = parser.parse_args()
+
+    api = MockCalendarAPI(args.pages, args.per_page, args.latency)
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    factory = mock_service_factory(api)
+
+    app, db = create_bench_app()
+    user = SimpleNamespace(id=1, access_token='mock-token', refresh_token=None, token_expiry=None)
+    calendar_ids = [f'cal-{i}@example.com' for i in range(args.calendars)] + ['missing@example.com']
+    now = datetime.utcnow()
+    window = (now, now + timedelta(hours=12))
+
+    print(f"📊 {len(calendar_ids)} calendars (one missing) × {args.pages} pages, "
+          f"{args.latency * 1000:.0f}ms per round-trip")
+    print("=" * 100)
+
+    def one_by_one(store):
+        errors = {}
+        for calendar_id in calendar_ids:
+            try:
+                store.get_events(user, calendar_id, *window)
+            except Exception as e:
+                errors[calendar_id] = e
+        return errors
+
+    with app.app_context():
+        sequential = EventStore(service_factory=factory, ttl=60)
+        measure(api, 'full sync, one call per page', lambda: one_by_one(sequential))
+
+        fanout = CalendarAggregator(store=EventStore(service_factory=factory, ttl=60), service_factory=factory,
+                                    workers=len(calendar_ids), batch=False)
+        measure(api, 'full sync, thread fan-out', lambda: fanout.get_events(user, calendar_ids, *window)[1])
+
+        batched_store = EventStore(service_factory=factory, ttl=60)
+        batched = CalendarAggregator(store=batched_store, service_factory=factory, batch=True)
+        measure(api, 'full sync, batched', lambda: batched.get_events(user, calendar_ids, *window)[1])
+
+        # Every synced calendar is stale again, one has an expired sync token;
+        # both runs also retry the missing calendar
+        batched_store.ttl = sequential.ttl = 0
+        sequential.full_sync_interval = batched_store.full_sync_interval = 3600
+        sequential._state(user.id, 'cal-0@example.com').sync_token = 'expired'
+        batched_store._state(user.id, 'cal-0@example.com').sync_token = 'expired'
+        measure(api, 'incremental, one call per calendar', lambda: one_by_one(sequential))
+        measure(api, 'incremental, batched', lambda: batched_store.sync_many(user, calendar_ids))
+
+if __name__ == '__main__':
+    main()
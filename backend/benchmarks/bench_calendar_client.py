@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request cost of building a Google Calendar client
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_calendar_client
+"""
+
+import time
+import tracemalloc
+from types import SimpleNamespace
+from datetime import datetime, timedelta
+
+from googleapiclient.discovery import build
+
+from ..services.google_client import build_credentials, get_calendar_service
+
+ITERATIONS = 200
+
+def fake_user():
+    """Create a user-like object with a valid (non-expiring) token"""
+    return SimpleNamespace(
+        id=1,
+        access_token='bench-token',
+        refresh_token='bench-refresh',
+        token_expiry=datetime.utcnow() + timedelta(hours=1)
+    )
+
+def measure(label, factory):
+    """Time and trace allocations for a client factory"""
+    factory()  # Warm up caches
+    
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        factory()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    per_call_ms = elapsed / ITERATIONS * 1000
+    print(f"{label:<32} {per_call_ms:8.3f} ms/request   peak {peak / 1024:8.1f} KiB")
+    return per_call_ms
+
+def main():
+    print("📊 Google Calendar client construction")
+    print("=" * 72)
+    
+    user = fake_user()
+    before = measure(
+        "build() per request",
+        lambda: build('calendar', 'v3', credentials=build_credentials(user), cache_discovery=False)
+    )
+    after = measure("pooled factory", lambda: get_calendar_service(user))
+    
+    print("=" * 72)
+    print(f"✅ Speedup: {before / after:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark multi-calendar aggregation: sequential reads vs concurrent fan-out
+
+Uses a fake Calendar service where every calendar answers each page after a
+fixed latency, so the numbers show request wall time rather than Google's.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_calendar_fanout --calendars 8 --pages 3
+"""
+
+import argparse
+import heapq
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from .common import create_bench_app
+from ..services.calendar_aggregate import CalendarAggregator
+from ..services.event_cache import EventStore
+
+class _Request:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return self.fn()
+
+class FakeCalendarService:
+    """Paged events().list() and calendarList().list() with per-calendar latency"""
+
+    def __init__(self, latencies, pages, per_page, now):
+        self.latencies = latencies
+        self.pages = pages
+        self.per_page = per_page
+        self.now = now
+
+    def calendarList(self):
+        return SimpleNamespace(list=lambda pageToken=None: _Request(lambda: {
+            'items': [{'id': calendar_id, 'summary': calendar_id, 'selected': True} for calendar_id in self.latencies]
+        }))
+
+    def events(self):
+        return SimpleNamespace(list=lambda **kwargs: _Request(lambda: self._page(**kwargs)))
+
+    def _page(self, calendarId, pageToken=None, **kwargs):
+        time.sleep(self.latencies[calendarId])
+        page = int(pageToken or 0)
+        items = []
+        for i in range(self.per_page):
+            start = self.now + timedelta(minutes=(page * self.per_page + i) * 17 % 1440)
+            items.append({
+                'id': f'{calendarId}-{page}-{i}',
+                'summary': f'Event {i}',
+                'start': {'dateTime': start.isoformat() + 'Z'},
+                'end': {'dateTime': (start + timedelta(minutes=30)).isoformat() + 'Z'}
+            })
+        result = {'items': items}
+        if page + 1 < self.pages:
+            result['nextPageToken'] = str(page + 1)
+        else:
+            result['nextSyncToken'] = 'sync'
+        return result
+
+def sequential(store, user, calendar_ids, time_min, time_max):
+    """One calendar after another, merged the same way"""
+    streams = [store.get_events(user, calendar_id, time_min, time_max) for calendar_id in calendar_ids]
+    return list(heapq.merge(*streams, key=lambda entry: (entry.start, entry.end)))
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-calendar aggregation latency')
+    parser.add_argument('--calendars', type=int, default=8)
+    parser.add_argument('--pages', type=int, default=3)
+    parser.add_argument('--per-page', type=int, default=250)
+    parser.add_argument('--latency', type=float, default=0.08, help='Slowest calendar latency per page in seconds')
+    args = parser.parse_args()
+
+    app, db = create_bench_app()
+    now = datetime.utcnow()
+    # Latencies spread up to --latency so the slowest calendar bounds the fan-out
+    latencies = {f'cal-{i}@example.com': args.latency * (i + 1) / args.calendars for i in range(args.calendars)}
+    service = FakeCalendarService(latencies, args.pages, args.per_page, now)
+    user = SimpleNamespace(id=1, access_token='token', refresh_token='refresh', token_expiry=None)
+    calendar_ids = list(latencies)
+    time_min, time_max = now, now + timedelta(days=1)
+    slowest = args.latency * args.pages
+
+    print(f"📊 {args.calendars} calendars × {args.pages} pages × {args.per_page} events, "
+          f"slowest calendar {slowest * 1000:.0f}ms")
+    print("=" * 64)
+
+    with app.app_context():
+        # ttl=0 forces a re-sync on every read, i.e. a cold cache each time
+        store = EventStore(service_factory=lambda user: service, ttl=0, full_sync_interval=0)
+        start = time.perf_counter()
+        events = sequential(store, user, calendar_ids, time_min, time_max)
+        elapsed = time.perf_counter() - start
+        print(f"sequential        {elapsed * 1000:8.0f}ms  {len(events)} events")
+
+        aggregator = CalendarAggregator(store=store, service_factory=lambda user: service, workers=args.calendars, batch=False)
+        start = time.perf_counter()
+        merged, errors = aggregator.get_events(user, aggregator.selected_calendar_ids(user), time_min, time_max)
+        elapsed = time.perf_counter() - start
+        print(f"fan-out           {elapsed * 1000:8.0f}ms  {len(merged)} events, {len(errors)} errors")
+        print(f"slowest calendar  {slowest * 1000:8.0f}ms")
+
+        starts = [entry.start for _, entry in merged]
+        assert starts == sorted(starts), 'merged events out of order'
+
+if __name__ == '__main__':
+    main()
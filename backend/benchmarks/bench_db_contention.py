@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark SQLite write contention: default engine vs the sqlite profile
+
+Seeds a tasks-shaped table in a temporary SQLite file, then runs writer
+threads (insert + update per transaction) next to reader threads (per-user
+aggregate scans, like the list and digest queries) for a fixed time against
+an engine built with SQLAlchemy defaults (rollback journal) and one built with
+the sqlite profile from services/database.py (WAL, synchronous=NORMAL, busy
+timeout, mmap). Reports committed writes, completed reads and lock errors.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_db_contention --writers 4 --readers 4 --duration 5
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import OperationalError
+
+from ..services.database import engine_options, set_sqlite_pragmas
+
+def seed(path, rows, users):
+    engine = create_engine(f'sqlite:///{path}')
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'CREATE TABLE tasks (id INTEGER PRIMARY KEY, user_id INTEGER NOT NULL, title TEXT, '
+            'completed BOOLEAN, updated_at DATETIME)'
+        )
+        conn.exec_driver_sql('CREATE INDEX ix_tasks_user ON tasks (user_id)')
+        now = datetime.utcnow()
+        conn.execute(
+            text('INSERT INTO tasks (user_id, title, completed, updated_at) VALUES (:user_id, :title, 0, :now)'),
+            [{'user_id': i % users, 'title': f'Task {i}', 'now': now} for i in range(rows)]
+        )
+    engine.dispose()
+
+def run(engine, args):
+    """Writers and readers side by side for args.duration seconds"""
+    stats = {'writes': 0, 'reads': 0, 'errors': 0, 'write_wait': 0.0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+
+    def writer(index):
+        rng = random.Random(index)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text('INSERT INTO tasks (user_id, title, completed, updated_at) VALUES (:u, :t, 0, :now)'),
+                        {'u': rng.randrange(args.users), 't': 'New task', 'now': datetime.utcnow()}
+                    )
+                    conn.execute(
+                        text('UPDATE tasks SET completed = NOT completed, updated_at = :now WHERE id = :id'),
+                        {'id': rng.randrange(1, args.rows), 'now': datetime.utcnow()}
+                    )
+                with lock:
+                    stats['writes'] += 1
+                    stats['write_wait'] += time.perf_counter() - start
+            except OperationalError:
+                with lock:
+                    stats['errors'] += 1
+
+    def reader(index):
+        rng = random.Random(1000 + index)
+        while time.perf_counter() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text('SELECT user_id, count(*), max(updated_at) FROM tasks WHERE user_id >= :u GROUP BY user_id'),
+                        {'u': rng.randrange(args.users // 2)}
+                    ).all()
+                with lock:
+                    stats['reads'] += 1
+            except OperationalError:
+                with lock:
+                    stats['errors'] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite write contention by engine profile')
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    template = os.path.join(directory, 'template.db')
+    seed(template, args.rows, args.users)
+
+    print(f"📊 {args.writers} writers + {args.readers} readers for {args.duration:.0f}s on {args.rows} rows")
+    print("=" * 72)
+    try:
+        for name, profile in (('SQLAlchemy defaults', 'default'), ('sqlite profile (WAL)', 'sqlite')):
+            path = os.path.join(directory, f'{profile}.db')
+            shutil.copy(template, path)
+            engine = create_engine(f'sqlite:///{path}', **engine_options(profile))
+            if profile == 'sqlite':
+                event.listen(engine, 'connect', set_sqlite_pragmas)
+            stats = run(engine, args)
+            engine.dispose()
+            latency = stats['write_wait'] / stats['writes'] * 1000 if stats['writes'] else float('nan')
+            print(f"{name:24s} {stats['writes'] / args.duration:8.1f} writes/s  {stats['reads'] / args.duration:8.1f} reads/s  "
+                  f"{latency:7.2f}ms/write  {stats['errors']} lock errors")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
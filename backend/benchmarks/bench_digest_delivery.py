@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark daily digest delivery against a local SMTP stand-in
+
+Needs aiosmtpd (benchmark-only dependency):
+    pip install aiosmtpd
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_digest_delivery --messages 2000 --users 2000
+"""
+
+import argparse
+import asyncio
+import smtplib
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from aiosmtpd.controller import Controller
+
+from .common import create_bench_app
+from ..services.mailer import SMTPPool, build_message
+
+HOST = '127.0.0.1'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+class CountingHandler:
+    """Accept every message, optionally adding server-side latency"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.received += 1
+        return '250 OK'
+
+def connect_per_message(port, messages, workers):
+    """The previous send_email(): new connection for every message"""
+    def send(msg):
+        with smtplib.SMTP(HOST, port) as server:
+            server.send_message(msg)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(send, messages))
+
+def pooled(port, messages, workers, size):
+    pool = SMTPPool(host=HOST, port=port, username='', use_tls=False, size=size)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(pool.send, messages))
+    pool.close()
+
+def run_job(port, users, workers, size):
+    """Seed users and tasks and run the full digest job"""
+    app, db = create_bench_app()
+    from ..models import User, Task
+    from ..services import event_cache
+    from ..services.digest import run_daily_digest
+    
+    # No Google access in the benchmark: every calendar is empty
+    class EmptyCalendar:
+        def events(self):
+            return self
+        def list(self, **kwargs):
+            return self
+        def execute(self):
+            return {'items': [], 'nextSyncToken': 'bench'}
+    event_cache.event_store.service_factory = lambda user: EmptyCalendar()
+    
+    today = datetime.utcnow().date()
+    with app.app_context():
+        db.session.add_all([
+            User(id=i, email=f'bench{i}@example.com', google_sub=f'bench-sub-{i}') for i in range(1, users + 1)
+        ])
+        db.session.add_all([
+            Task(user_id=i % users + 1, title=f'Task {i}', due_at=datetime.combine(today, datetime.min.time()) + timedelta(minutes=i % 1440))
+            for i in range(users * 5)
+        ])
+        db.session.commit()
+        
+        pool = SMTPPool(host=HOST, port=port, username='', use_tls=False, size=size)
+        stats = run_daily_digest(today=today, workers=workers, pool=pool)
+        pool.close()
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Digest delivery throughput')
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Server-side delay per message')
+    args = parser.parse_args()
+    
+    handler = CountingHandler(args.latency_ms / 1000)
+    port = free_port()
+    controller = Controller(handler, hostname=HOST, port=port)
+    controller.start()
+    
+    try:
+        messages = [
+            build_message(f'user{i}@example.com', 'Your Daily Agenda', '<p>Agenda</p>', from_email='bench@example.com')
+            for i in range(args.messages)
+        ]
+        
+        print(f"📊 {args.messages:,} messages, {args.workers} workers, pool of {args.pool_size}")
+        print("=" * 64)
+        
+        start = time.perf_counter()
+        connect_per_message(port, messages, args.workers)
+        baseline = args.messages / (time.perf_counter() - start)
+        print(f"connect per message  {baseline:10.0f} msg/s")
+        
+        start = time.perf_counter()
+        pooled(port, messages, args.workers, args.pool_size)
+        pooled_rate = args.messages / (time.perf_counter() - start)
+        print(f"pooled connections   {pooled_rate:10.0f} msg/s   ({pooled_rate / baseline:.1f}x)")
+        
+        stats = run_job(port, args.users, args.workers, args.pool_size)
+        print(f"full digest job      {stats['sent'] / stats['elapsed']:10.0f} msg/s   "
+              f"({stats['sent']:,} sent, {stats['failed']} failed, {stats['elapsed']:.1f}s)")
+        print(f"server received      {handler.received:10,}")
+    finally:
+        controller.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark digest rendering: f-string concatenation vs precompiled templates
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_digest_render --digests 10000
+"""
+
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from ..services.digest_render import render_digest, digest_context, render_digest_html
+from ..services.interval_index import index_event
+
+def legacy_render(today, events, tasks):
+    """The previous inline implementation (unescaped, += in loops)"""
+    email_content = f"""
+        <h2>📅 Your Daily Agenda for {today.strftime('%A, %B %d, %Y')}</h2>
+        
+        <h3>🗓️ Calendar Events</h3>
+        """
+    if events:
+        for entry in events:
+            event = entry.event
+            time_str = entry.start_dt.strftime('%I:%M %p') if not entry.is_all_day else 'All Day'
+            email_content += f"""
+                <div style="margin-bottom: 10px;">
+                    <strong>{time_str}</strong> - {event['summary']}
+                    {f"<br><em>📍 {event.get('location', '')}</em>" if event.get('location') else ''}
+                </div>
+                """
+    else:
+        email_content += "<p>No events scheduled for today.</p>"
+    email_content += "<h3>✅ Tasks</h3>"
+    if tasks:
+        for task in tasks:
+            time_str = task.due_at.strftime('%I:%M %p') if task.due_at else 'No due time'
+            status = "✅" if task.completed else "⏳"
+            email_content += f"""
+                <div style="margin-bottom: 10px;">
+                    {status} <strong>{task.title}</strong> - Due: {time_str}
+                    {f"<br><em>Priority: {task.priority.title()}</em>" if task.priority != 'medium' else ''}
+                </div>
+                """
+    else:
+        email_content += "<p>No tasks due today.</p>"
+    return email_content
+
+def synthetic_day(rng, today, items):
+    """Events and tasks for one user's day"""
+    base = datetime.combine(today, datetime.min.time())
+    events = []
+    for i in range(items):
+        start = base + timedelta(minutes=rng.randrange(8 * 60, 18 * 60))
+        events.append(index_event({
+            'id': f'e{i}',
+            'summary': f'Meeting <{i}> & review',
+            'location': rng.choice(['', 'Room 1', 'https://meet.example.com/abc']),
+            'start': {'dateTime': start.isoformat() + 'Z'},
+            'end': {'dateTime': (start + timedelta(minutes=30)).isoformat() + 'Z'}
+        }))
+    tasks = [
+        SimpleNamespace(
+            title=f'Task "{i}"',
+            due_at=base + timedelta(minutes=rng.randrange(1440)) if rng.random() < 0.8 else None,
+            completed=rng.random() < 0.3,
+            priority=rng.choice(['low', 'medium', 'high'])
+        )
+        for i in range(items)
+    ]
+    return events, tasks
+
+def main():
+    parser = argparse.ArgumentParser(description='Digest rendering throughput')
+    parser.add_argument('--digests', type=int, default=10_000)
+    parser.add_argument('--items', type=int, default=10, help='Events and tasks per digest')
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    today = date(2024, 6, 1)
+    days = [synthetic_day(rng, today, args.items) for _ in range(args.digests)]
+    
+    print(f"📊 Rendering {args.digests:,} digests with {args.items} events + {args.items} tasks each")
+    print("=" * 64)
+    
+    start = time.perf_counter()
+    for events, tasks in days:
+        legacy_render(today, events, tasks)
+    legacy = time.perf_counter() - start
+    print(f"f-string +=              {legacy:8.2f}s  {args.digests / legacy:10.0f} digests/s")
+    
+    start = time.perf_counter()
+    for events, tasks in days:
+        render_digest_html(digest_context(today, events, tasks))
+    html_only = time.perf_counter() - start
+    print(f"template (html)          {html_only:8.2f}s  {args.digests / html_only:10.0f} digests/s")
+    
+    start = time.perf_counter()
+    for events, tasks in days:
+        render_digest(today, events, tasks)
+    both = time.perf_counter() - start
+    print(f"template (html + text)   {both:8.2f}s  {args.digests / both:10.0f} digests/s")
+
+if __name__ == '__main__':
+    main()
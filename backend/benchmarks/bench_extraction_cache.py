@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark event extraction: a model call per email vs the content-addressed cache
+
+Seeds users with candidates from monitored senders. Each user gets the same
+newsletters, a share of them are forwarded copies, and the rest is personal
+mail. Extraction goes through a stub model client with a fixed delay, and
+each scenario counts the model calls it makes:
+
+- per email: the former popup flow, one call for every candidate on every open;
+- cache: every user's first open, then a second open;
+- concurrent: users opening at the same moment after the same new mail
+  arrives, where identical content waits on one call;
+- eviction: the cache capped below the working set.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_extraction_cache --users 20 --emails 40 --latency 0.3
+"""
+
+import argparse
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+from .common import create_bench_app, create_user
+from ..services.event_extraction import ExtractionService, StubClient
+
+FORWARD_NOTE = 'FYI, see below.\n\n---------- Forwarded message ---------\nFrom: Events <events@club.example.org>\nDate: {date}\nSubject: {subject}\nTo: list@club.example.org\n\n'
+
+def newsletter(i):
+    subject = f'Club meetup #{i}'
+    body = f'Hi all,\n\nJoin us for meetup #{i} on Friday at 18:{i % 60:02d} in Room {200 + i}.\nPizza provided.\n'
+    return subject, body
+
+def seed(app, db, user_ids, emails, shared, forwarded, now, rng):
+    from ..models import EmailCandidate
+    with app.app_context():
+        for user_id in user_ids:
+            for i in range(emails):
+                if i < emails * shared:
+                    subject, body = newsletter(i)
+                    if rng.random() < forwarded:
+                        body = FORWARD_NOTE.format(date=now.strftime('%a, %d %b %Y'), subject=subject) + body
+                        subject = 'Fwd: ' + subject
+                else:
+                    subject = f'Note {i} for user {user_id}'
+                    body = f'Personal message {i} to {user_id}: see you at 1{i % 10}:30'
+                db.session.add(EmailCandidate(
+                    user_id=user_id, message_id=f'{user_id}-{i}', sender='events@club.example.org',
+                    subject=subject, body=body, received_at=now - timedelta(minutes=i)
+                ))
+        db.session.commit()
+
+def candidates_for(db, user_id):
+    from ..models import EmailCandidate
+    return EmailCandidate.query.filter_by(user_id=user_id).all()
+
+def run_concurrently(app, db, service, user_ids):
+    barrier = threading.Barrier(len(user_ids))
+
+    def open_popup(user_id):
+        with app.app_context():
+            candidates = candidates_for(db, user_id)
+            # Hand the connection back while waiting; the pool is smaller than the crowd
+            db.session.close()
+            barrier.wait()
+            service.extract_many(candidates)
+            db.session.remove()
+
+    threads = [threading.Thread(target=open_popup, args=(user_id,)) for user_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def measure(client, service, name, fn):
+    calls = client.calls
+    before = service.stats() if service else None
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    line = f"{name:34s} {client.calls - calls:6d} model calls {elapsed:8.2f}s"
+    if service:
+        after = service.stats()
+        lookups = {key: after[key] - before[key] for key in ('hits', 'misses', 'coalesced', 'evictions')}
+        total = lookups['hits'] + lookups['misses'] + lookups['coalesced']
+        line += (f"  {lookups['hits']:5d} hits {lookups['misses']:5d} misses {lookups['coalesced']:5d} coalesced"
+                 f"  hit rate {lookups['hits'] / total if total else 0:.0%}")
+        if lookups['evictions']:
+            line += f"  {lookups['evictions']} evicted"
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Event extraction cache hit rate and model calls')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--emails', type=int, default=40, help='Candidates per user')
+    parser.add_argument('--shared', type=float, default=0.5, help='Share of candidates that are common newsletters')
+    parser.add_argument('--forwarded', type=float, default=0.3, help='Share of newsletters received as forwards')
+    parser.add_argument('--latency', type=float, default=0.3, help='Stub model latency per call')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    app, db = create_bench_app()
+    user_ids = [create_user(app, db, index) for index in range(1, args.users + 1)]
+    now = datetime.utcnow()
+    seed(app, db, user_ids, args.emails, args.shared, args.forwarded, now, rng)
+
+    print(f"📊 {args.users} users x {args.emails} candidates, {args.shared:.0%} shared newsletters "
+          f"({args.forwarded:.0%} forwarded), {args.latency * 1000:.0f}ms per model call")
+    print("=" * 130)
+
+    client = StubClient(latency=args.latency)
+    with app.app_context():
+        def open_all(service, users):
+            # Fresh rows each time: the service commits, which expires loaded ones
+            for user_id in users:
+                service.extract_many(candidates_for(db, user_id))
+
+        def per_email():
+            # The old popup: one sequential call per candidate, nothing remembered
+            for user_id in user_ids[:2]:
+                for candidate in candidates_for(db, user_id):
+                    client.extract(candidate.body, now.date().isoformat())
+        measure(client, None, 'per email (2 users, every open)', per_email)
+
+        service = ExtractionService(client=client)
+        measure(client, service, 'cache: first open, every user',
+                lambda: open_all(service, user_ids))
+        measure(client, service, 'cache: second open, every user',
+                lambda: open_all(service, user_ids))
+
+        from ..models import EmailCandidate
+        for i, user_id in enumerate(user_ids):
+            subject, body = newsletter(args.emails + 1)
+            db.session.add(EmailCandidate(user_id=user_id, message_id=f'{user_id}-new', sender='events@club.example.org',
+                                          subject=subject, body=body, received_at=now))
+        db.session.commit()
+        db.session.remove()
+    measure(client, service, 'concurrent opens after new mail',
+            lambda: run_concurrently(app, db, service, user_ids))
+
+    with app.app_context():
+        capped = ExtractionService(client=client, max_entries=args.emails)
+        from ..models import ExtractionResult
+        ExtractionResult.query.delete()
+        db.session.commit()
+        measure(client, capped, f'capped at {args.emails}: two users, twice',
+                lambda: open_all(capped, user_ids[:2] * 2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark Gmail scanning: the popup's per-open scan vs the historyId pipeline
+
+Fills a local Gmail stand-in with a month of mail, a share of it from
+monitored senders, and counts round-trips, API calls and response bytes:
+
+- popup scan: the former browser flow on every popup open, a ``from:``
+  search followed by one ``format=full`` get per message;
+- pipeline: the first scan (search, then batched full bodies),
+  incremental scans after new mail and with none, a rescan after the history
+  expired, and the popup reading the stored candidates.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_gmail_scan --messages 2000 --monitored 0.05
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from .common import create_bench_app, create_user, login_client
+from .gmail_standin import mock_service_factory, start_mock_gmail
+from ..services.gmail_scan import GmailScanner, search_query
+
+SENDERS = ['events@club.example.org', 'newsletter@school.example.edu']
+
+def fill_mailbox(api, count, monitored, now, rng):
+    body = ('Join us for the spring meetup on Friday at 18:00 in Room 204. ' * 40).strip()
+    for i in range(count):
+        if rng.random() < monitored:
+            sender = f'Organizer <{rng.choice(SENDERS)}>'
+        else:
+            sender = f'Someone {i} <user{i % 300}@mail.example.com>'
+        api.add_message(sender, f'Message {i}', body, now - timedelta(minutes=(count - i) * 30 * 1440 // count))
+
+def measure(api, name, fn):
+    round_trips, calls, size = api.round_trips, api.calls, api.bytes
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:34s} {api.round_trips - round_trips:5d} round-trips {api.calls - calls:5d} calls "
+          f"{(api.bytes - size) / 1024:9.1f} KiB {elapsed * 1000:8.0f}ms  {result}")
+
+def popup_scan(service, max_results):
+    """The browser flow: search, then every message with format=full, one by one"""
+    listing = service.users().messages().list(userId='me', q=search_query(SENDERS, 30), maxResults=max_results).execute()
+    messages = [
+        service.users().messages().get(userId='me', id=message['id'], format='full').execute()
+        for message in listing.get('messages', [])
+    ]
+    return f'{len(messages)} messages'
+
+def main():
+    parser = argparse.ArgumentParser(description='Gmail scanning round-trips and bytes')
+    parser.add_argument('--messages', type=int, default=2000)
+    parser.add_argument('--monitored', type=float, default=0.05, help='Share of mail from monitored senders')
+    parser.add_argument('--new', type=int, default=40, help='Messages arriving between scans')
+    parser.add_argument('--latency', type=float, default=0.02, help='Stand-in latency per round-trip')
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    api = start_mock_gmail(args.latency)
+    now = datetime.utcnow()
+    fill_mailbox(api, args.messages, args.monitored, now, rng)
+    factory = mock_service_factory(api)
+
+    app, db = create_bench_app()
+    from ..models import EmailScanState, User
+    user_id = create_user(app, db)
+    with app.app_context():
+        state = EmailScanState(user_id=user_id)
+        state.sender_list = SENDERS
+        db.session.add(state)
+        db.session.commit()
+
+    scanner = GmailScanner(service_factory=factory, max_messages=500)
+    client = login_client(app, user_id)
+
+    print(f"📊 {args.messages} messages over 30 days, {args.monitored:.0%} from monitored senders, "
+          f"{args.latency * 1000:.0f}ms per round-trip")
+    print("=" * 110)
+
+    measure(api, 'popup scan (every open)', lambda: popup_scan(factory(None), 500))
+
+    with app.app_context():
+        def scan():
+            stats = scanner.scan(db.session.get(User, user_id))
+            db.session.remove()
+            return stats
+
+        measure(api, 'pipeline: first scan', scan)
+        measure(api, 'pipeline: no new mail', scan)
+
+        received = now
+        for i in range(args.new):
+            received += timedelta(seconds=30)
+            sender = SENDERS[i % 2] if i % 10 == 0 else f'user{i}@mail.example.com'
+            api.add_message(sender, f'New {i}', 'Workshop next Tuesday 14:00', received)
+        measure(api, f'pipeline: {args.new} new messages', scan)
+
+        for i in range(5):
+            received += timedelta(seconds=30)
+            api.add_message(SENDERS[0], f'Late {i}', 'Office hours moved to 16:00', received)
+        api.expire_history()
+        measure(api, 'pipeline: history expired', scan)
+
+    def read_candidates():
+        response = client.get('/api/email/candidates?limit=200')
+        assert response.status_code == 200, response.get_json()
+        return f"{response.get_json()['count']} candidates"
+    measure(api, 'popup reads candidates', read_candidates)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for window queries over cached calendar events
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_interval_index
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from ..services.interval_index import EventIndex, parse_event_time, to_epoch
+
+SIZES = [10_000, 50_000, 100_000]
+QUERIES = 200
+
+def synthetic_events(count, seed=42):
+    """Generate timed and all-day events spread over a year"""
+    rng = random.Random(seed)
+    base = datetime(2024, 1, 1)
+    events = []
+    for i in range(count):
+        start = base + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        if rng.random() < 0.05:
+            day = start.date()
+            events.append({
+                'id': f'evt{i}',
+                'summary': f'All day {i}',
+                'start': {'date': day.isoformat()},
+                'end': {'date': (day + timedelta(days=1)).isoformat()}
+            })
+        else:
+            end = start + timedelta(minutes=rng.choice([15, 30, 45, 60, 90, 120]))
+            events.append({
+                'id': f'evt{i}',
+                'summary': f'Meeting {i}',
+                'start': {'dateTime': start.isoformat() + 'Z'},
+                'end': {'dateTime': end.isoformat() + 'Z'}
+            })
+    return events
+
+def linear_window(events, time_min, time_max):
+    """Baseline: parse every event, filter and sort per query"""
+    matched = []
+    for event in events:
+        start_dt = parse_event_time(event['start'].get('dateTime', event['start'].get('date')))
+        end_dt = parse_event_time(event['end'].get('dateTime', event['end'].get('date')))
+        start, end = to_epoch(start_dt), to_epoch(end_dt)
+        if start < time_max and end > time_min:
+            matched.append((start, event))
+    matched.sort(key=lambda pair: pair[0])
+    return matched
+
+def run(func, windows):
+    start = time.perf_counter()
+    for time_min, time_max in windows:
+        func(time_min, time_max)
+    return (time.perf_counter() - start) / len(windows) * 1000
+
+def main():
+    print("📊 Calendar window queries (ms per query)")
+    print("=" * 78)
+    print(f"{'events':>8} {'window':>8} {'linear':>12} {'index':>12} {'speedup':>10} {'build':>12}")
+    
+    rng = random.Random(7)
+    base = to_epoch(datetime(2024, 1, 1))
+    for size in SIZES:
+        events = synthetic_events(size)
+        
+        start = time.perf_counter()
+        index = EventIndex.from_events(events)
+        build_ms = (time.perf_counter() - start) * 1000
+        
+        for label, span in [('2h', 2 * 3600), ('1d', 86400), ('7d', 7 * 86400)]:
+            windows = []
+            for _ in range(QUERIES):
+                time_min = base + rng.randrange(360 * 86400)
+                windows.append((time_min, time_min + span))
+            
+            linear_windows = windows[:max(5, QUERIES // 20)]
+            linear_ms = run(lambda a, b: linear_window(events, a, b), linear_windows)
+            index_ms = run(index.overlapping, windows)
+            print(f"{size:>8} {label:>8} {linear_ms:>12.3f} {index_ms:>12.4f} {linear_ms / index_ms:>9.0f}x {build_ms:>10.1f}ms")
+    
+    print("=" * 78)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization and response compression for large event lists
+
+Builds a /api/calendar/events style response with descriptions and attendee
+lists, then compares Flask's default JSON provider with the orjson provider and
+the bytes on the wire with and without compression.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_json_compression --events 1000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from ..services.compression import Compressor, brotli
+from ..services.json_provider import OrjsonProvider, orjson
+
+WORDS = 'review planning sync budget roadmap design launch notes agenda follow-up customer team quarterly'.split()
+
+def synthetic_events(count, seed=7):
+    """Formatted events as returned by /api/calendar/events"""
+    rng = random.Random(seed)
+    base = datetime(2024, 6, 3, 8, 0)
+    events = []
+    for i in range(count):
+        start = base + timedelta(minutes=15 * i)
+        end = start + timedelta(minutes=rng.choice((15, 30, 60)))
+        events.append({
+            'id': f'evt{i:06d}{rng.getrandbits(32):08x}',
+            'title': ' '.join(rng.choice(WORDS) for _ in range(4)).title(),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))),
+            'start': start.isoformat() + 'Z',
+            'end': end.isoformat() + 'Z',
+            'start_dt': start.isoformat() + '+00:00',
+            'end_dt': end.isoformat() + '+00:00',
+            'is_all_day': False,
+            'location': rng.choice(['', 'Room 4.12', 'https://meet.example.com/abc-defg-hij']),
+            'attendees': [f'person{rng.randint(1, 500)}@example.com' for _ in range(rng.randint(1, 12))],
+            'calendar_id': 'primary'
+        })
+    return {'success': True, 'events': events, 'count': count}
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+def main():
+    parser = argparse.ArgumentParser(description='JSON provider and compression cost')
+    parser.add_argument('--events', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payload = synthetic_events(args.events)
+
+    print(f"📊 {args.events}-event response, averaged over {args.repeat} runs")
+    print("=" * 64)
+
+    providers = [('stdlib json (Flask default)', DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson provider', OrjsonProvider(app)))
+    else:
+        print("orjson not installed; only the default provider is measured")
+
+    body = None
+    for name, provider in providers:
+        with app.app_context():
+            elapsed, response = timed(lambda: provider.response(payload), args.repeat)
+        body = response.get_data()
+        print(f"{name:28s} {elapsed * 1000:8.2f}ms  {len(body) / 1024:8.1f} KiB")
+
+    print("-" * 64)
+    compressor = Compressor()
+    print(f"{'identity':28s} {'':>8s}    {len(body) / 1024:8.1f} KiB")
+    for encoding, (encode, level) in compressor.encoders.items():
+        elapsed, compressed = timed(lambda: encode(body, level), args.repeat)
+        print(f"{encoding + ' level ' + str(level):28s} {elapsed * 1000:8.2f}ms  {len(compressed) / 1024:8.1f} KiB"
+              f"  ({len(compressed) / len(body):.0%})")
+    if brotli is None:
+        print("brotli not installed; only gzip is negotiated")
+
+if __name__ == '__main__':
+    main()
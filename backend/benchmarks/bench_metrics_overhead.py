@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark the cost of request and SQL instrumentation
+
+Times GET /api/tasks/ with the metrics hooks and SQL listeners installed, then
+with them removed, and prints the per-request difference along with the cost
+of rendering /metrics.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_metrics_overhead --tasks 50
+"""
+
+import argparse
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .common import create_bench_app, create_user, login_client
+from ..services import metrics
+
+def per_request(client, path, repeat):
+    client.get(path)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        client.get(path)
+    return (time.perf_counter() - start) / repeat
+
+def remove_instrumentation(app):
+    for funcs in (app.before_request_funcs[None], app.after_request_funcs[None]):
+        funcs[:] = [fn for fn in funcs if fn.__module__ != metrics.__name__]
+    event.remove(Engine, 'before_cursor_execute', metrics._before_cursor_execute)
+    event.remove(Engine, 'after_cursor_execute', metrics._after_cursor_execute)
+
+def main():
+    parser = argparse.ArgumentParser(description='Metrics instrumentation overhead')
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    app, db = create_bench_app()
+    user_id = create_user(app, db)
+    from ..models import Task
+    with app.app_context():
+        db.session.add_all(Task(user_id=user_id, title=f'Task {i}') for i in range(args.tasks))
+        db.session.commit()
+    client = login_client(app, user_id)
+
+    print(f"📊 GET /api/tasks/ with {args.tasks} tasks, averaged over {args.repeat} requests")
+    print("=" * 64)
+
+    instrumented = per_request(client, '/api/tasks/', args.repeat)
+    start = time.perf_counter()
+    body = client.get('/metrics').get_data()
+    render = time.perf_counter() - start
+
+    remove_instrumentation(app)
+    bare = per_request(client, '/api/tasks/', args.repeat)
+
+    print(f"{'without instrumentation':26s} {bare * 1000:8.3f}ms")
+    print(f"{'with instrumentation':26s} {instrumented * 1000:8.3f}ms")
+    print(f"{'overhead':26s} {(instrumented - bare) * 1e6:8.1f}µs  ({(instrumented - bare) / bare:+.1%})")
+    print(f"{'/metrics scrape':26s} {render * 1000:8.3f}ms  {len(body) / 1024:.1f} KiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Load test for the SSE notification stream
+
+In-process mode (default) registers thousands of subscribers on a notification
+hub with a synthetic compute function and measures scheduler ticks and fan-out.
+HTTP mode opens real streaming connections against a running server, e.g. one
+started with ``gunicorn -k gevent --worker-connections 10000 backend.app:app``.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_notification_stream --subscribers 5000
+    python -m backend.benchmarks.bench_notification_stream --url http://localhost:8000 --cookie 'session=...'
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from ..services.notification_hub import NotificationHub
+
+def synthetic_compute(calls):
+    """Compute function returning a few items per user and counting calls"""
+    def compute(user_id, now):
+        calls[0] += 1
+        return [
+            {
+                'id': user_id * 10 + i,
+                'title': f'Item {i}',
+                'type': 'task',
+                'start_time': (now + timedelta(minutes=10 * (i + 1))).isoformat(),
+                'minutes_until': 10 * (i + 1),
+                'priority': 'medium',
+                'description': ''
+            }
+            for i in range(3)
+        ]
+    return compute
+
+def in_process(subscribers, users, ticks):
+    calls = [0]
+    hub = NotificationHub(compute=synthetic_compute(calls), interval=3600)
+    now = datetime(2024, 6, 1, 9, 0)
+    
+    start = time.perf_counter()
+    subscriptions = [hub.subscribe(i % users, now) for i in range(subscribers)]
+    subscribe_s = time.perf_counter() - start
+    
+    tick_ms = []
+    for i in range(ticks):
+        # Shift time so snapshots change and reminders fire
+        start = time.perf_counter()
+        hub.tick(now + timedelta(minutes=i))
+        tick_ms.append((time.perf_counter() - start) * 1000)
+    
+    delivered = 0
+    start = time.perf_counter()
+    for subscription in subscriptions:
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+            delivered += 1
+    drain_s = time.perf_counter() - start
+    
+    print(f"📊 In-process hub: {subscribers:,} subscribers across {users:,} users")
+    print("=" * 64)
+    print(f"subscribe            {subscribe_s * 1000:10.1f} ms total")
+    print(f"tick p50 / max       {statistics.median(tick_ms):10.1f} / {max(tick_ms):.1f} ms")
+    print(f"compute calls        {calls[0]:10,}  (polling would make {subscribers * (ticks + 1):,})")
+    print(f"messages delivered   {delivered:10,}  drained in {drain_s * 1000:.1f} ms")
+
+async def open_stream(host, port, path, cookie, results, hold):
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n"
+            f"Cookie: {cookie}\r\nConnection: keep-alive\r\n\r\n".encode()
+        )
+        await writer.drain()
+        first = None
+        events = 0
+        deadline = time.perf_counter() + hold
+        while time.perf_counter() < deadline:
+            try:
+                line = await asyncio.wait_for(reader.readline(), timeout=deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                break
+            if not line:
+                break
+            if line.startswith(b'event:'):
+                events += 1
+                if first is None:
+                    first = time.perf_counter() - start
+        writer.close()
+        results.append((first, events))
+    except OSError:
+        results.append((None, 0))
+
+async def over_http(url, cookie, subscribers, hold):
+    parsed = urlparse(url)
+    results = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        open_stream(parsed.hostname, parsed.port or 80, '/api/notifications/stream', cookie, results, hold)
+        for _ in range(subscribers)
+    ])
+    elapsed = time.perf_counter() - start
+    
+    connected = [first for first, _ in results if first is not None]
+    print(f"📊 HTTP streams against {url}: {subscribers:,} subscribers held {hold}s")
+    print("=" * 64)
+    print(f"received first event {len(connected):10,} / {subscribers:,}")
+    if connected:
+        connected.sort()
+        print(f"first event p50      {connected[len(connected) // 2] * 1000:10.1f} ms")
+        print(f"first event p95      {connected[int(len(connected) * 0.95) - 1] * 1000:10.1f} ms")
+    print(f"events received      {sum(events for _, events in results):10,}")
+    print(f"wall time            {elapsed:10.1f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description='SSE notification stream load test')
+    parser.add_argument('--subscribers', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=2500)
+    parser.add_argument('--ticks', type=int, default=10)
+    parser.add_argument('--url', help='Base URL of a running server (HTTP mode)')
+    parser.add_argument('--cookie', default='', help='Session cookie for HTTP mode')
+    parser.add_argument('--hold', type=float, default=30.0, help='Seconds to keep each stream open')
+    args = parser.parse_args()
+    
+    if args.url:
+        asyncio.run(over_http(args.url, args.cookie, args.subscribers, args.hold))
+    else:
+        in_process(args.subscribers, args.users, args.ticks)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-request authentication cost: database user loader vs session claims
+
+Requests GET /auth/me for a rotating set of logged-in users, first with a
+loader that reads the users row on every request, then with the claims and
+user-cache loader, and compares both with an unauthenticated request to get
+the auth overhead itself. SQL statements per request are counted with an
+engine event.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_session_auth --users 100 --requests 5000
+"""
+
+import argparse
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .common import create_bench_app, create_user, login_client
+from ..app import login_manager
+from ..services.session_auth import user_cache
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+def drive(clients, path, requests):
+    for client in clients:
+        client.get(path)
+    start = time.perf_counter()
+    for i in range(requests):
+        response = clients[i % len(clients)].get(path)
+        assert response.status_code == 200, response.status_code
+    return (time.perf_counter() - start) / requests
+
+def main():
+    parser = argparse.ArgumentParser(description='Session authentication overhead')
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    app, db = create_bench_app()
+    from ..models import User
+    user_ids = [create_user(app, db, index) for index in range(1, args.users + 1)]
+    counter = QueryCounter()
+    event.listen(Engine, 'before_cursor_execute', counter)
+
+    def database_loader(user_id):
+        """The loader the app would otherwise use"""
+        return db.session.get(User, int(user_id))
+
+    print(f"📊 GET /auth/me for {args.users} users, {args.requests} requests")
+    print("=" * 64)
+
+    anonymous = app.test_client()
+    baseline = drive([anonymous], '/health', args.requests)
+    print(f"{'no auth (/health)':28s} {baseline * 1000:8.3f}ms")
+
+    cached_loader = login_manager._user_callback
+    for name, loader in (('database loader', database_loader), ('session claims + cache', cached_loader)):
+        login_manager.user_loader(loader)
+        user_cache.cache.clear()
+        clients = [login_client(app, user_id) for user_id in user_ids]
+        counter.count = 0
+        elapsed = drive(clients, '/auth/me', args.requests)
+        queries = counter.count / (args.requests + len(clients))
+        print(f"{name:28s} {elapsed * 1000:8.3f}ms  auth overhead {(elapsed - baseline) * 1000:6.3f}ms  "
+              f"{queries:.2f} queries/request")
+    print(f"user cache: {user_cache.cache.stats()}")
+
+if __name__ == '__main__':
+    main()
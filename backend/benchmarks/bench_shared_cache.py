@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared cache: Google syncs across workers and lookup cost
+
+Simulates several gunicorn workers (one EventStore each) serving the same
+user's calendar over a simulated hour, first with per-worker memory caches and
+then with one Redis-protocol cache shared by all of them, and counts the
+Calendar API pages fetched. Also times get/set for both backends.
+
+Uses fakeredis when --redis-url is not given:
+    pip install fakeredis
+Run from the repository root:
+    python -m backend.benchmarks.bench_shared_cache --workers 4
+    python -m backend.benchmarks.bench_shared_cache --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from .bench_calendar_fanout import FakeCalendarService
+from .common import create_bench_app
+from ..services.cache import MemoryCache, RedisCache, redis
+from ..services.event_cache import EventStore
+
+class CountingService(FakeCalendarService):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+
+    def _page(self, **kwargs):
+        self.calls += 1
+        return super()._page(**kwargs)
+
+class SimulatedClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+def redis_client(url):
+    if url:
+        return redis.Redis.from_url(url)
+    import fakeredis
+    return fakeredis.FakeRedis(server=fakeredis.FakeServer())
+
+def simulate(args, make_cache, service, user):
+    """Every worker answers one request per --interval seconds for an hour"""
+    clock = SimulatedClock()
+    stores = [EventStore(service_factory=lambda user: service, ttl=args.ttl, cache=make_cache(), clock=clock)
+              for _ in range(args.workers)]
+    now = datetime.utcnow()
+    service.calls = 0
+    for _ in range(3600 // args.interval):
+        for store in stores:
+            store.get_events(user, 'primary', now, now + timedelta(days=1))
+            clock.now += args.interval / args.workers
+    return service.calls
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared cache effect on Google syncs')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--ttl', type=int, default=60)
+    parser.add_argument('--interval', type=int, default=15, help='Seconds between requests per worker')
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--redis-url', help='Real Redis server to use instead of fakeredis')
+    args = parser.parse_args()
+
+    if redis is None:
+        print("redis package not installed; nothing to compare")
+        return
+
+    app, db = create_bench_app()
+    client = redis_client(args.redis_url)
+    client.flushdb()
+    service = CountingService({'primary': 0}, pages=2, per_page=250, now=datetime.utcnow())
+    user = SimpleNamespace(id=1, access_token='token', refresh_token='refresh', token_expiry=None)
+
+    print(f"📊 {args.workers} workers, one request each every {args.interval}s for an hour, "
+          f"EVENT_CACHE_TTL={args.ttl}s")
+    print("=" * 64)
+
+    with app.app_context():
+        local_calls = simulate(args, MemoryCache, service, user)
+        shared = RedisCache(client=client)
+        shared_calls = simulate(args, lambda: shared, service, user)
+
+    print(f"{'per-worker memory cache':28s} {local_calls:6d} Calendar API pages")
+    print(f"{'shared Redis cache':28s} {shared_calls:6d} Calendar API pages")
+    print(f"{'':28s} {local_calls / max(shared_calls, 1):6.1f}x fewer")
+
+    print("-" * 64)
+    value = [{'id': f'cal-{i}@example.com', 'summary': f'Calendar {i}', 'selected': True} for i in range(20)]
+    for name, cache in (('memory', MemoryCache()), ('redis', RedisCache(client=client, prefix='bench:'))):
+        cache.set('calendar-list:1', value)
+        get = timed(lambda: cache.get('calendar-list:1'), args.repeat)
+        put = timed(lambda: cache.set('calendar-list:1', value), args.repeat)
+        cache.get('calendar-list:2')
+        print(f"{name:10s} get {get * 1e6:8.1f}µs   set {put * 1e6:8.1f}µs   {cache.stats()}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark the batch task endpoint against per-item requests
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_task_batch --tasks 200
+"""
+
+import argparse
+import time
+
+from .common import create_bench_app, create_user, login_client
+
+def per_item(client, count):
+    """Create, update, toggle and delete tasks one request at a time"""
+    timings = {}
+    
+    start = time.perf_counter()
+    ids = [
+        client.post('/api/tasks/', json={'title': f'Task {i}', 'due_at': '2024-06-01T10:00:00'}).get_json()['task']['id']
+        for i in range(count)
+    ]
+    timings['create'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for task_id in ids:
+        client.put(f'/api/tasks/{task_id}', json={'priority': 'high'})
+    timings['update'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for task_id in ids:
+        client.post(f'/api/tasks/{task_id}/toggle')
+    timings['toggle'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for task_id in ids:
+        client.delete(f'/api/tasks/{task_id}')
+    timings['delete'] = time.perf_counter() - start
+    return timings
+
+def batched(client, count):
+    """Run the same workload through /api/tasks/batch"""
+    timings = {}
+    
+    def run(operations):
+        response = client.post('/api/tasks/batch', json={'operations': operations})
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()['results']
+    
+    start = time.perf_counter()
+    ids = [result['id'] for result in run([
+        {'op': 'create', 'title': f'Task {i}', 'due_at': '2024-06-01T10:00:00'} for i in range(count)
+    ])]
+    timings['create'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    run([{'op': 'update', 'id': task_id, 'priority': 'high'} for task_id in ids])
+    timings['update'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    run([{'op': 'toggle', 'id': task_id} for task_id in ids])
+    timings['toggle'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    run([{'op': 'delete', 'id': task_id} for task_id in ids])
+    timings['delete'] = time.perf_counter() - start
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch vs per-item task endpoints')
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--url', help='Database URL (defaults to a temporary SQLite file)')
+    args = parser.parse_args()
+    
+    app, db = create_bench_app(args.url)
+    client = login_client(app, create_user(app, db))
+    
+    print(f"📊 {args.tasks} tasks per operation")
+    print("=" * 64)
+    single = per_item(client, args.tasks)
+    batch = batched(client, args.tasks)
+    
+    print(f"{'operation':<10} {'per-item ops/s':>16} {'batch ops/s':>14} {'speedup':>10}")
+    for op in single:
+        print(f"{op:<10} {args.tasks / single[op]:>16.0f} {args.tasks / batch[op]:>14.0f} {single[op] / batch[op]:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
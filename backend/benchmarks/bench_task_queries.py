@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark task date queries with and without the composite indexes
+
+Seeds users and tasks, then compares the old ``date(due_at) = :day`` filter
+with the half-open range filter, before and after creating the task indexes.
+Query plans are printed for each case.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_task_queries --tasks 1000000 --users 10000
+    python -m backend.benchmarks.bench_task_queries --url postgresql://localhost/agendify_bench
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, func, insert, select
+
+from ..models import db, User, Task
+
+BATCH_SIZE = 50_000
+SAMPLE_USERS = 200
+
+def seed(engine, users, tasks, seed_value=42):
+    """Create a fresh schema and fill it with synthetic rows"""
+    rng = random.Random(seed_value)
+    tables = [User.__table__, Task.__table__]
+    db.metadata.drop_all(engine, tables=tables)
+    db.metadata.create_all(engine, tables=tables)
+
+    now = datetime(2024, 6, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(User.__table__), [
+            {'id': i, 'email': f'user{i}@example.com', 'google_sub': f'sub-{i}', 'created_at': now, 'updated_at': now}
+            for i in range(1, users + 1)
+        ])
+
+    remaining = tasks
+    next_id = 1
+    while remaining > 0:
+        batch = min(BATCH_SIZE, remaining)
+        rows = []
+        for task_id in range(next_id, next_id + batch):
+            due_at = now + timedelta(minutes=rng.randrange(-90 * 1440, 90 * 1440)) if rng.random() < 0.9 else None
+            rows.append({
+                'id': task_id,
+                'user_id': rng.randrange(1, users + 1),
+                'title': f'Task {task_id}',
+                'due_at': due_at,
+                'completed': rng.random() < 0.4,
+                'priority': rng.choice(['low', 'medium', 'high']),
+                'created_at': now,
+                'updated_at': now
+            })
+        with engine.begin() as conn:
+            conn.execute(insert(Task.__table__), rows)
+        next_id += batch
+        remaining -= batch
+    return now
+
+def set_indexes(engine, enabled):
+    """Create or drop the task indexes declared on the model"""
+    for index in Task.__table__.indexes:
+        if enabled:
+            index.create(engine, checkfirst=True)
+        else:
+            index.drop(engine, checkfirst=True)
+    with engine.begin() as conn:
+        conn.exec_driver_sql('ANALYZE')
+
+def explain(conn, stmt):
+    """Return the database's plan for a statement"""
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+    if conn.dialect.name == 'sqlite':
+        rows = conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + str(compiled), params).fetchall()
+        return [row[-1] for row in rows]
+    rows = conn.exec_driver_sql('EXPLAIN ' + str(compiled), params).fetchall()
+    return [row[0] for row in rows]
+
+def queries(user_id, day):
+    """The task queries issued by the routes, old and new form"""
+    start = datetime.combine(day, datetime.min.time())
+    order = (Task.due_at.asc().nullslast(), Task.priority.desc())
+    return {
+        'today date()': select(Task.__table__).where(
+            Task.user_id == user_id, func.date(Task.due_at) == day
+        ).order_by(*order),
+        'today range': select(Task.__table__).where(
+            Task.user_id == user_id, Task.due_on(day)
+        ).order_by(*order),
+        'upcoming 2h': select(Task.__table__).where(
+            Task.user_id == user_id,
+            Task.due_at >= start + timedelta(hours=9),
+            Task.due_at <= start + timedelta(hours=11),
+            Task.completed == False
+        ).order_by(Task.due_at.asc()),
+    }
+
+def run(engine, users, day, label):
+    """Time each query over a sample of users and print its plan"""
+    rng = random.Random(7)
+    sample = [rng.randrange(1, users + 1) for _ in range(SAMPLE_USERS)]
+    results = {}
+    with engine.connect() as conn:
+        for name in queries(1, day):
+            start = time.perf_counter()
+            for user_id in sample:
+                conn.execute(queries(user_id, day)[name]).fetchall()
+            elapsed = (time.perf_counter() - start) / len(sample) * 1000
+            results[name] = elapsed
+            plan = ' | '.join(explain(conn, queries(sample[0], day)[name]))
+            print(f"  [{label}] {name:<14} {elapsed:9.3f} ms/query   plan: {plan}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--tasks', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--url', default=os.getenv('BENCH_DATABASE_URL'))
+    args = parser.parse_args()
+
+    url = args.url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench_tasks.db')
+    engine = create_engine(url)
+
+    print(f"📊 Task queries on {engine.dialect.name}: {args.tasks:,} tasks / {args.users:,} users")
+    print("=" * 100)
+
+    start = time.perf_counter()
+    now = seed(engine, args.users, args.tasks)
+    print(f"✅ Seeded in {time.perf_counter() - start:.1f}s")
+
+    set_indexes(engine, False)
+    before = run(engine, args.users, now.date(), 'no index')
+    set_indexes(engine, True)
+    after = run(engine, args.users, now.date(), 'indexed')
+
+    print("=" * 100)
+    baseline = before['today date()']
+    for name, elapsed in after.items():
+        print(f"{name:<14} {before[name]:9.3f} -> {elapsed:9.3f} ms   ({baseline / elapsed:.0f}x vs unindexed date())")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark OAuth token refreshes against a local fake token endpoint
+
+Compares the previous lazy refresh (every request with an expired token calls
+the token endpoint) with the token manager's single-flight and background
+refreshes.
+
+Run from the repository root:
+    python -m backend.benchmarks.bench_token_refresh --requests 200 --latency 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from google.auth.transport.requests import Request
+
+from .common import create_bench_app, create_user
+from ..services.google_client import build_credentials
+from ..services.token_manager import TokenManager
+
+class FakeTokenEndpoint(ThreadingHTTPServer):
+    """Answers refresh_token grants with a new token after a fixed latency"""
+
+    daemon_threads = True
+
+    def __init__(self, latency):
+        super().__init__(('127.0.0.1', 0), FakeTokenHandler)
+        self.latency = latency
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    @property
+    def uri(self):
+        return f'http://127.0.0.1:{self.server_port}/token'
+
+class FakeTokenHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.hits += 1
+            hit = self.server.hits
+        time.sleep(self.server.latency)
+        body = json.dumps({'access_token': f'fresh-{hit}', 'expires_in': 3600, 'token_type': 'Bearer'}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def expire_token(app, db, user_id):
+    from ..models import User
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.access_token = 'stale'
+        user.token_expiry = datetime.utcnow() - timedelta(minutes=1)
+        db.session.commit()
+
+def concurrent_requests(app, db, user_id, requests, workers, get_token):
+    """Simulate concurrent request handlers each fetching credentials"""
+    from ..models import User
+
+    def handle(_):
+        with app.app_context():
+            try:
+                user = db.session.get(User, user_id)
+                start = time.perf_counter()
+                get_token(user)
+                return time.perf_counter() - start
+            finally:
+                db.session.remove()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(handle, range(requests)))
+
+def lazy_refresh(user):
+    """The previous get_calendar_service(): refresh inline when expired"""
+    credentials = build_credentials(user)
+    credentials.expiry = user.token_expiry
+    if credentials.expired and credentials.refresh_token:
+        credentials.refresh(Request())
+        from ..models import db
+        user.access_token = credentials.token
+        user.token_expiry = credentials.expiry
+        db.session.commit()
+    return credentials
+
+def report(name, latencies, endpoint, hits_before):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{name:30s} endpoint calls {endpoint.hits - hits_before:5d}   "
+          f"p50 {statistics.median(latencies) * 1000:8.2f}ms   p95 {p95 * 1000:8.2f}ms")
+
+def main():
+    parser = argparse.ArgumentParser(description='OAuth token refresh behaviour under concurrency')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.2, help='Token endpoint latency in seconds')
+    args = parser.parse_args()
+
+    endpoint = FakeTokenEndpoint(args.latency)
+    threading.Thread(target=endpoint.serve_forever, daemon=True).start()
+    os.environ['GOOGLE_TOKEN_URI'] = endpoint.uri
+    os.environ['TOKEN_REFRESHER_ENABLED'] = 'False'
+    os.environ.setdefault('GOOGLE_CLIENT_ID', 'bench-client')
+    os.environ.setdefault('GOOGLE_CLIENT_SECRET', 'bench-secret')
+
+    app, db = create_bench_app()
+    user_id = create_user(app, db)
+
+    print(f"📊 {args.requests} requests from one user, {args.workers} concurrent, endpoint latency {args.latency * 1000:.0f}ms")
+    print("=" * 88)
+
+    expire_token(app, db, user_id)
+    hits = endpoint.hits
+    latencies = concurrent_requests(app, db, user_id, args.requests, args.workers, lazy_refresh)
+    report('lazy refresh (expired)', latencies, endpoint, hits)
+
+    manager = TokenManager()
+    expire_token(app, db, user_id)
+    hits = endpoint.hits
+    latencies = concurrent_requests(app, db, user_id, args.requests, args.workers, manager.get_token)
+    report('single-flight (expired)', latencies, endpoint, hits)
+
+    # Token about to expire: the background pass refreshes it off the request path.
+    # Both workers served the user; the second finds the first one's token stored
+    manager = TokenManager(margin=600)
+    other_worker = TokenManager(margin=600)
+    from ..models import User
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.token_expiry = datetime.utcnow() + timedelta(minutes=2)
+        db.session.commit()
+        manager.get_token(user)
+        other_worker.get_token(user)
+        hits = endpoint.hits
+        manager.refresh_due()
+        other_worker.refresh_due()
+    latencies = concurrent_requests(app, db, user_id, args.requests, args.workers, manager.get_token)
+    report('background refresh, 2 workers', latencies, endpoint, hits)
+
+    endpoint.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Check the key endpoints against their SQL query budgets
+
+Seeds a throwaway database with tasks, points the event store at a fake
+Calendar service, enables the query profiler in strict mode and requests every
+endpoint in QUERY_BUDGETS.
+Prints each endpoint's query count and exits non-zero when one runs over
+budget (a likely N+1 or lost eager load).
+
+Run from the repository root:
+    python -m backend.benchmarks.check_query_budgets --tasks 200
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+os.environ['QUERY_PROFILER_ENABLED'] = 'True'
+os.environ['QUERY_PROFILER_STRICT'] = 'True'
+
+from .bench_calendar_fanout import FakeCalendarService
+from .common import create_bench_app, create_user, login_client
+from ..services.event_cache import event_store
+from ..services.event_extraction import StubClient, extraction_service
+from ..services.query_profiler import QUERY_BUDGETS, QueryBudgetExceeded
+
+def requests_to_check(task_ids):
+    """(method, rule, path, json) for every budgeted endpoint"""
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    return [
+        ('GET', '/auth/me', '/auth/me', None),
+        ('GET', '/api/tasks/', '/api/tasks/', None),
+        ('GET', '/api/tasks/today', '/api/tasks/today', None),
+        ('GET', '/api/tasks/<int:task_id>', f'/api/tasks/{task_ids[0]}', None),
+        ('GET', '/api/tasks/changes', '/api/tasks/changes', None),
+        ('POST', '/api/tasks/batch', '/api/tasks/batch', {'operations': [
+            {'op': 'create', 'title': f'Batch task {i}', 'due_at': (today + timedelta(hours=i)).isoformat()}
+            for i in range(20)
+        ] + [
+            {'op': 'update', 'id': task_ids[1], 'title': 'Renamed'},
+            {'op': 'toggle', 'id': task_ids[2]},
+            {'op': 'delete', 'id': task_ids[3]}
+        ]}),
+        ('GET', '/api/agenda/', '/api/agenda', None),
+        ('GET', '/api/calendar/events/today', '/api/calendar/events/today', None),
+        ('GET', '/api/notifications/upcoming', '/api/notifications/upcoming', None),
+        ('GET', '/api/email/candidates', '/api/email/candidates', None),
+        ('POST', '/api/email/extract', '/api/email/extract', None),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description='SQL query budgets for key endpoints')
+    parser.add_argument('--tasks', type=int, default=200)
+    args = parser.parse_args()
+
+    app, db = create_bench_app()
+    user_id = create_user(app, db)
+    from ..models import EmailCandidate, Task
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add_all(
+            Task(user_id=user_id, title=f'Task {i}', due_at=now + timedelta(hours=i % 48))
+            for i in range(args.tasks)
+        )
+        db.session.add_all(
+            EmailCandidate(user_id=user_id, message_id=f'message-{i}', subject=f'Meetup {i}',
+                           body=f'Join us at 18:{i:02d}', received_at=now - timedelta(hours=i))
+            for i in range(20)
+        )
+        db.session.commit()
+        task_ids = [row[0] for row in db.session.query(Task.id).filter_by(user_id=user_id).limit(4)]
+    client = login_client(app, user_id)
+    service = FakeCalendarService({'primary': 0}, pages=1, per_page=50, now=now)
+    event_store.service_factory = lambda user: service
+    extraction_service.client = StubClient()
+
+    print(f"📊 Query counts with {args.tasks} tasks")
+    print("=" * 64)
+    failures = 0
+    for method, rule, path, payload in requests_to_check(task_ids):
+        budget = QUERY_BUDGETS[(method, rule)]
+        try:
+            response = client.open(path, method=method, json=payload)
+            count = int(response.headers['X-Query-Count'])
+            print(f"{method:5s} {rule:28s} {count:3d} / {budget:3d}  {response.status_code}")
+        except QueryBudgetExceeded as e:
+            failures += 1
+            print(f"{method:5s} {rule:28s} OVER BUDGET  {e}")
+
+    sys.exit(1 if failures else 0)
+
+if __name__ == '__main__':
+    main()
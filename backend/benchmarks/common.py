@@ -0,0 +1,50 @@
+"""
+Shared helpers for backend benchmarks
+"""
+
+import os
+import tempfile
+
+def create_bench_app(database_url=None):
+    """Create the Flask app against a throwaway database and return (app, db)"""
+    if database_url is None:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['DATABASE_URL'] = database_url
+    
+    from ..app import create_app, login_manager
+    from ..models import db, User
+    
+    app = create_app()
+    app.config['TESTING'] = True
+    
+    # Session cookies need a user loader to resolve the logged-in user
+    if login_manager._user_callback is None:
+        login_manager.user_loader(lambda user_id: db.session.get(User, int(user_id)))
+    
+    with app.app_context():
+        db.create_all()
+    return app, db
+
+def create_user(app, db, index=1):
+    """Insert a synthetic user and return its id"""
+    from ..models import User
+    
+    with app.app_context():
+        user = User(
+            email=f'bench{index}@example.com',
+            google_sub=f'bench-sub-{index}',
+            name=f'Bench User {index}',
+            access_token='bench-token',
+            refresh_token='bench-refresh'
+        )
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+
+def login_client(app, user_id):
+    """Return a test client with an authenticated session for a user"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
@@ -0,0 +1,235 @@
+"""
+Local Gmail API stand-in for benchmarks and manual checks.
+
+Serves the calls the scanner makes: ``users.getProfile``, ``messages.list``
+(``from:`` and ``newer_than:`` search), ``messages.get`` in ``metadata`` and
+``full`` formats, ``history.list`` including the 404 for an expired
+``startHistoryId``, and the multipart batch endpoint. A real googleapiclient
+service is pointed at it, so round-trips and response bytes are what the
+client library actually sends and receives.
+"""
+
+import base64
+import copy
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build_from_document
+
+from ..services.google_client import get_discovery_document
+
+_FROM_RE = re.compile(r'from:([^\s{}()]+)')
+_NEWER_RE = re.compile(r'newer_than:(\d+)d')
+
+def _encode(text):
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+class MockGmailAPI(ThreadingHTTPServer):
+    """In-memory mailbox with history records and a batch endpoint"""
+
+    daemon_threads = True
+
+    def __init__(self, latency=0.0, page_size=100):
+        super().__init__(('127.0.0.1', 0), MockGmailHandler)
+        self.latency = latency
+        self.page_size = page_size
+        self.messages = {}
+        self.order = []
+        self.history = []
+        self.history_id = 1000
+        # Oldest startHistoryId still answered; older ones get a 404
+        self.min_history_id = self.history_id
+        self.round_trips = 0
+        self.calls = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    @property
+    def root_url(self):
+        return f'http://127.0.0.1:{self.server_port}/'
+
+    def add_message(self, sender, subject, body, received_at, labels=('INBOX',)):
+        """Deliver a message; returns its id"""
+        with self.lock:
+            self.history_id += 1
+            message_id = f'{self.history_id:x}'
+            html_body = '<html><body>' + ''.join(f'<p>{line}</p>' for line in body.split('\n')) + '</body></html>'
+            self.messages[message_id] = {
+                'id': message_id,
+                'threadId': message_id,
+                'labelIds': list(labels),
+                'snippet': body[:120],
+                'historyId': str(self.history_id),
+                'internalDate': str(int(received_at.timestamp() * 1000)),
+                'sizeEstimate': len(body) + len(html_body),
+                'payload': {
+                    'mimeType': 'multipart/alternative',
+                    'headers': [
+                        {'name': 'From', 'value': sender},
+                        {'name': 'To', 'value': 'me@example.com'},
+                        {'name': 'Subject', 'value': subject},
+                        {'name': 'Date', 'value': received_at.strftime('%a, %d %b %Y %H:%M:%S +0000')},
+                        {'name': 'Message-ID', 'value': f'<{message_id}@mail.example.com>'},
+                    ],
+                    'parts': [
+                        {'mimeType': 'text/plain', 'body': {'size': len(body), 'data': _encode(body)}},
+                        {'mimeType': 'text/html', 'body': {'size': len(html_body), 'data': _encode(html_body)}},
+                    ]
+                },
+                '_sender': sender.lower(),
+                '_received': received_at.timestamp()
+            }
+            self.order.append(message_id)
+            self.history.append({
+                'id': str(self.history_id),
+                'messages': [{'id': message_id, 'threadId': message_id}],
+                'messagesAdded': [{'message': {'id': message_id, 'threadId': message_id, 'labelIds': list(labels)}}]
+            })
+            return message_id
+
+    def expire_history(self):
+        """Drop history records, as Gmail does after about a week"""
+        with self.lock:
+            self.history = []
+            self.min_history_id = self.history_id
+
+    def count(self, calls, size):
+        with self.lock:
+            self.round_trips += 1
+            self.calls += calls
+            self.bytes += size
+
+    def dispatch(self, path, query):
+        """Return (status, body) for one GET"""
+        parts = path.strip('/').split('/')
+        if parts[:4] != ['gmail', 'v1', 'users', 'me']:
+            return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+        resource = parts[4:]
+        if resource == ['profile']:
+            return 200, {'emailAddress': 'me@example.com', 'historyId': str(self.history_id)}
+        if resource == ['messages']:
+            return self._list(query)
+        if len(resource) == 2 and resource[0] == 'messages':
+            return self._get(resource[1], query)
+        if resource == ['history']:
+            return self._history(query)
+        return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+
+    def _page(self, items, query, key):
+        size = int(query.get('maxResults', [self.page_size])[0])
+        offset = int(query.get('pageToken', ['0'])[0])
+        body = {key: items[offset:offset + size]}
+        if offset + size < len(items):
+            body['nextPageToken'] = str(offset + size)
+        return body
+
+    def _list(self, query):
+        q = query.get('q', [''])[0]
+        senders = _FROM_RE.findall(q)
+        newer = _NEWER_RE.search(q)
+        cutoff = time.time() - int(newer.group(1)) * 86400 if newer else 0
+        with self.lock:
+            matches = [
+                {'id': message_id, 'threadId': message_id}
+                for message_id in reversed(self.order)
+                if self.messages[message_id]['_received'] >= cutoff
+                and (not senders or any(sender in self.messages[message_id]['_sender'] for sender in senders))
+            ]
+        body = self._page(matches, query, 'messages')
+        body['resultSizeEstimate'] = len(matches)
+        return 200, body
+
+    def _get(self, message_id, query):
+        with self.lock:
+            message = self.messages.get(message_id)
+        if message is None:
+            return 404, {'error': {'code': 404, 'message': 'Requested entity was not found.'}}
+        message = {key: value for key, value in message.items() if not key.startswith('_')}
+        if query.get('format', ['full'])[0] == 'metadata':
+            wanted = {name.lower() for name in query.get('metadataHeaders', [])}
+            payload = message['payload']
+            message['payload'] = {
+                'mimeType': payload['mimeType'],
+                'headers': [header for header in payload['headers'] if not wanted or header['name'].lower() in wanted]
+            }
+        return 200, message
+
+    def _history(self, query):
+        start = int(query['startHistoryId'][0])
+        with self.lock:
+            if start < self.min_history_id:
+                return 404, {'error': {'code': 404, 'message': 'Requested entity was not found.'}}
+            records = [record for record in self.history if int(record['id']) > start]
+            current = str(self.history_id)
+        body = self._page(records, query, 'history')
+        body['historyId'] = current
+        return 200, body
+
+class MockGmailHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        status, body = self.server.dispatch(url.path, parse_qs(url.query))
+        content = json.dumps(body).encode()
+        self.server.count(1, len(content))
+        self._reply(status, 'application/json', content)
+
+    def do_POST(self):
+        content = self.rfile.read(int(self.headers['Content-Length']))
+        message = BytesParser().parsebytes(
+            b'Content-Type: ' + self.headers['Content-Type'].encode() + b'\r\n\r\n' + content
+        )
+        parts = message.get_payload()
+        time.sleep(self.server.latency)
+
+        boundary = 'batch_mock_boundary'
+        chunks = []
+        for part in parts:
+            request_line = part.get_payload().split('\n', 1)[0].strip()
+            url = urlparse(request_line.split(' ')[1])
+            status, body = self.server.dispatch(url.path, parse_qs(url.query))
+            content_id = part['Content-ID'][1:-1]
+            chunks.append(
+                f'--{boundary}\r\nContent-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id}>\r\n\r\n'
+                f'HTTP/1.1 {status} {"OK" if status == 200 else "Error"}\r\n'
+                f'Content-Type: application/json\r\n\r\n{json.dumps(body)}\r\n'
+            )
+        chunks.append(f'--{boundary}--\r\n')
+        content = ''.join(chunks).encode()
+        self.server.count(len(parts), len(content))
+        self._reply(200, f'multipart/mixed; boundary={boundary}', content)
+
+    def _reply(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def start_mock_gmail(latency=0.0):
+    """Start a stand-in on a free local port"""
+    api = MockGmailAPI(latency)
+    threading.Thread(target=api.serve_forever, daemon=True).start()
+    return api
+
+def mock_service_factory(api):
+    """Real Gmail client whose discovery document points at the stand-in"""
+    document = copy.deepcopy(get_discovery_document('gmail', 'v1'))
+    document['rootUrl'] = api.root_url
+    credentials = Credentials(token='mock-token')
+
+    def factory(user):
+        return build_from_document(document, http=AuthorizedHttp(credentials, http=httplib2.Http()))
+    return factory
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the backend API with a JSON report
+
+Seeds a throwaway database with --users users and --tasks tasks per user,
+replaces Google Calendar and SMTP with in-process fakes (each with a
+configurable latency), signs a session cookie per user and drives a weighted
+mix of auth, calendar, tasks, agenda and notifications endpoints from
+--concurrency threads. Requests revalidate with If-None-Match the way browsers
+do.
+
+By default requests go through Flask's test client (WSGI in process). With
+--http the app is served by werkzeug's threaded server on a local port and
+driven over real HTTP connections instead.
+
+The report (p50/p95/p99 latency and throughput, overall and per endpoint) is
+JSON on stdout or in --output. --compare prints the change against an earlier
+report and exits 1 when any endpoint's p95 grew by more than --tolerance.
+
+Run from the repository root:
+    python -m backend.benchmarks.load_test --users 50 --tasks 200 --concurrency 8 --duration 20 --output before.json
+    python -m backend.benchmarks.load_test ... --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Background jobs would otherwise call the fakes outside the measured requests
+os.environ.setdefault('TOKEN_REFRESHER_ENABLED', 'False')
+os.environ.setdefault('DIGEST_SCHEDULER_ENABLED', 'False')
+
+from .bench_calendar_fanout import FakeCalendarService
+from .common import create_bench_app
+
+# (weight, name, method, path template, json body factory)
+SCENARIO = [
+    (6, 'GET /auth/me', 'GET', '/auth/me', None),
+    (14, 'GET /api/tasks/', 'GET', '/api/tasks/', None),
+    (10, 'GET /api/tasks/today', 'GET', '/api/tasks/today', None),
+    (6, 'GET /api/tasks/<id>', 'GET', '/api/tasks/{task_id}', None),
+    (6, 'GET /api/tasks/changes', 'GET', '/api/tasks/changes', None),
+    (4, 'POST /api/tasks/', 'POST', '/api/tasks/', lambda rng: {
+        'title': f'Load test task {rng.randrange(10 ** 6)}',
+        'due_at': (datetime.utcnow() + timedelta(hours=rng.randrange(48))).isoformat()
+    }),
+    (4, 'POST /api/tasks/<id>/toggle', 'POST', '/api/tasks/{task_id}/toggle', None),
+    (10, 'GET /api/calendar/events', 'GET', '/api/calendar/events?days=7', None),
+    (8, 'GET /api/calendar/events/today', 'GET', '/api/calendar/events/today', None),
+    (4, 'GET /api/calendar/events/all', 'GET', '/api/calendar/events/all?days=7', None),
+    (3, 'GET /api/calendar/calendars', 'GET', '/api/calendar/calendars', None),
+    (12, 'GET /api/agenda', 'GET', '/api/agenda', None),
+    (8, 'GET /api/notifications/upcoming', 'GET', '/api/notifications/upcoming', None),
+    (1, 'GET /api/notifications/daily-digest', 'GET', '/api/notifications/daily-digest', None),
+]
+
+class FakeSMTPPool:
+    """Stands in for the SMTP pool: counts messages after a fixed latency"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.sent = 0
+        self._lock = threading.Lock()
+
+    def send(self, msg):
+        time.sleep(self.latency)
+        with self._lock:
+            self.sent += 1
+
+    def close(self):
+        pass
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'throughput_rps': round(len(ordered) / elapsed, 2) if elapsed else None,
+        'mean_ms': ms(sum(ordered) / len(ordered)) if ordered else None,
+        'p50_ms': ms(percentile(ordered, 0.50)),
+        'p95_ms': ms(percentile(ordered, 0.95)),
+        'p99_ms': ms(percentile(ordered, 0.99)),
+        'max_ms': ms(ordered[-1]) if ordered else None
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def seed(app, db, users, tasks_per_user, rng):
+    """Insert users and tasks in bulk; returns {user_id: [task ids]}"""
+    from sqlalchemy import insert, select
+    from ..models import User, Task
+
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.execute(insert(User), [{
+            'id': i,
+            'email': f'load{i}@example.com',
+            'google_sub': f'load-sub-{i}',
+            'name': f'Load User {i}',
+            'access_token': 'load-token',
+            'refresh_token': 'load-refresh',
+            'token_expiry': now + timedelta(days=1),
+            'created_at': now,
+            'updated_at': now
+        } for i in range(1, users + 1)])
+
+        rows = []
+        for user_id in range(1, users + 1):
+            for i in range(tasks_per_user):
+                rows.append({
+                    'user_id': user_id,
+                    'title': f'Task {i}',
+                    'description': 'Seeded by the load test',
+                    'due_at': now + timedelta(hours=rng.randrange(-48, 24 * 14)),
+                    'completed': rng.random() < 0.3,
+                    'priority': rng.choice(('low', 'medium', 'high')),
+                    'created_at': now,
+                    'updated_at': now
+                })
+            if len(rows) >= 5000:
+                db.session.execute(insert(Task), rows)
+                rows = []
+        if rows:
+            db.session.execute(insert(Task), rows)
+        db.session.commit()
+
+        task_ids = {user_id: [] for user_id in range(1, users + 1)}
+        for user_id, task_id in db.session.execute(select(Task.user_id, Task.id)):
+            task_ids[user_id].append(task_id)
+        return task_ids
+
+def install_fakes(args):
+    """Point the Google and SMTP clients at local fakes"""
+    from ..services import mailer
+    from ..services.calendar_aggregate import calendar_aggregator
+    from ..services.event_cache import event_store
+
+    latencies = {'primary': args.google_latency}
+    latencies.update((f'team-{i}@group.calendar.google.com', args.google_latency) for i in range(args.calendars - 1))
+    service = FakeCalendarService(latencies, pages=1, per_page=args.events, now=datetime.utcnow())
+    event_store.service_factory = lambda user: service
+    calendar_aggregator.service_factory = lambda user: service
+    # The fake has no batch endpoint
+    calendar_aggregator.batch = False
+
+    smtp = FakeSMTPPool(args.smtp_latency)
+    mailer._pool = smtp
+    return smtp
+
+def session_cookie(app, user_id):
+    """Signed Flask-Login session for a user"""
+    serializer = app.session_interface.get_signing_serializer(app)
+    return serializer.dumps({'_user_id': str(user_id), '_fresh': True})
+
+class TestClientTransport:
+    """Requests through Flask's test client, one client per user per thread"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def client(self, user_id):
+        client = self.app.test_client()
+        client.set_cookie(self.app.config['SESSION_COOKIE_NAME'], session_cookie(self.app, user_id))
+        return client
+
+    def request(self, client, method, path, body, headers):
+        response = client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.headers.get('ETag')
+
+class HTTPTransport:
+    """Requests over HTTP to a werkzeug server, one keep-alive session per user per thread"""
+
+    def __init__(self, app):
+        import requests
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.app = app
+        self.requests = requests
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.base_url = f'http://127.0.0.1:{self.server.server_port}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def client(self, user_id):
+        session = self.requests.Session()
+        session.cookies.set(self.app.config['SESSION_COOKIE_NAME'], session_cookie(self.app, user_id))
+        return session
+
+    def request(self, client, method, path, body, headers):
+        response = client.request(method, self.base_url + path, json=body, headers=headers)
+        return response.status_code, response.headers.get('ETag')
+
+    def close(self):
+        self.server.shutdown()
+
+def run_load(args, transport, task_ids):
+    """Drive the scenario from --concurrency threads; returns (per-endpoint samples, elapsed)"""
+    weights = [entry[0] for entry in SCENARIO]
+    samples = {entry[1]: ([], [0]) for entry in SCENARIO}
+    deadline = time.perf_counter() + args.duration
+    budget = [args.requests]
+    budget_lock = threading.Lock()
+    user_ids = sorted(task_ids)
+
+    def take():
+        if args.requests is None:
+            return time.perf_counter() < deadline
+        with budget_lock:
+            budget[0] -= 1
+            return budget[0] >= 0
+
+    def worker(index):
+        rng = random.Random(args.seed * 1000 + index)
+        clients = {}
+        etags = {}
+        local = {entry[1]: ([], [0]) for entry in SCENARIO}
+        while take():
+            user_id = rng.choice(user_ids)
+            client = clients.get(user_id)
+            if client is None:
+                client = clients[user_id] = transport.client(user_id)
+
+            _, name, method, template, body_factory = rng.choices(SCENARIO, weights)[0]
+            tasks = task_ids[user_id]
+            path = template.format(task_id=rng.choice(tasks) if tasks else 0)
+            body = body_factory(rng) if body_factory else None
+            headers = {}
+            if method == 'GET' and (user_id, path) in etags:
+                headers['If-None-Match'] = etags[(user_id, path)]
+
+            start = time.perf_counter()
+            try:
+                status, etag = transport.request(client, method, path, body, headers)
+            except Exception:
+                status, etag = None, None
+            latencies, errors = local[name]
+            latencies.append(time.perf_counter() - start)
+            if status is None or status >= 400:
+                errors[0] += 1
+            elif etag and method == 'GET':
+                etags[(user_id, path)] = etag
+
+        for name, (latencies, errors) in local.items():
+            samples[name][0].extend(latencies)
+            samples[name][1][0] += errors[0]
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+def compare(report, baseline, tolerance):
+    """Print p95 and throughput changes against a baseline; returns regressed endpoints"""
+    regressions = []
+    print(f"\nvs {baseline.get('commit') or 'baseline'}:", file=sys.stderr)
+    for name, current in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before or not before.get('p95_ms') or not current.get('p95_ms'):
+            continue
+        change = current['p95_ms'] / before['p95_ms'] - 1
+        flag = '  REGRESSION' if change > tolerance else ''
+        print(f"  {name:38s} p95 {before['p95_ms']:8.2f} -> {current['p95_ms']:8.2f}ms ({change:+.0%}){flag}",
+              file=sys.stderr)
+        if flag:
+            regressions.append(name)
+    before, current = baseline.get('overall', {}), report['overall']
+    if before.get('throughput_rps') and current.get('throughput_rps'):
+        print(f"  {'overall throughput':38s} {before['throughput_rps']:8.1f} -> {current['throughput_rps']:8.1f} req/s",
+              file=sys.stderr)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrent API load test')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=200, help='Tasks per user')
+    parser.add_argument('--calendars', type=int, default=3, help='Calendars per user')
+    parser.add_argument('--events', type=int, default=100, help='Events per calendar')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20.0, help='Seconds to run (ignored with --requests)')
+    parser.add_argument('--requests', type=int, default=None, help='Total requests instead of a duration')
+    parser.add_argument('--google-latency', type=float, default=0.05, help='Fake Calendar API latency per call (s)')
+    parser.add_argument('--smtp-latency', type=float, default=0.02, help='Fake SMTP send latency (s)')
+    parser.add_argument('--http', action='store_true', help='Serve over HTTP instead of the test client')
+    parser.add_argument('--database-url', help='Database to seed (default: a temporary SQLite file)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='Earlier JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed p95 growth before failing --compare')
+    args = parser.parse_args()
+
+    app, db = create_bench_app(args.database_url)
+    task_ids = seed(app, db, args.users, args.tasks, random.Random(args.seed))
+    smtp = install_fakes(args)
+    transport = HTTPTransport(app) if args.http else TestClientTransport(app)
+
+    print(f"📊 {args.users} users × {args.tasks} tasks, {args.concurrency} threads, "
+          f"{'HTTP' if args.http else 'test client'}", file=sys.stderr)
+    try:
+        samples, elapsed = run_load(args, transport, task_ids)
+    finally:
+        if args.http:
+            transport.close()
+
+    all_latencies = [latency for latencies, _ in samples.values() for latency in latencies]
+    report = {
+        'benchmark': 'load_test',
+        'commit': git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'config': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'elapsed_s': round(elapsed, 3),
+        'emails_sent': smtp.sent,
+        'overall': summarize(all_latencies, sum(errors[0] for _, errors in samples.values()), elapsed),
+        'endpoints': {
+            name: summarize(latencies, errors[0], elapsed)
+            for name, (latencies, errors) in samples.items() if latencies
+        }
+    }
+
+    print("=" * 92, file=sys.stderr)
+    for name, stats in [('overall', report['overall'])] + list(report['endpoints'].items()):
+        print(f"{name:38s} {stats['requests']:7d} req  {stats['throughput_rps']:8.1f}/s  "
+              f"p50 {stats['p50_ms']:8.2f}  p95 {stats['p95_ms']:8.2f}  p99 {stats['p99_ms']:8.2f}ms  "
+              f"errors {stats['errors']}", file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as handle:
+            regressions = compare(report, json.load(handle), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+"""task query indexes
+
+Revision ID: 9b1f3c2d7a45
+Revises: 47e14962e8d2
+Create Date: 2026-10-17 00:24:10.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1f3c2d7a45'
+down_revision = '47e14962e8d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_user_due', ['user_id', 'due_at'], unique=False)
+        batch_op.create_index('ix_tasks_user_completed_due', ['user_id', 'completed', 'due_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_user_completed_due')
+        batch_op.drop_index('ix_tasks_user_due')
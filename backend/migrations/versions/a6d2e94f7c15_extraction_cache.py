@@ -0,0 +1,36 @@
+"""extraction cache
+
+Revision ID: a6d2e94f7c15
+Revises: f3c1a8d94b62
+Create Date: 2026-10-17 18:41:07.352918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d2e94f7c15'
+down_revision = 'f3c1a8d94b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('extraction_results',
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('result', sa.Text(), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_used_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('content_hash')
+    )
+    with op.batch_alter_table('extraction_results', schema=None) as batch_op:
+        batch_op.create_index('ix_extraction_results_last_used', ['last_used_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('extraction_results', schema=None) as batch_op:
+        batch_op.drop_index('ix_extraction_results_last_used')
+
+    op.drop_table('extraction_results')
@@ -0,0 +1,42 @@
+"""task delta sync
+
+Revision ID: c4d82e61f0b3
+Revises: 9b1f3c2d7a45
+Create Date: 2026-10-17 00:41:37.552810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d82e61f0b3'
+down_revision = '9b1f3c2d7a45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('task_deletions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('task_deletions', schema=None) as batch_op:
+        batch_op.create_index('ix_task_deletions_user_deleted', ['user_id', 'deleted_at'], unique=False)
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_user_updated', ['user_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_user_updated')
+
+    with op.batch_alter_table('task_deletions', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_deletions_user_deleted')
+
+    op.drop_table('task_deletions')
@@ -0,0 +1,26 @@
+"""task reminder index
+
+Revision ID: e7a95b3c1d20
+Revises: c4d82e61f0b3
+Create Date: 2026-10-17 14:12:05.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a95b3c1d20'
+down_revision = 'c4d82e61f0b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.create_index('ix_tasks_updated', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_index('ix_tasks_updated')
@@ -0,0 +1,54 @@
+"""email scanning
+
+Revision ID: f3c1a8d94b62
+Revises: e7a95b3c1d20
+Create Date: 2026-10-17 15:03:48.914207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c1a8d94b62'
+down_revision = 'e7a95b3c1d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('email_scan_states',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('senders', sa.Text(), nullable=True),
+    sa.Column('history_id', sa.String(length=32), nullable=True),
+    sa.Column('scanned_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('email_candidates',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('message_id', sa.String(length=64), nullable=False),
+    sa.Column('thread_id', sa.String(length=64), nullable=True),
+    sa.Column('sender', sa.String(length=255), nullable=True),
+    sa.Column('subject', sa.String(length=500), nullable=True),
+    sa.Column('date', sa.String(length=255), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=True),
+    sa.Column('snippet', sa.Text(), nullable=True),
+    sa.Column('body', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'message_id', name='uq_email_candidates_user_message')
+    )
+    with op.batch_alter_table('email_candidates', schema=None) as batch_op:
+        batch_op.create_index('ix_email_candidates_user_received', ['user_id', 'received_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('email_candidates', schema=None) as batch_op:
+        batch_op.drop_index('ix_email_candidates_user_received')
+
+    op.drop_table('email_candidates')
+    op.drop_table('email_scan_states')
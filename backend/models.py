@@ -1,9 +1,11 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+from .services.database import RoutingSession
 
-db = SQLAlchemy()
+# Read-only views can be routed to a replica (see services/database.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(UserMixin, db.Model):
     """User model for authentication and profile data"""
@@ -22,6 +24,9 @@ class User(UserMixin, db.Model):
     
     # Relationships
     tasks = db.relationship('Task', backref='user', lazy=True, cascade='all, delete-orphan')
+    task_deletions = db.relationship('TaskDeletion', lazy=True, cascade='all, delete-orphan')
+    email_scan_state = db.relationship('EmailScanState', uselist=False, lazy=True, cascade='all, delete-orphan')
+    email_candidates = db.relationship('EmailCandidate', lazy=True, cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<User {self.email}>'
@@ -39,6 +44,16 @@ class User(UserMixin, db.Model):
 class Task(db.Model):
     """Task model for user tasks"""
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Date-range listings (today, ?date=) and the daily digest
+        db.Index('ix_tasks_user_due', 'user_id', 'due_at'),
+        # Upcoming reminders filter on completed before the due window
+        db.Index('ix_tasks_user_completed_due', 'user_id', 'completed', 'due_at'),
+        # Delta sync reads changes since a watermark
+        db.Index('ix_tasks_user_updated', 'user_id', 'updated_at'),
+        # The reminder scheduler reads every user's changes since a watermark
+        db.Index('ix_tasks_updated', 'updated_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -53,6 +68,15 @@ class Task(db.Model):
     def __repr__(self):
         return f'<Task {self.title}>'
     
+    # Fields returned by to_dict(), selectable through ?fields=
+    API_FIELDS = ('id', 'user_id', 'title', 'description', 'due_at', 'completed', 'priority', 'created_at')
+    
+    @classmethod
+    def due_on(cls, day):
+        """Half-open range filter for tasks due on a date (index friendly)"""
+        start = datetime.combine(day, datetime.min.time())
+        return db.and_(cls.due_at >= start, cls.due_at < start + timedelta(days=1))
+    
     def to_dict(self):
         """Convert task to dictionary for API responses"""
         return {
@@ -64,4 +88,115 @@ class Task(db.Model):
             'completed': self.completed,
             'priority': self.priority,
             'created_at': self.created_at.isoformat() if self.created_at else None
-        } 
\ No newline at end of file
+        } 
+    
+    @staticmethod
+    def row_to_dict(row, fields):
+        """Convert a projected row (selected columns only) for API responses"""
+        result = {}
+        for field in fields:
+            value = getattr(row, field)
+            result[field] = value.isoformat() if isinstance(value, datetime) else value
+        return result
+
+class TaskDeletion(db.Model):
+    """Tombstone for a deleted task, reported by the delta sync endpoint"""
+    __tablename__ = 'task_deletions'
+    __table_args__ = (
+        db.Index('ix_task_deletions_user_deleted', 'user_id', 'deleted_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<TaskDeletion {self.task_id}>'
+
+class EmailScanState(db.Model):
+    """Monitored senders and Gmail history watermark for a user"""
+    __tablename__ = 'email_scan_states'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    senders = db.Column(db.Text)  # JSON list of addresses or domains
+    history_id = db.Column(db.String(32))
+    scanned_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<EmailScanState {self.user_id}>'
+    
+    @property
+    def sender_list(self):
+        return json.loads(self.senders) if self.senders else []
+    
+    @sender_list.setter
+    def sender_list(self, values):
+        self.senders = json.dumps(values)
+    
+    def to_dict(self):
+        """Convert scan state to dictionary for API responses"""
+        return {
+            'senders': self.sender_list,
+            'scanned_at': self.scanned_at.isoformat() if self.scanned_at else None
+        }
+
+class EmailCandidate(db.Model):
+    """Message from a monitored sender, stored for event extraction"""
+    __tablename__ = 'email_candidates'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'message_id', name='uq_email_candidates_user_message'),
+        # The popup lists the newest candidates
+        db.Index('ix_email_candidates_user_received', 'user_id', 'received_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    message_id = db.Column(db.String(64), nullable=False)
+    thread_id = db.Column(db.String(64))
+    sender = db.Column(db.String(255))
+    subject = db.Column(db.String(500))
+    date = db.Column(db.String(255))  # Date header as sent
+    received_at = db.Column(db.DateTime)
+    snippet = db.Column(db.Text)
+    body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<EmailCandidate {self.message_id}>'
+    
+    def to_dict(self):
+        """Convert candidate to dictionary for API responses"""
+        return {
+            'id': self.id,
+            'message_id': self.message_id,
+            'thread_id': self.thread_id,
+            'from': self.sender,
+            'subject': self.subject,
+            'date': self.date,
+            'received_at': self.received_at.isoformat() if self.received_at else None,
+            'snippet': self.snippet,
+            'text': self.body
+        }
+
+class ExtractionResult(db.Model):
+    """Cached model output for normalized email content, keyed by its hash"""
+    __tablename__ = 'extraction_results'
+    __table_args__ = (
+        # Eviction drops the least recently used rows
+        db.Index('ix_extraction_results_last_used', 'last_used_at'),
+    )
+    
+    content_hash = db.Column(db.String(64), primary_key=True)  # sha256 hex
+    result = db.Column(db.Text, nullable=False)  # JSON event, or null when none was found
+    model = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<ExtractionResult {self.content_hash[:12]}>'
+    
+    @property
+    def event(self):
+        return json.loads(self.result)
@@ -0,0 +1,79 @@
+from flask import Blueprint, current_app, request, jsonify, make_response
+from flask_login import login_required, current_user
+from googleapiclient.errors import HttpError
+from datetime import datetime, timedelta, timezone
+import os
+from ..services.agenda import agenda_version, iter_agenda, load_tasks
+from ..services.cache import get_cache
+from ..services.database import read_only
+from ..services.event_cache import event_store
+
+agenda_bp = Blueprint('agenda', __name__)
+
+MAX_AGENDA_DAYS = 31
+AGENDA_CACHE_TTL = int(os.getenv('AGENDA_CACHE_TTL', 300))
+
+def _parse_bound(value):
+    """Parse an ISO date or datetime query value into naive UTC"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@agenda_bp.route('/', methods=['GET'], strict_slashes=False)
+@login_required
+@read_only
+def get_agenda():
+    """Get calendar events and tasks merged into one time-ordered agenda"""
+    try:
+        # Defaults to today (UTC)
+        try:
+            if request.args.get('from'):
+                time_min = _parse_bound(request.args['from'])
+            else:
+                time_min = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+            time_max = _parse_bound(request.args['to']) if request.args.get('to') else time_min + timedelta(days=1)
+        except ValueError:
+            return jsonify({'error': 'Invalid date format'}), 400
+
+        if time_max <= time_min or time_max - time_min > timedelta(days=MAX_AGENDA_DAYS):
+            return jsonify({'error': f'Window must be positive and at most {MAX_AGENDA_DAYS} days'}), 400
+
+        calendar_error = None
+        try:
+            events = event_store.get_events(current_user, 'primary', time_min, time_max)
+        except HttpError as error:
+            events = []
+            calendar_error = f'Calendar API error: {error}'
+
+        # Unchanged agenda: answer 304 before loading or serializing any rows
+        etag = agenda_version(events, current_user.id, time_min, time_max, calendar_error)
+        if request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+        else:
+            # Same version already rendered (by another tab, device or worker)
+            cache = get_cache()
+            cache_key = f'agenda:{current_user.id}:{etag}'
+            data = cache.get(cache_key)
+            if data is None:
+                items = list(iter_agenda(events, load_tasks(current_user.id, time_min, time_max)))
+                body = {
+                    'success': True,
+                    'from': time_min.isoformat(),
+                    'to': time_max.isoformat(),
+                    'items': items,
+                    'count': len(items)
+                }
+                if calendar_error:
+                    body['calendar_error'] = calendar_error
+                data = jsonify(body).get_data()
+                cache.set(cache_key, data, AGENDA_CACHE_TTL)
+            response = current_app.response_class(data, mimetype='application/json')
+
+        response.set_etag(etag, weak=True)
+        # Let browsers keep the body but revalidate every poll
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,12 +1,13 @@
 from flask import Blueprint, request, jsonify, session, redirect, url_for
 from flask_login import login_user, logout_user, login_required, current_user
 from authlib.integrations.flask_client import OAuth
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 import os
 from datetime import datetime, timedelta
 from ..models import db, User
+from ..services.event_cache import event_store
+from ..services.token_manager import token_manager
+from ..services.conditional import conditional
+from ..services.session_auth import user_cache
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -63,7 +64,11 @@ def callback():
             user.picture = user_info.get('picture')
         
         db.session.commit()
+        token_manager.invalidate(user.id)
+        event_store.invalidate(user.id)
+        user_cache.invalidate(user.id)
         login_user(user)
+        user_cache.issue_claims(user)
         
         # Return success response for API calls
         if request.headers.get('Accept') == 'application/json':
@@ -85,10 +90,12 @@ def callback():
 def logout():
     """Logout user"""
     logout_user()
+    user_cache.clear_claims()
     return jsonify({'success': True, 'message': 'Logout successful'})
 
 @auth_bp.route('/me')
 @login_required
+@conditional(lambda: current_user.updated_at)
 def get_current_user():
     """Get current user information"""
     return jsonify({
@@ -104,22 +111,11 @@ def refresh_token():
         if not current_user.refresh_token:
             return jsonify({'error': 'No refresh token available'}), 400
         
-        credentials = Credentials(
-            token=current_user.access_token,
-            refresh_token=current_user.refresh_token,
-            token_uri='https://oauth2.googleapis.com/token',
-            client_id=os.getenv('GOOGLE_CLIENT_ID'),
-            client_secret=os.getenv('GOOGLE_CLIENT_SECRET')
-        )
-        
-        if credentials.expired and credentials.refresh_token:
-            credentials.refresh(Request())
-            
-            # Update user's tokens
-            current_user.access_token = credentials.token
-            current_user.token_expiry = datetime.utcnow() + timedelta(seconds=credentials.expiry.timestamp() - datetime.utcnow().timestamp())
-            db.session.commit()
-            
+        # Skip the token endpoint while the token is still valid; concurrent
+        # calls share one refresh
+        expiry = current_user.token_expiry
+        if expiry is None or expiry <= datetime.utcnow() + token_manager.margin:
+            token_manager.refresh(current_user.id, current_user.refresh_token)
             return jsonify({'success': True, 'message': 'Token refreshed'})
         
         return jsonify({'success': True, 'message': 'Token still valid'})
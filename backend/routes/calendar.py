@@ -1,38 +1,33 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from datetime import datetime, timedelta
-import os
+from ..services.event_cache import event_store
+from ..services.calendar_aggregate import calendar_aggregator
+from ..services.conditional import conditional, events_fingerprint
 
 calendar_bp = Blueprint('calendar', __name__)
 
-def get_calendar_service():
-    """Get Google Calendar service with user's credentials"""
-    credentials = Credentials(
-        token=current_user.access_token,
-        refresh_token=current_user.refresh_token,
-        token_uri='https://oauth2.googleapis.com/token',
-        client_id=os.getenv('GOOGLE_CLIENT_ID'),
-        client_secret=os.getenv('GOOGLE_CLIENT_SECRET')
-    )
-    
-    # Refresh token if expired
-    if credentials.expired and credentials.refresh_token:
-        credentials.refresh(Request())
-        
-        # Update user's access token
-        current_user.access_token = credentials.token
-        current_user.token_expiry = datetime.utcnow() + timedelta(seconds=credentials.expiry.timestamp() - datetime.utcnow().timestamp())
-        from ..models import db
-        db.session.commit()
-    
-    return build('calendar', 'v3', credentials=credentials)
+def _today_window():
+    today = datetime.utcnow().date()
+    return datetime.combine(today, datetime.min.time()), datetime.combine(today, datetime.max.time())
+
+def _events_version():
+    """Version of /events: the cached entries in the requested window"""
+    days = request.args.get('days', 1, type=int)
+    max_results = request.args.get('max_results', 50, type=int)
+    now = datetime.utcnow()
+    return events_fingerprint(event_store.get_events(current_user, 'primary', now, now + timedelta(days=days))[:max_results])
+
+def _today_events_version():
+    return events_fingerprint(event_store.get_events(current_user, 'primary', *_today_window()))
+
+def _calendars_version():
+    return [(calendar['id'], calendar.get('etag')) for calendar in calendar_aggregator.get_calendar_list(current_user)]
 
 @calendar_bp.route('/events')
 @login_required
+@conditional(_events_version)
 def get_events():
     """Get upcoming calendar events"""
     try:
@@ -42,56 +37,30 @@ def get_events():
         
         # Calculate time range
         now = datetime.utcnow()
-        time_min = now.isoformat() + 'Z'
-        time_max = (now + timedelta(days=days)).isoformat() + 'Z'
-        
-        service = get_calendar_service()
+        time_min = now
+        time_max = now + timedelta(days=days)
         
         # Get events from primary calendar
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=time_min,
-            timeMax=time_max,
-            maxResults=max_results,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
-        
-        # Format events for frontend
+        events = event_store.get_events(current_user, 'primary', time_min, time_max)[:max_results]
+        
+        # Format events for frontend (already sorted by start time)
         formatted_events = []
-        for event in events:
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end = event['end'].get('dateTime', event['end'].get('date'))
-            
-            # Convert to datetime objects for sorting
-            if 'T' in start:  # Has time
-                start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
-                end_dt = datetime.fromisoformat(end.replace('Z', '+00:00'))
-                is_all_day = False
-            else:  # All-day event
-                start_dt = datetime.fromisoformat(start)
-                end_dt = datetime.fromisoformat(end)
-                is_all_day = True
-            
+        for entry in events:
+            event = entry.event
             formatted_events.append({
                 'id': event['id'],
                 'title': event['summary'],
                 'description': event.get('description', ''),
-                'start': start,
-                'end': end,
-                'start_dt': start_dt.isoformat(),
-                'end_dt': end_dt.isoformat(),
-                'is_all_day': is_all_day,
+                'start': event['start'].get('dateTime', event['start'].get('date')),
+                'end': event['end'].get('dateTime', event['end'].get('date')),
+                'start_dt': entry.start_dt.isoformat(),
+                'end_dt': entry.end_dt.isoformat(),
+                'is_all_day': entry.is_all_day,
                 'location': event.get('location', ''),
                 'attendees': [attendee['email'] for attendee in event.get('attendees', [])],
                 'calendar_id': event.get('organizer', {}).get('email', 'primary')
             })
         
-        # Sort by start time
-        formatted_events.sort(key=lambda x: x['start_dt'])
-        
         return jsonify({
             'success': True,
             'events': formatted_events,
@@ -103,59 +72,80 @@ def get_events():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@calendar_bp.route('/events/all')
+@login_required
+def get_all_events():
+    """Get upcoming events merged across the user's calendars"""
+    try:
+        days = request.args.get('days', 1, type=int)
+        max_results = request.args.get('max_results', 250, type=int)
+        
+        # Explicit ?calendars=id1,id2 or every calendar selected in Google Calendar
+        calendars = request.args.get('calendars')
+        if calendars:
+            calendar_ids = [calendar_id for calendar_id in calendars.split(',') if calendar_id]
+        else:
+            calendar_ids = calendar_aggregator.selected_calendar_ids(current_user)
+        
+        now = datetime.utcnow()
+        entries, errors = calendar_aggregator.get_events(current_user, calendar_ids, now, now + timedelta(days=days))
+        
+        formatted_events = []
+        for calendar_id, entry in entries[:max_results]:
+            event = entry.event
+            formatted_events.append({
+                'id': event['id'],
+                'title': event.get('summary', ''),
+                'description': event.get('description', ''),
+                'start': event['start'].get('dateTime', event['start'].get('date')),
+                'end': event['end'].get('dateTime', event['end'].get('date')),
+                'start_dt': entry.start_dt.isoformat(),
+                'end_dt': entry.end_dt.isoformat(),
+                'is_all_day': entry.is_all_day,
+                'location': event.get('location', ''),
+                'attendees': [attendee['email'] for attendee in event.get('attendees', [])],
+                'calendar_id': calendar_id
+            })
+        
+        return jsonify({
+            'success': True,
+            'events': formatted_events,
+            'count': len(formatted_events),
+            'calendars': calendar_ids,
+            'errors': {calendar_id: str(error) for calendar_id, error in errors.items()}
+        })
+        
+    except HttpError as error:
+        return jsonify({'error': f'Calendar API error: {error}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @calendar_bp.route('/events/today')
 @login_required
+@conditional(_today_events_version)
 def get_today_events():
     """Get today's calendar events"""
     try:
         # Get today's events
-        today = datetime.utcnow().date()
-        time_min = datetime.combine(today, datetime.min.time()).isoformat() + 'Z'
-        time_max = datetime.combine(today, datetime.max.time()).isoformat() + 'Z'
-        
-        service = get_calendar_service()
-        
-        events_result = service.events().list(
-            calendarId='primary',
-            timeMin=time_min,
-            timeMax=time_max,
-            singleEvents=True,
-            orderBy='startTime'
-        ).execute()
-        
-        events = events_result.get('items', [])
+        events = event_store.get_events(current_user, 'primary', *_today_window())
         
-        # Format events
+        # Format events (already sorted by start time)
         formatted_events = []
-        for event in events:
-            start = event['start'].get('dateTime', event['start'].get('date'))
-            end = event['end'].get('dateTime', event['end'].get('date'))
-            
-            if 'T' in start:  # Has time
-                start_dt = datetime.fromisoformat(start.replace('Z', '+00:00'))
-                end_dt = datetime.fromisoformat(end.replace('Z', '+00:00'))
-                is_all_day = False
-            else:  # All-day event
-                start_dt = datetime.fromisoformat(start)
-                end_dt = datetime.fromisoformat(end)
-                is_all_day = True
-            
+        for entry in events:
+            event = entry.event
             formatted_events.append({
                 'id': event['id'],
                 'title': event['summary'],
                 'description': event.get('description', ''),
-                'start': start,
-                'end': end,
-                'start_dt': start_dt.isoformat(),
-                'end_dt': end_dt.isoformat(),
-                'is_all_day': is_all_day,
+                'start': event['start'].get('dateTime', event['start'].get('date')),
+                'end': event['end'].get('dateTime', event['end'].get('date')),
+                'start_dt': entry.start_dt.isoformat(),
+                'end_dt': entry.end_dt.isoformat(),
+                'is_all_day': entry.is_all_day,
                 'location': event.get('location', ''),
                 'type': 'calendar_event'
             })
         
-        # Sort by start time
-        formatted_events.sort(key=lambda x: x['start_dt'])
-        
         return jsonify({
             'success': True,
             'events': formatted_events,
@@ -169,13 +159,11 @@ def get_today_events():
 
 @calendar_bp.route('/calendars')
 @login_required
+@conditional(_calendars_version)
 def get_calendars():
     """Get user's available calendars"""
     try:
-        service = get_calendar_service()
-        
-        calendar_list = service.calendarList().list().execute()
-        calendars = calendar_list.get('items', [])
+        calendars = calendar_aggregator.get_calendar_list(current_user)
         
         formatted_calendars = []
         for calendar in calendars:
@@ -196,4 +184,12 @@ def get_calendars():
     except HttpError as error:
         return jsonify({'error': f'Calendar API error: {error}'}), 400
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500 
+
+@calendar_bp.route('/refresh', methods=['POST'])
+@login_required
+def refresh_events():
+    """Invalidate cached events so the next read re-syncs with Google"""
+    event_store.invalidate(current_user.id)
+    calendar_aggregator.invalidate(current_user.id)
+    return jsonify({'success': True, 'message': 'Calendar cache invalidated'})
\ No newline at end of file
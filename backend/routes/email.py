@@ -0,0 +1,146 @@
+from flask import Blueprint, request, jsonify
+from flask_login import login_required, current_user
+from googleapiclient.errors import HttpError
+from ..models import db, EmailCandidate, EmailScanState
+from ..services.database import read_only
+from ..services.event_extraction import extraction_service
+from ..services.gmail_scan import gmail_scanner, normalize_senders, sender_matches
+
+email_bp = Blueprint('email', __name__)
+
+MAX_CANDIDATES = 200
+
+@email_bp.route('/settings', methods=['GET'])
+@login_required
+def get_email_settings():
+    """Get the monitored sender addresses"""
+    try:
+        state = db.session.get(EmailScanState, current_user.id)
+
+        return jsonify({
+            'success': True,
+            'settings': state.to_dict() if state else {'senders': [], 'scanned_at': None}
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@email_bp.route('/settings', methods=['PUT'])
+@login_required
+def update_email_settings():
+    """Set the monitored sender addresses (or domains)"""
+    try:
+        data = request.get_json() or {}
+        senders = data.get('senders')
+        if not isinstance(senders, list) or not all(isinstance(sender, str) for sender in senders):
+            return jsonify({'error': 'senders must be a list of strings'}), 400
+        senders = normalize_senders(senders)
+
+        state = db.session.get(EmailScanState, current_user.id)
+        if state is None:
+            state = EmailScanState(user_id=current_user.id)
+            db.session.add(state)
+
+        if senders != state.sender_list:
+            state.sender_list = senders
+            # New senders need a search; history only covers mail after the watermark
+            state.history_id = None
+            for candidate in EmailCandidate.query.filter_by(user_id=current_user.id).all():
+                if not sender_matches(candidate.sender or '', senders):
+                    db.session.delete(candidate)
+
+        db.session.commit()
+
+        return jsonify({
+            'success': True,
+            'settings': state.to_dict()
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@email_bp.route('/scan', methods=['POST'])
+@login_required
+def scan_email():
+    """Fetch new mail from the monitored senders (flask scan-email scans every user)"""
+    try:
+        stats = gmail_scanner.scan(current_user)
+
+        return jsonify({
+            'success': True,
+            'scan': stats
+        })
+
+    except HttpError as error:
+        db.session.rollback()
+        return jsonify({'error': f'Gmail API error: {error}'}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@email_bp.route('/candidates', methods=['GET'])
+@login_required
+@read_only
+def get_email_candidates():
+    """Get stored messages from the monitored senders, newest first"""
+    try:
+        limit = min(request.args.get('limit', 50, type=int), MAX_CANDIDATES)
+
+        candidates = EmailCandidate.query.filter(
+            EmailCandidate.user_id == current_user.id
+        ).order_by(EmailCandidate.received_at.desc(), EmailCandidate.id.desc()).limit(limit).all()
+
+        return jsonify({
+            'success': True,
+            'candidates': [candidate.to_dict() for candidate in candidates],
+            'count': len(candidates)
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@email_bp.route('/extract', methods=['POST'])
+@login_required
+def extract_events():
+    """Extract events from stored candidates (cached by content across users)"""
+    try:
+        data = request.get_json(silent=True) or {}
+        candidate_ids = data.get('candidate_ids')
+        limit = data.get('limit', 50)
+        if not isinstance(limit, int) or isinstance(limit, bool) or limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        limit = min(limit, MAX_CANDIDATES)
+
+        query = EmailCandidate.query.filter(EmailCandidate.user_id == current_user.id)
+        if candidate_ids is not None:
+            if not isinstance(candidate_ids, list) or not all(
+                isinstance(i, int) and not isinstance(i, bool) for i in candidate_ids
+            ):
+                return jsonify({'error': 'candidate_ids must be a list of integers'}), 400
+            query = query.filter(EmailCandidate.id.in_(candidate_ids[:MAX_CANDIDATES]))
+        candidates = query.order_by(EmailCandidate.received_at.desc(), EmailCandidate.id.desc()).limit(limit).all()
+
+        # Read the rows first: the service commits, which expires them
+        extractions = [{
+            'candidate_id': candidate.id,
+            'message_id': candidate.message_id,
+            'from': candidate.sender,
+            'subject': candidate.subject,
+            'date': candidate.date
+        } for candidate in candidates]
+
+        cache = {}
+        for extraction, (event, status) in zip(extractions, extraction_service.extract_many(candidates)):
+            extraction.update(event=event, cache=status)
+            cache[status] = cache.get(status, 0) + 1
+
+        return jsonify({
+            'success': True,
+            'extractions': extractions,
+            'cache': cache
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
@@ -1,18 +1,69 @@
 from flask import Blueprint, request, jsonify
 from flask_login import login_required, current_user
-from datetime import datetime
-from ..models import db, Task
+import os
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, insert, update
+from ..models import db, Task, TaskDeletion
+from ..services.conditional import conditional, task_version
+from ..services.database import read_only
+from ..services.pagination import decode_cursor, encode_cursor, keyset_filter, keyset_order
 
 tasks_bp = Blueprint('tasks', __name__)
 
+# Listing order: due date, then priority and newest first; id breaks ties
+TASK_SORT_KEYS = (
+    (Task.due_at, False),
+    (Task.priority, True),
+    (Task.created_at, True),
+    (Task.id, True),
+)
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 500
+
+# Changes this recent are re-sent on the next poll so rows committed late by a
+# concurrent transaction (with an older updated_at) are never skipped
+SYNC_SAFETY_WINDOW = timedelta(seconds=int(os.getenv('TASK_SYNC_SAFETY_WINDOW', 5)))
+TOMBSTONE_RETENTION = timedelta(days=int(os.getenv('TASK_TOMBSTONE_RETENTION_DAYS', 30)))
+
+def _record_deletions(task_ids):
+    """Write tombstones for deleted tasks and prune expired ones"""
+    now = datetime.utcnow()
+    db.session.execute(insert(TaskDeletion), [
+        {'user_id': current_user.id, 'task_id': task_id, 'deleted_at': now}
+        for task_id in task_ids
+    ])
+    db.session.execute(
+        delete(TaskDeletion)
+        .where(TaskDeletion.user_id == current_user.id, TaskDeletion.deleted_at < now - TOMBSTONE_RETENTION)
+        .execution_options(synchronize_session=False)
+    )
+
+def _today_task_version():
+    """Today's list also changes at midnight (UTC)"""
+    return datetime.utcnow().date(), task_version()
+
+def _parse_due_at(value):
+    """Parse an ISO due date from a request body (None when empty)"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        raise ValueError('Invalid due date format')
+
 @tasks_bp.route('/', methods=['GET'])
 @login_required
+@read_only
+@conditional(task_version)
 def get_tasks():
-    """Get user's tasks with optional filtering"""
+    """Get user's tasks with optional filtering, projection and cursor pagination"""
     try:
         # Get query parameters
         date_filter = request.args.get('date')
         completed = request.args.get('completed')
+        limit = request.args.get('limit', type=int)
+        cursor = request.args.get('cursor')
+        fields = request.args.get('fields')
         
         # Build query
         query = Task.query.filter_by(user_id=current_user.id)
@@ -21,9 +72,7 @@ def get_tasks():
         if date_filter:
             try:
                 filter_date = datetime.fromisoformat(date_filter).date()
-                query = query.filter(
-                    db.func.date(Task.due_at) == filter_date
-                )
+                query = query.filter(Task.due_on(filter_date))
             except ValueError:
                 return jsonify({'error': 'Invalid date format'}), 400
         
@@ -32,17 +81,48 @@ def get_tasks():
             completed_bool = completed.lower() == 'true'
             query = query.filter(Task.completed == completed_bool)
         
+        # Continue after the last row of the previous page
+        if cursor:
+            try:
+                query = query.filter(keyset_filter(TASK_SORT_KEYS, decode_cursor(cursor, len(TASK_SORT_KEYS))))
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
+        # Select only the requested columns (plus the sort key for the cursor)
+        if fields:
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+            unknown = [field for field in fields if field not in Task.API_FIELDS]
+            if unknown:
+                return jsonify({'error': f'Unknown fields: {", ".join(unknown)}'}), 400
+            selected = list(dict.fromkeys(fields + [column.key for column, _ in TASK_SORT_KEYS]))
+            query = query.with_entities(*[getattr(Task, field) for field in selected])
+        
         # Get tasks ordered by due date and priority
-        tasks = query.order_by(
-            Task.due_at.asc().nullslast(),
-            Task.priority.desc(),
-            Task.created_at.desc()
-        ).all()
+        query = query.order_by(*keyset_order(TASK_SORT_KEYS))
+        
+        next_cursor = None
+        if limit is not None:
+            if limit < 1:
+                return jsonify({'error': 'limit must be positive'}), 400
+            limit = min(limit, MAX_PAGE_SIZE)
+            tasks = query.limit(limit + 1).all()
+            if len(tasks) > limit:
+                tasks = tasks[:limit]
+                last = tasks[-1]
+                next_cursor = encode_cursor([getattr(last, column.key) for column, _ in TASK_SORT_KEYS])
+        else:
+            tasks = query.all()
+        
+        if fields:
+            serialized = [Task.row_to_dict(task, fields) for task in tasks]
+        else:
+            serialized = [task.to_dict() for task in tasks]
         
         return jsonify({
             'success': True,
-            'tasks': [task.to_dict() for task in tasks],
-            'count': len(tasks)
+            'tasks': serialized,
+            'count': len(tasks),
+            'next_cursor': next_cursor
         })
         
     except Exception as e:
@@ -50,6 +130,8 @@ def get_tasks():
 
 @tasks_bp.route('/today')
 @login_required
+@read_only
+@conditional(_today_task_version)
 def get_today_tasks():
     """Get today's tasks"""
     try:
@@ -57,7 +139,7 @@ def get_today_tasks():
         
         tasks = Task.query.filter(
             Task.user_id == current_user.id,
-            db.func.date(Task.due_at) == today
+            Task.due_on(today)
         ).order_by(
             Task.due_at.asc().nullslast(),
             Task.priority.desc()
@@ -72,6 +154,51 @@ def get_today_tasks():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@tasks_bp.route('/changes')
+@login_required
+def get_task_changes():
+    """Get tasks changed and deleted since a watermark (delta sync)"""
+    try:
+        since = request.args.get('since')
+        now = datetime.utcnow()
+        
+        if since:
+            try:
+                since = datetime.fromisoformat(since.replace('Z', '+00:00'))
+            except ValueError:
+                return jsonify({'error': 'Invalid watermark'}), 400
+            # Stored timestamps are naive UTC
+            if since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+        
+        # Tombstones older than the retention window are gone, so clients that
+        # fell that far behind get a full snapshot instead
+        reset = not since or since < now - TOMBSTONE_RETENTION
+        
+        query = Task.query.filter(Task.user_id == current_user.id)
+        deleted = []
+        if not reset:
+            query = query.filter(Task.updated_at > since)
+            deleted = [
+                row.task_id for row in db.session.query(TaskDeletion.task_id).filter(
+                    TaskDeletion.user_id == current_user.id,
+                    TaskDeletion.deleted_at > since
+                )
+            ]
+        tasks = query.order_by(Task.updated_at.asc()).all()
+        
+        return jsonify({
+            'success': True,
+            'tasks': [task.to_dict() for task in tasks],
+            'deleted': deleted,
+            'reset': reset,
+            'watermark': (now - SYNC_SAFETY_WINDOW).isoformat(),
+            'count': len(tasks)
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @tasks_bp.route('/', methods=['POST'])
 @login_required
 def create_task():
@@ -113,8 +240,157 @@ def create_task():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _insert_tasks(rows):
+    """Insert task rows in one statement and return their ids in row order"""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        # SQLite has no sentinel for ordered RETURNING, so asking for one falls
+        # back to an INSERT per row; rowids are assigned in VALUES order anyway
+        return sorted(db.session.scalars(insert(Task).returning(Task.id), rows).all())
+    return db.session.scalars(insert(Task).returning(Task.id, sort_by_parameter_order=True), rows).all()
+
+@tasks_bp.route('/batch', methods=['POST'])
+@login_required
+def batch_tasks():
+    """Apply a list of create/update/delete/toggle operations in one transaction"""
+    try:
+        data = request.get_json()
+        operations = data.get('operations') if isinstance(data, dict) else None
+        
+        if not isinstance(operations, list) or not operations:
+            return jsonify({'error': 'operations must be a non-empty list'}), 400
+        if len(operations) > MAX_BATCH_SIZE:
+            return jsonify({'error': f'At most {MAX_BATCH_SIZE} operations per batch'}), 400
+        
+        # Validate every operation before touching the database
+        errors = []
+        creates, updates, deletes, toggles = [], [], [], []
+        seen_ids = set()
+        now = datetime.utcnow()
+        for index, operation in enumerate(operations):
+            try:
+                if not isinstance(operation, dict):
+                    raise ValueError('Operation must be an object')
+                op = operation.get('op')
+                if op not in ('create', 'update', 'delete', 'toggle'):
+                    raise ValueError('op must be one of create, update, delete, toggle')
+                
+                if op == 'create':
+                    if not operation.get('title'):
+                        raise ValueError('Title is required')
+                    creates.append((index, {
+                        'user_id': current_user.id,
+                        'title': operation['title'],
+                        'description': operation.get('description', ''),
+                        'due_at': _parse_due_at(operation.get('due_at')),
+                        'completed': bool(operation.get('completed', False)),
+                        'priority': operation.get('priority', 'medium'),
+                        'created_at': now,
+                        'updated_at': now
+                    }))
+                    continue
+                
+                task_id = operation.get('id')
+                if not isinstance(task_id, int) or isinstance(task_id, bool):
+                    raise ValueError('id must be an integer')
+                if task_id in seen_ids:
+                    raise ValueError('Task appears in more than one operation')
+                seen_ids.add(task_id)
+                
+                if op == 'update':
+                    values = {'id': task_id, 'updated_at': now}
+                    for field in ('title', 'description', 'priority'):
+                        if field in operation:
+                            values[field] = operation[field]
+                    if 'due_at' in operation:
+                        values['due_at'] = _parse_due_at(operation['due_at'])
+                    if 'completed' in operation:
+                        values['completed'] = bool(operation['completed'])
+                    updates.append((index, values))
+                elif op == 'delete':
+                    deletes.append((index, task_id))
+                else:
+                    toggles.append((index, task_id))
+            except ValueError as e:
+                errors.append({'index': index, 'error': str(e)})
+        
+        # One ownership check for every referenced task
+        if seen_ids:
+            owned = {
+                row.id for row in db.session.query(Task.id).filter(
+                    Task.user_id == current_user.id,
+                    Task.id.in_(seen_ids)
+                )
+            }
+            # Only operations that passed validation, so every id is an int
+            referenced = [(index, values['id']) for index, values in updates] + deletes + toggles
+            for index, task_id in referenced:
+                if task_id not in owned:
+                    errors.append({'index': index, 'error': 'Task not found'})
+        
+        if errors:
+            errors.sort(key=lambda error: error['index'])
+            return jsonify({'error': 'Invalid batch', 'results': errors}), 400
+        
+        results = [None] * len(operations)
+        
+        # Multi-row INSERT ... VALUES
+        if creates:
+            created_ids = _insert_tasks([values for _, values in creates])
+            for (index, _), task_id in zip(creates, created_ids):
+                results[index] = {'index': index, 'op': 'create', 'id': task_id}
+        
+        # Per-row values, executed as one executemany UPDATE by primary key
+        if updates:
+            db.session.execute(update(Task), [values for _, values in updates])
+            for index, values in updates:
+                results[index] = {'index': index, 'op': 'update', 'id': values['id']}
+        
+        # UPDATE ... WHERE id IN (...)
+        if toggles:
+            db.session.execute(
+                update(Task)
+                .where(Task.user_id == current_user.id, Task.id.in_([task_id for _, task_id in toggles]))
+                .values(completed=db.not_(db.func.coalesce(Task.completed, False)), updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+            for index, task_id in toggles:
+                results[index] = {'index': index, 'op': 'toggle', 'id': task_id}
+        
+        # DELETE ... WHERE id IN (...)
+        if deletes:
+            db.session.execute(
+                delete(Task)
+                .where(Task.user_id == current_user.id, Task.id.in_([task_id for _, task_id in deletes]))
+                .execution_options(synchronize_session=False)
+            )
+            _record_deletions([task_id for _, task_id in deletes])
+            for index, task_id in deletes:
+                results[index] = {'index': index, 'op': 'delete', 'id': task_id}
+        
+        db.session.commit()
+        
+        # Return the resulting state of every surviving task in one query
+        changed_ids = [result['id'] for result in results if result['op'] != 'delete']
+        if changed_ids:
+            tasks = {task.id: task for task in Task.query.filter(Task.id.in_(changed_ids))}
+            for result in results:
+                if result['op'] != 'delete':
+                    result['task'] = tasks[result['id']].to_dict()
+        
+        return jsonify({
+            'success': True,
+            'results': results,
+            'count': len(results)
+        })
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
 @tasks_bp.route('/<int:task_id>', methods=['GET'])
 @login_required
+@read_only
+@conditional(task_version)
 def get_task(task_id):
     """Get a specific task"""
     try:
@@ -194,6 +470,7 @@ def delete_task(task_id):
             return jsonify({'error': 'Task not found'}), 404
         
         db.session.delete(task)
+        _record_deletions([task.id])
         db.session.commit()
         
         return jsonify({
@@ -0,0 +1,71 @@
+"""
+Time-ordered agenda of calendar events and tasks.
+
+Events come from the event store and tasks from the ``(user_id, due_at)``
+index, both already sorted by time, so the agenda is a streaming two-way
+``heapq.merge`` rather than a concatenate-and-sort. ``agenda_version`` derives
+an ETag from the events' ids and etags plus one aggregate query over the
+window's tasks, so an unchanged agenda is detected without loading or
+serializing any task rows.
+"""
+
+import hashlib
+import heapq
+
+from sqlalchemy import func, select
+
+from ..models import db, Task
+from .conditional import events_fingerprint
+from .interval_index import to_epoch
+
+def task_window(user_id, time_min, time_max):
+    """Filter for a user's tasks due in [time_min, time_max)"""
+    return (Task.user_id == user_id, Task.due_at >= time_min, Task.due_at < time_max)
+
+def agenda_version(events, user_id, time_min, time_max, calendar_error=None):
+    """Cheap fingerprint of an agenda window, used as its ETag"""
+    # Count catches deletions; max(updated_at) catches edits, moves and inserts
+    count, last_updated = db.session.execute(
+        select(func.count(Task.id), func.max(Task.updated_at)).where(*task_window(user_id, time_min, time_max))
+    ).one()
+
+    digest = hashlib.sha1()
+    digest.update(f'{time_min.isoformat()}|{time_max.isoformat()}|{count}|{last_updated}|{calendar_error}|'.encode())
+    digest.update(events_fingerprint(events).encode())
+    return digest.hexdigest()
+
+def load_tasks(user_id, time_min, time_max):
+    """Task rows due in the window, in agenda order"""
+    columns = [getattr(Task, field) for field in Task.API_FIELDS]
+    return db.session.execute(
+        select(*columns)
+        .where(*task_window(user_id, time_min, time_max))
+        .order_by(Task.due_at.asc(), Task.priority.desc(), Task.id.asc())
+    ).all()
+
+def format_event(entry):
+    event = entry.event
+    return {
+        'type': 'calendar_event',
+        'id': event['id'],
+        'title': event.get('summary', ''),
+        'description': event.get('description', ''),
+        'start': event['start'].get('dateTime', event['start'].get('date')),
+        'end': event['end'].get('dateTime', event['end'].get('date')),
+        'start_dt': entry.start_dt.isoformat(),
+        'end_dt': entry.end_dt.isoformat(),
+        'is_all_day': entry.is_all_day,
+        'location': event.get('location', '')
+    }
+
+def format_task(row):
+    item = Task.row_to_dict(row, Task.API_FIELDS)
+    item['type'] = 'task'
+    return item
+
+def iter_agenda(events, task_rows):
+    """Merge time-sorted events and task rows into formatted agenda items"""
+    keyed_events = ((entry.start, 0, index, entry) for index, entry in enumerate(events))
+    keyed_tasks = ((to_epoch(row.due_at), 1, index, row) for index, row in enumerate(task_rows))
+    for _, kind, _, value in heapq.merge(keyed_events, keyed_tasks):
+        yield format_event(value) if kind == 0 else format_task(value)
@@ -0,0 +1,275 @@
+"""
+Cache backends shared by the calendar, auth and agenda code.
+
+``MemoryCache`` is an in-process LRU with per-entry TTLs and a bounded number
+of entries. ``RedisCache`` speaks the Redis protocol so every gunicorn worker
+sees the same values; it fails open (a Redis outage reads as misses and skipped
+writes, and is retried after a short back-off) so requests never fail because
+the cache is down. ``get_cache()`` returns the process-wide backend chosen by
+``CACHE_BACKEND``. Both keep hit/miss counters for ``stats()``.
+
+Redis values are JSON (orjson when installed), never pickle, so a value read
+back from Redis cannot run code. Datetimes and bytes round-trip through tagged
+objects; tuples come back as lists. A value that does not decode reads as a
+miss and is deleted.
+
+``None`` is never stored, so a ``None`` from ``get`` always means a miss.
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+def _default(value):
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    raise TypeError(f'Cannot cache {type(value).__name__}')
+
+def _object_hook(obj):
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return datetime.fromisoformat(obj['__datetime__'])
+        if '__bytes__' in obj:
+            return base64.b64decode(obj['__bytes__'])
+    return obj
+
+def encode(value):
+    """Serialize a cache value to JSON bytes"""
+    if orjson is not None:
+        # Datetimes go to _default so they keep their tag
+        return orjson.dumps(value, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+    return json.dumps(value, default=_default, separators=(',', ':')).encode()
+
+def decode(raw):
+    """Parse a value written by encode()"""
+    return json.loads(raw, object_hook=_object_hook)
+
+class BaseCache:
+    """Shared API and statistics"""
+
+    backend = None
+    # True when values are visible to other worker processes
+    shared = False
+
+    def __init__(self, default_ttl=None):
+        self.default_ttl = default_ttl if default_ttl is not None else int(os.getenv('CACHE_DEFAULT_TTL', 300))
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _count(self, found, missed):
+        self.hits += found
+        self.misses += missed
+
+    def get(self, key):
+        return self.get_many([key])[0]
+
+    def get_or_set(self, key, compute, ttl=None):
+        """Return the cached value, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.set(key, value, ttl)
+        return value
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.backend,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            'sets': self.sets,
+            'evictions': self.evictions,
+            'errors': self.errors
+        }
+
+class MemoryCache(BaseCache):
+    """In-process LRU cache with TTLs and a bounded size"""
+
+    backend = 'memory'
+
+    def __init__(self, max_entries=None, default_ttl=None, clock=time.monotonic):
+        super().__init__(default_ttl)
+        self.max_entries = max_entries or int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = self.clock()
+        values = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self._entries[key]
+                    entry = None
+                if entry is None:
+                    values.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    values.append(entry[1])
+            found = sum(value is not None for value in values)
+            self._count(found, len(keys) - found)
+        return values
+
+    def set(self, key, value, ttl=None):
+        if value is None:
+            return
+        expires_at = self.clock() + (ttl or self.default_ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            self.sets += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        stats = super().stats()
+        stats['entries'] = len(self._entries)
+        return stats
+
+class RedisCache(BaseCache):
+    """Redis-protocol cache shared by every worker (values are JSON)"""
+
+    backend = 'redis'
+    shared = True
+
+    def __init__(self, client=None, url=None, prefix=None, default_ttl=None, retry_after=5.0):
+        super().__init__(default_ttl)
+        if client is None:
+            url = url or os.getenv('CACHE_REDIS_URL') or os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+            client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.client = client
+        self.prefix = prefix if prefix is not None else os.getenv('CACHE_KEY_PREFIX', 'agendify:')
+        self.retry_after = retry_after
+        self._down_until = 0.0
+        # Counters are updated from every request thread
+        self._lock = threading.Lock()
+
+    def _count(self, found, missed):
+        with self._lock:
+            super()._count(found, missed)
+
+    def _available(self):
+        return time.monotonic() >= self._down_until
+
+    def _failed(self):
+        # Skip Redis for a moment instead of paying a timeout on every call
+        with self._lock:
+            self.errors += 1
+        self._down_until = time.monotonic() + self.retry_after
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        if not self._available():
+            self._count(0, len(keys))
+            return [None] * len(keys)
+        try:
+            raw = self.client.mget([self.prefix + key for key in keys])
+        except Exception:
+            self._failed()
+            self._count(0, len(keys))
+            return [None] * len(keys)
+
+        values = []
+        corrupt = []
+        for key, item in zip(keys, raw):
+            try:
+                values.append(decode(item) if item is not None else None)
+            except ValueError:
+                # Not written by encode() (corrupt, or another app's key): a miss
+                values.append(None)
+                corrupt.append(key)
+        if corrupt:
+            self.delete(*corrupt)
+        found = sum(value is not None for value in values)
+        self._count(found, len(keys) - found)
+        return values
+
+    def set(self, key, value, ttl=None):
+        if value is None or not self._available():
+            return
+        # Outside the try: a value that cannot be serialized is a caller bug,
+        # not a Redis outage
+        payload = encode(value)
+        try:
+            self.client.set(self.prefix + key, payload, ex=max(1, int(ttl or self.default_ttl)))
+        except Exception:
+            self._failed()
+            return
+        with self._lock:
+            self.sets += 1
+
+    def delete(self, *keys):
+        if not keys or not self._available():
+            return
+        try:
+            self.client.delete(*[self.prefix + key for key in keys])
+        except Exception:
+            self._failed()
+
+    def clear(self):
+        """Delete every key under this cache's prefix"""
+        try:
+            keys = list(self.client.scan_iter(match=self.prefix + '*', count=500))
+            if keys:
+                self.client.delete(*keys)
+        except Exception:
+            self._failed()
+
+def create_cache(backend=None):
+    """Build a cache from the environment, falling back to memory"""
+    backend = (backend or os.getenv('CACHE_BACKEND', 'memory')).lower()
+    # Without the redis package each worker keeps its own cache
+    if backend == 'redis' and redis is not None:
+        return RedisCache()
+    return MemoryCache()
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the process-wide cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_cache()
+    return _cache
+
+def set_cache(cache):
+    """Replace the process-wide cache (benchmarks, scripts)"""
+    global _cache
+    _cache = cache
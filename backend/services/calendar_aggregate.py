@@ -0,0 +1,147 @@
+"""
+Events aggregated across a user's calendars.
+
+Stale calendars are first brought up to date with batched API requests (one
+round-trip per page depth for all of them). Each selected calendar is then read
+through the event store from a bounded, process-wide thread pool, so anything
+the batch could not cover still costs roughly the slowest calendar rather than
+the sum of all of them. The per-calendar lists are already sorted
+by start time and are combined with a k-way ``heapq.merge``.
+"""
+
+import heapq
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from flask import current_app
+
+from ..models import db
+from .cache import get_cache
+from .event_cache import event_store
+from .google_client import get_calendar_service
+
+def _detached_user(user):
+    """Copy the fields the Google client needs, so pool threads never lazy-load
+    through the request's session"""
+    return SimpleNamespace(
+        id=user.id,
+        access_token=user.access_token,
+        refresh_token=user.refresh_token,
+        token_expiry=user.token_expiry
+    )
+
+def _merge_key(item):
+    return item[0].start, item[0].end
+
+class CalendarAggregator:
+    """Concurrent fan-out over a user's calendars with a k-way merge"""
+
+    def __init__(self, store=None, service_factory=None, workers=None, list_ttl=None, batch=None,
+                 cache=None):
+        self.store = store or event_store
+        self.service_factory = service_factory or get_calendar_service
+        self.workers = workers or int(os.getenv('CALENDAR_FANOUT_WORKERS', 8))
+        self.list_ttl = list_ttl if list_ttl is not None else int(os.getenv('CALENDAR_LIST_TTL', 300))
+        if batch is None:
+            batch = os.getenv('GOOGLE_BATCH_ENABLED', 'True').lower() == 'true'
+        self.batch = batch
+        self.cache = cache
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='calendar-fanout')
+            return self._executor
+
+    def get_calendar_list(self, user):
+        """Return the user's calendarList entries (all pages, cached for list_ttl)"""
+        cache = self.cache or get_cache()
+        calendars = cache.get(_list_key(user.id))
+        if calendars is not None:
+            return calendars
+
+        service = self.service_factory(user)
+        calendars = []
+        page_token = None
+        while True:
+            result = service.calendarList().list(pageToken=page_token).execute()
+            calendars.extend(result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                break
+
+        cache.set(_list_key(user.id), calendars, self.list_ttl)
+        return calendars
+
+    def selected_calendar_ids(self, user):
+        """Ids of the calendars the user has selected in Google Calendar"""
+        # calendarList omits 'selected' for hidden calendars
+        return [
+            calendar['id'] for calendar in self.get_calendar_list(user)
+            if calendar.get('selected') or calendar.get('primary')
+        ]
+
+    def invalidate(self, user_id):
+        (self.cache or get_cache()).delete(_list_key(user_id))
+
+    def get_events(self, user, calendar_ids, time_min, time_max):
+        """Return (merged entries, errors) for [time_min, time_max) across calendars.
+
+        Merged entries are (calendar_id, IndexedEvent) pairs sorted by start
+        time; an event shared into several calendars is returned once. A failing
+        calendar is reported in errors instead of failing the whole request.
+        """
+        if not calendar_ids:
+            return [], {}
+
+        app = current_app._get_current_object()
+        snapshot = _detached_user(user)
+
+        errors = {}
+        if self.batch and len(calendar_ids) > 1:
+            try:
+                errors = self.store.sync_many(snapshot, calendar_ids)
+            except Exception:
+                # Whole batch failed; the per-calendar reads below retry
+                errors = {}
+
+        def fetch(calendar_id):
+            with app.app_context():
+                try:
+                    entries = self.store.get_events(snapshot, calendar_id, time_min, time_max)
+                    return calendar_id, [(entry, calendar_id) for entry in entries], None
+                except Exception as e:
+                    return calendar_id, [], e
+                finally:
+                    db.session.remove()
+
+        pending = [calendar_id for calendar_id in calendar_ids if calendar_id not in errors]
+        if len(pending) == 1:
+            results = [fetch(pending[0])]
+        else:
+            results = list(self._pool().map(fetch, pending))
+
+        errors.update((calendar_id, error) for calendar_id, _, error in results if error is not None)
+        # The store orders each calendar by start only; the merge needs its
+        # inputs sorted by the same key (nearly sorted, so this is cheap)
+        streams = [sorted(entries, key=_merge_key) for _, entries, _ in results if entries]
+
+        merged = []
+        seen = set()
+        for entry, calendar_id in heapq.merge(*streams, key=_merge_key):
+            key = (entry.event.get('iCalUID', entry.event['id']), entry.start)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append((calendar_id, entry))
+        return merged, errors
+
+def _list_key(user_id):
+    return f'calendar-list:{user_id}'
+
+# Process-wide aggregator used by the routes
+calendar_aggregator = CalendarAggregator()
@@ -0,0 +1,92 @@
+"""
+Response compression.
+
+An ``after_request`` hook compresses buffered text and JSON responses above
+``COMPRESS_MIN_SIZE`` bytes with the best encoding the client accepts: brotli
+when the optional ``brotli`` package is installed, otherwise gzip. Streamed
+responses (the SSE notification stream), files and already-encoded bodies are
+left alone.
+"""
+
+import gzip
+import os
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript')
+
+def _gzip(data, level):
+    # mtime=0 keeps the output identical for identical bodies
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def _brotli(data, level):
+    return brotli.compress(data, quality=level)
+
+class Compressor:
+    """Negotiates an encoding and compresses eligible responses"""
+
+    def __init__(self, min_size=None, gzip_level=None, brotli_level=None):
+        self.min_size = min_size if min_size is not None else int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+        self.gzip_level = gzip_level if gzip_level is not None else int(os.getenv('COMPRESS_GZIP_LEVEL', 4))
+        # Past these levels the CPU cost grows much faster than the savings
+        self.brotli_level = brotli_level if brotli_level is not None else int(os.getenv('COMPRESS_BROTLI_LEVEL', 4))
+        self.encoders = {'gzip': (_gzip, self.gzip_level)}
+        if brotli is not None:
+            self.encoders['br'] = (_brotli, self.brotli_level)
+
+    def choose_encoding(self, accept_encodings):
+        """Pick the client's preferred encoding we support (ties favour brotli)"""
+        best, best_quality = None, 0
+        for encoding in ('br', 'gzip'):
+            quality = accept_encodings[encoding] if encoding in self.encoders else 0
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def eligible(self, response):
+        return (
+            200 <= response.status_code < 300
+            and response.status_code != 204
+            and not response.direct_passthrough
+            and not response.is_streamed
+            and 'Content-Encoding' not in response.headers
+            and response.mimetype in COMPRESSIBLE_TYPES
+            and 'no-transform' not in response.headers.get('Cache-Control', '')
+        )
+
+    def process(self, request, response):
+        """after_request hook"""
+        if not self.eligible(response):
+            return response
+
+        # The body depends on Accept-Encoding from here on, even when sent as-is
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        encode, level = self.encoders[encoding]
+        response.set_data(encode(data, level))
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+def init_app(app):
+    """Register the compression hook unless disabled"""
+    if os.getenv('COMPRESS_ENABLED', 'True').lower() != 'true':
+        return
+
+    compressor = Compressor()
+    app.extensions['compressor'] = compressor
+
+    @app.after_request
+    def compress_response(response):
+        return compressor.process(request, response)
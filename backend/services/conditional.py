@@ -0,0 +1,78 @@
+"""
+Conditional GET support for read endpoints.
+
+``@conditional(version)`` asks a cheap version function for the current
+state behind a response (a task count and ``max(updated_at)``, the etags of
+cached calendar entries, a user's ``updated_at``) and turns it into an ETag
+scoped to the user and the full request URL. A matching ``If-None-Match``
+gets a 304 without running the view; otherwise the view runs and its 200
+response carries the ETag. Tags are weak because the same JSON may be sent
+gzip- or brotli-encoded. Responses are marked ``private, no-cache`` so
+browsers keep the body but revalidate on every request.
+"""
+
+import hashlib
+from functools import wraps
+
+from flask import make_response, request
+from flask_login import current_user
+from sqlalchemy import func, select
+
+from ..models import db, Task
+
+CACHE_CONTROL = 'private, no-cache'
+
+def make_etag(*parts):
+    """Hash version parts together with the user and the request URL"""
+    digest = hashlib.sha1()
+    digest.update(f'{current_user.get_id()}|{request.full_path}'.encode())
+    for part in parts:
+        digest.update(b'|')
+        digest.update(str(part).encode())
+    return digest.hexdigest()
+
+def conditional(version):
+    """Answer 304 for an unchanged resource before running the view.
+
+    ``version(*view_args, **view_kwargs)`` returns anything with a stable
+    ``str()`` describing the current state. If it raises, the view runs as if
+    the request were unconditional.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                etag = make_etag(version(*args, **kwargs))
+            except Exception:
+                return view(*args, **kwargs)
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
+
+def task_version(*args, **kwargs):
+    """Version of the current user's tasks.
+
+    The count catches deletions; ``max(updated_at)`` catches inserts and edits.
+    Both come from the ``(user_id, updated_at)`` index.
+    """
+    return db.session.execute(
+        select(func.count(Task.id), func.max(Task.updated_at)).where(Task.user_id == current_user.id)
+    ).one()
+
+def events_fingerprint(entries):
+    """Version of a list of IndexedEvent entries from the event store"""
+    digest = hashlib.sha1()
+    for entry in entries:
+        event = entry.event
+        digest.update(f"{event['id']}:{event.get('etag') or event.get('updated', '')}|".encode())
+    return digest.hexdigest()
@@ -0,0 +1,131 @@
+"""
+Database engine profiles and read/write routing.
+
+``DATABASE_PROFILE`` picks how engines are configured (``auto`` chooses from
+the ``DATABASE_URL`` scheme):
+
+- ``sqlite``: WAL journaling so readers never block the writer,
+  ``synchronous=NORMAL``, a busy timeout instead of immediate "database is
+  locked" errors, and memory-mapped reads.
+- ``postgres``: a bounded pool per gunicorn worker (``DB_POOL_SIZE`` or
+  ``DB_MAX_CONNECTIONS`` split across ``WEB_CONCURRENCY`` workers),
+  ``pool_pre_ping``, connection recycling and a server-side statement timeout.
+- ``default``: SQLAlchemy's defaults.
+
+With ``DATABASE_READ_URL`` set, a ``read`` bind is created with the same
+profile, and views wrapped in ``@read_only`` send their queries to it. Replicas
+lag, so only wrap views that can show slightly older data and never write.
+"""
+
+import os
+from functools import wraps
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+READ_BIND = 'read'
+
+def resolve_profile(url, name=None):
+    """Profile name for a database URL"""
+    name = (name or os.getenv('DATABASE_PROFILE', 'auto')).lower()
+    if name != 'auto':
+        return name
+    if url.startswith('sqlite'):
+        return 'sqlite'
+    if url.startswith(('postgresql', 'postgres')):
+        return 'postgres'
+    return 'default'
+
+def postgres_pool_size():
+    """(pool_size, max_overflow) for one worker process"""
+    max_connections = os.getenv('DB_MAX_CONNECTIONS')
+    if os.getenv('DB_POOL_SIZE') is None and max_connections:
+        # Hard cap: every worker's pool together stays under the server limit
+        workers = int(os.getenv('WEB_CONCURRENCY', 1))
+        return max(1, int(max_connections) // workers), 0
+    return int(os.getenv('DB_POOL_SIZE', 5)), int(os.getenv('DB_MAX_OVERFLOW', 5))
+
+def engine_options(profile):
+    """create_engine() keyword arguments for a profile"""
+    if profile == 'sqlite':
+        # Seconds; the same wait is applied as PRAGMA busy_timeout on connect
+        return {'connect_args': {'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000)) / 1000}}
+    if profile == 'postgres':
+        pool_size, max_overflow = postgres_pool_size()
+        return {
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+            'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+            'pool_pre_ping': True,
+            'connect_args': {
+                'options': f"-c statement_timeout={int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 5000))}",
+                'application_name': os.getenv('DB_APPLICATION_NAME', 'agendify')
+            }
+        }
+    return {}
+
+def sqlite_pragmas():
+    return (
+        ('journal_mode', 'WAL'),
+        ('synchronous', 'NORMAL'),
+        ('busy_timeout', int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+        ('mmap_size', int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+        ('temp_store', 'MEMORY'),
+    )
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Engine 'connect' listener for the sqlite profile"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+def configure(app):
+    """Set engine options and the read bind before db.init_app(); returns the profile"""
+    url = app.config['SQLALCHEMY_DATABASE_URI']
+    profile = resolve_profile(url)
+    options = engine_options(profile)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {}).update(options)
+
+    read_url = os.getenv('DATABASE_READ_URL')
+    if read_url:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[READ_BIND] = dict(options, url=read_url)
+    app.config['DATABASE_PROFILE'] = profile
+    return profile
+
+def init_app(app, db):
+    """Attach connect-time settings to the engines created by db.init_app()"""
+    if app.config['DATABASE_PROFILE'] != 'sqlite':
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', set_sqlite_pragmas)
+
+class RoutingSession(Session):
+    """Session that reads from the read bind inside @read_only views"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        # Only SELECTs: writes a read-only view makes anyway (a token refresh,
+        # a touched timestamp) still go to the primary
+        if (bind is None and not self._flushing and clause is not None and clause.is_select
+                and has_app_context() and g.get('db_read_only')):
+            engine = self._db.engines.get(READ_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def read_only(view):
+    """Route a view's queries (and its conditional version check) to the read bind"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        try:
+            return view(*args, **kwargs)
+        finally:
+            g.db_read_only = False
+    return wrapper
@@ -0,0 +1,138 @@
+"""
+Daily digest delivery.
+
+``run_daily_digest`` walks every user in id-ordered chunks, loads the chunk's
+tasks for the day with a single query. A thread pool then fetches each user's
+events and renders and sends the digests over the pooled SMTP connections.
+Pool threads get detached copies of the users and plain task rows, never ORM
+objects from the main thread's session.
+Event states loaded only for the job are dropped after each digest. It runs
+from the ``flask send-digests`` command or, when ``DIGEST_SCHEDULER_ENABLED``
+is set, from an APScheduler cron job.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import click
+from flask import current_app
+from sqlalchemy import select
+
+from ..models import db, User, Task
+from .calendar_aggregate import _detached_user
+from .event_cache import event_store
+from .digest_render import render_digest
+from .mailer import build_message, get_pool
+from .query_profiler import profiled
+
+def digest_subject(today):
+    """Subject line for a day's digest"""
+    return f"Your Daily Agenda - {today.strftime('%B %d, %Y')}"
+
+def get_day_events(user, today):
+    """Today's calendar events for a user from the event store"""
+    time_min = datetime.combine(today, datetime.min.time())
+    time_max = datetime.combine(today, datetime.max.time())
+    return event_store.get_events(user, 'primary', time_min, time_max)
+
+def run_daily_digest(today=None, chunk_size=None, workers=None, pool=None):
+    """Send the digest to every user; returns delivery statistics"""
+    today = today or datetime.utcnow().date()
+    chunk_size = chunk_size or int(os.getenv('DIGEST_CHUNK_SIZE', 500))
+    workers = workers or int(os.getenv('DIGEST_WORKERS', 8))
+    pool = pool or get_pool()
+    subject = digest_subject(today)
+    stats = {'users': 0, 'sent': 0, 'failed': 0, 'event_errors': 0}
+
+    app = current_app._get_current_object()
+
+    def deliver(job):
+        """Fetch, render and send one digest; returns (delivered, events_failed)"""
+        user, email, tasks = job
+        user_id = user.id
+        # The job only passes through: keep the event store for active users
+        held = event_store.holds(user_id, 'primary')
+        with app.app_context():
+            try:
+                try:
+                    events, events_failed = get_day_events(user, today), False
+                except Exception as e:
+                    app.logger.warning('Digest events failed for user %s: %s', user_id, e)
+                    events, events_failed = [], True
+                html, text = render_digest(today, events, tasks)
+                pool.send(build_message(email, subject, html, text))
+                return True, events_failed
+            except Exception as e:
+                app.logger.warning('Digest delivery failed for user %s: %s', user_id, e)
+                return False, events_failed
+            finally:
+                if not held:
+                    event_store.reset(user_id, 'primary')
+                db.session.remove()
+
+    start = time.perf_counter()
+    last_id = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while True:
+            # Keyset walk over users keeps each chunk query cheap
+            users = User.query.filter(User.id > last_id).order_by(User.id).limit(chunk_size).all()
+            if not users:
+                break
+            last_id = users[-1].id
+
+            # One query for the whole chunk's tasks, as plain rows
+            tasks_by_user = {user.id: [] for user in users}
+            chunk_tasks = db.session.execute(
+                select(Task.user_id, Task.title, Task.due_at, Task.completed, Task.priority)
+                .where(Task.user_id.in_(tasks_by_user), Task.due_on(today))
+                .order_by(Task.user_id, Task.due_at.asc().nullslast())
+            ).all()
+            for task in chunk_tasks:
+                tasks_by_user[task.user_id].append(task)
+
+            # Calendar fetches run in the pool alongside rendering and sending
+            jobs = [(_detached_user(user), user.email, tasks_by_user[user.id]) for user in users]
+            for delivered, events_failed in executor.map(deliver, jobs):
+                stats['sent' if delivered else 'failed'] += 1
+                stats['event_errors'] += events_failed
+            stats['users'] += len(users)
+
+            # Release the chunk's ORM objects before loading the next one
+            db.session.expunge_all()
+
+    stats['elapsed'] = time.perf_counter() - start
+    return stats
+
+def init_app(app):
+    """Register the send-digests command and the optional scheduler"""
+    @app.cli.command('send-digests')
+    @click.option('--chunk-size', type=int, default=None)
+    @click.option('--workers', type=int, default=None)
+    def send_digests_command(chunk_size, workers):
+        """Send today's digest to every user"""
+        with profiled('send-digests'):
+            stats = run_daily_digest(chunk_size=chunk_size, workers=workers)
+        click.echo(
+            f"Sent {stats['sent']} of {stats['users']} digests "
+            f"({stats['failed']} failed) in {stats['elapsed']:.1f}s"
+        )
+
+    # Enable in exactly one process; every gunicorn worker would otherwise
+    # send its own copy
+    if os.getenv('DIGEST_SCHEDULER_ENABLED', 'False').lower() == 'true':
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        def job():
+            with app.app_context():
+                try:
+                    with profiled('daily-digest'):
+                        run_daily_digest()
+                finally:
+                    db.session.remove()
+
+        scheduler = BackgroundScheduler(timezone='UTC')
+        scheduler.add_job(job, 'cron', hour=int(os.getenv('DIGEST_HOUR', 7)), id='daily-digest', replace_existing=True)
+        scheduler.start()
+        app.extensions['digest_scheduler'] = scheduler
@@ -0,0 +1,109 @@
+"""
+Daily digest rendering.
+
+The HTML and plaintext layouts are split into fragments whose ``str.format``
+methods are bound once per process. Each digest is assembled as a list of
+parts and joined once, instead of growing a string with ``+=`` per row. Every
+user-supplied value in the HTML part (event titles, locations, task titles)
+goes through ``html.escape``. Rows are prepared once and shared by both parts.
+"""
+
+from functools import lru_cache
+from html import escape
+
+_HTML_HEADER = '<h2>📅 Your Daily Agenda for {day}</h2>\n\n<h3>🗓️ Calendar Events</h3>\n'.format
+_HTML_EVENT = '<div style="margin-bottom: 10px;">\n    <strong>{time}</strong> - {title}\n{location}</div>\n'.format
+_HTML_LOCATION = '    <br><em>📍 {0}</em>\n'.format
+_HTML_NO_EVENTS = '<p>No events scheduled for today.</p>\n'
+_HTML_TASKS_HEADER = '<h3>✅ Tasks</h3>\n'
+_HTML_TASK = '<div style="margin-bottom: 10px;">\n    {status} <strong>{title}</strong> - Due: {time}\n{priority}</div>\n'.format
+_HTML_PRIORITY = '    <br><em>Priority: {0}</em>\n'.format
+_HTML_NO_TASKS = '<p>No tasks due today.</p>\n'
+
+_TEXT_HEADER = 'Your Daily Agenda for {day}\n\nCalendar Events\n'.format
+_TEXT_EVENT = '- {time} - {title}{location}\n'.format
+_TEXT_NO_EVENTS = 'No events scheduled for today.\n'
+_TEXT_TASKS_HEADER = '\nTasks\n'
+_TEXT_TASK = '- [{check}] {title} - Due: {time}{priority}\n'.format
+_TEXT_NO_TASKS = 'No tasks due today.\n'
+
+@lru_cache(maxsize=1440)
+def _clock(hour, minute):
+    """12-hour clock label, e.g. 09:30 AM (at most one entry per minute of the day)"""
+    return f"{(hour % 12) or 12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+def digest_context(today, events, tasks):
+    """Prepare the rows shared by the HTML and plaintext parts"""
+    event_rows = []
+    for entry in events:
+        event = entry.event
+        event_rows.append({
+            'time': 'All Day' if entry.is_all_day else _clock(entry.start_dt.hour, entry.start_dt.minute),
+            'title': event.get('summary', ''),
+            'location': event.get('location', '')
+        })
+
+    task_rows = []
+    for task in tasks:
+        task_rows.append({
+            'time': _clock(task.due_at.hour, task.due_at.minute) if task.due_at else 'No due time',
+            'status': '✅' if task.completed else '⏳',
+            'completed': bool(task.completed),
+            'title': task.title,
+            'priority': task.priority.title() if task.priority and task.priority != 'medium' else ''
+        })
+
+    return {'day': today.strftime('%A, %B %d, %Y'), 'events': event_rows, 'tasks': task_rows}
+
+def render_digest_html(context):
+    """Render the HTML part from a digest context"""
+    parts = [_HTML_HEADER(day=context['day'])]
+    for row in context['events']:
+        parts.append(_HTML_EVENT(
+            time=row['time'],
+            title=escape(row['title']),
+            location=_HTML_LOCATION(escape(row['location'])) if row['location'] else ''
+        ))
+    if not context['events']:
+        parts.append(_HTML_NO_EVENTS)
+
+    parts.append(_HTML_TASKS_HEADER)
+    for row in context['tasks']:
+        parts.append(_HTML_TASK(
+            status=row['status'],
+            title=escape(row['title']),
+            time=row['time'],
+            priority=_HTML_PRIORITY(escape(row['priority'])) if row['priority'] else ''
+        ))
+    if not context['tasks']:
+        parts.append(_HTML_NO_TASKS)
+    return ''.join(parts)
+
+def render_digest_text(context):
+    """Render the plaintext part from a digest context"""
+    parts = [_TEXT_HEADER(day=context['day'])]
+    for row in context['events']:
+        parts.append(_TEXT_EVENT(
+            time=row['time'],
+            title=row['title'],
+            location=f" ({row['location']})" if row['location'] else ''
+        ))
+    if not context['events']:
+        parts.append(_TEXT_NO_EVENTS)
+
+    parts.append(_TEXT_TASKS_HEADER)
+    for row in context['tasks']:
+        parts.append(_TEXT_TASK(
+            check='x' if row['completed'] else ' ',
+            title=row['title'],
+            time=row['time'],
+            priority=f" (Priority: {row['priority']})" if row['priority'] else ''
+        ))
+    if not context['tasks']:
+        parts.append(_TEXT_NO_TASKS)
+    return ''.join(parts)
+
+def render_digest(today, events, tasks):
+    """Render a digest; returns (html, text)"""
+    context = digest_context(today, events, tasks)
+    return render_digest_html(context), render_digest_text(context)
@@ -0,0 +1,393 @@
+"""
+Per-user calendar event store.
+
+Events are loaded with one full sync per (user, calendar) and then kept current
+with Calendar API ``syncToken`` incremental syncs. Window queries (today, the
+next N days, the next 2 hours) are answered locally. A state is re-synced once
+it is older than ``EVENT_CACHE_TTL`` seconds or after ``invalidate()``.
+``sync_many`` refreshes several calendars of one user with batched requests.
+At most ``EVENT_CACHE_MAX_STATES`` calendars are held per process; the least
+recently used go first, as does any state idle for a full-sync interval.
+
+With a shared cache backend (Redis) every sync also publishes a snapshot of
+the state, and a worker whose copy went stale adopts a newer snapshot from
+another worker before calling Google, so N workers cost about one sync per
+calendar per TTL instead of N. ``invalidate()`` stamps the user in the shared
+cache so older snapshots are ignored; other workers notice within one TTL.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from googleapiclient.errors import HttpError
+
+from .cache import get_cache
+from .google_batch import execute_paged
+from .google_client import get_calendar_service
+from .interval_index import EventIndex, to_epoch
+
+class CalendarState:
+    """Locally held events and sync token for one user's calendar"""
+
+    def __init__(self, user_id=None, calendar_id=None):
+        self.user_id = user_id
+        self.calendar_id = calendar_id
+        self.cache_key = f'events:{user_id}:{calendar_id}'
+        self.events = {}
+        self.sync_token = None
+        self.window_start = None
+        self.window_end = None
+        self.synced_at = 0.0
+        self.full_synced_at = 0.0
+        self.used_at = 0.0
+        self.lock = threading.Lock()
+        self._index = None
+
+    def index(self):
+        """Return the interval index, rebuilding it after events changed"""
+        if self._index is None:
+            self._index = EventIndex.from_events(self.events.values())
+        return self._index
+
+    def covers(self, time_min, time_max):
+        """Check whether a query window lies inside the synced range"""
+        return (
+            self.window_start is not None
+            and self.window_start <= time_min
+            and time_max <= self.window_end
+        )
+
+class EventStore:
+    """Cache of calendar events keyed by user and calendar"""
+
+    def __init__(self, service_factory=None, ttl=None, lookback_days=None,
+                 horizon_days=None, full_sync_interval=None, max_states=None, cache=None, clock=time.time):
+        self.service_factory = service_factory or get_calendar_service
+        self.ttl = ttl if ttl is not None else int(os.getenv('EVENT_CACHE_TTL', 60))
+        self.lookback_days = lookback_days if lookback_days is not None else int(os.getenv('EVENT_CACHE_LOOKBACK_DAYS', 1))
+        self.horizon_days = horizon_days if horizon_days is not None else int(os.getenv('EVENT_CACHE_HORIZON_DAYS', 31))
+        self.full_sync_interval = full_sync_interval if full_sync_interval is not None else int(os.getenv('EVENT_CACHE_FULL_SYNC_INTERVAL', 6 * 3600))
+        self.max_states = max_states or int(os.getenv('EVENT_CACHE_MAX_STATES', 10000))
+        self.cache = cache
+        # Wall-clock time, so sync times compare across worker processes
+        self.clock = clock
+        # Called with the CalendarState (lock held) whenever its events change
+        self.listeners = []
+        # Least recently used first
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _state(self, user_id, calendar_id):
+        key = (user_id, calendar_id)
+        now = self.clock()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = CalendarState(user_id, calendar_id)
+                self._states[key] = state
+            else:
+                self._states.move_to_end(key)
+            state.used_at = now
+            self._evict(now)
+            return state
+
+    def _evict(self, now):
+        """Drop least recently used states past max_states, and any left idle"""
+        # A state unused for a full-sync interval would be fully re-synced anyway
+        while self._states:
+            oldest = next(iter(self._states.values()))
+            if len(self._states) <= self.max_states and now - oldest.used_at < self.full_sync_interval:
+                return
+            self._states.popitem(last=False)
+
+    def get_events(self, user, calendar_id, time_min, time_max):
+        """Return IndexedEvent entries overlapping [time_min, time_max) by start time"""
+        return self._index_for(user, calendar_id, time_min, time_max).overlapping(
+            to_epoch(time_min), to_epoch(time_max)
+        )
+
+    def get_starting(self, user, calendar_id, time_min, time_max):
+        """Return IndexedEvent entries starting within [time_min, time_max]"""
+        return self._index_for(user, calendar_id, time_min, time_max).starting_between(
+            to_epoch(time_min), to_epoch(time_max)
+        )
+
+    def _index_for(self, user, calendar_id, time_min, time_max):
+        """Return an index able to answer a window (naive UTC datetimes)"""
+        state = self._state(user.id, calendar_id)
+
+        with state.lock:
+            self._adopt_shared(state)
+            self._refresh(user, calendar_id, state)
+
+            if state.covers(time_min, time_max):
+                return state.index()
+
+            # Window lies outside the synced range, ask Google directly
+            return EventIndex.from_events(self._list_window(user, calendar_id, time_min, time_max))
+
+    def invalidate(self, user_id, calendar_id=None):
+        """Force the next query for a user (or one calendar) to re-sync"""
+        with self._lock:
+            states = [
+                state for (uid, cid), state in self._states.items()
+                if uid == user_id and (calendar_id is None or cid == calendar_id)
+            ]
+        for state in states:
+            state.synced_at = 0.0
+
+        shared = self._shared_cache()
+        if shared is not None:
+            shared.set(_invalidated_key(user_id), self.clock(), self.full_sync_interval)
+            shared.delete(*[state.cache_key for state in states])
+
+    def _shared_cache(self):
+        """The cache backend when other workers can see it, otherwise None"""
+        cache = self.cache or get_cache()
+        return cache if cache.shared else None
+
+    def _adopt_shared(self, state):
+        """Take over a newer snapshot synced by another worker, if the local copy is stale"""
+        if self._sync_mode(state, self.clock()) is None:
+            return
+        shared = self._shared_cache()
+        if shared is None:
+            return
+
+        snapshot, invalidated_at = shared.get_many([state.cache_key, _invalidated_key(state.user_id)])
+        if snapshot is None or snapshot['synced_at'] <= max(state.synced_at, invalidated_at or 0.0):
+            return
+        state.events = snapshot['events']
+        state._index = None
+        state.sync_token = snapshot['sync_token']
+        state.window_start = snapshot['window_start']
+        state.window_end = snapshot['window_end']
+        state.synced_at = snapshot['synced_at']
+        state.full_synced_at = snapshot['full_synced_at']
+        self._notify(state)
+
+    def _publish(self, state):
+        """Share a freshly synced state with the other workers"""
+        shared = self._shared_cache()
+        if shared is None:
+            return
+        shared.set(state.cache_key, {
+            'events': state.events,
+            'sync_token': state.sync_token,
+            'window_start': state.window_start,
+            'window_end': state.window_end,
+            'synced_at': state.synced_at,
+            'full_synced_at': state.full_synced_at
+        }, self.full_sync_interval)
+
+    def _notify(self, state):
+        for listener in self.listeners:
+            listener(state)
+
+    def holds(self, user_id, calendar_id):
+        """Check whether a calendar's state is held in this process"""
+        with self._lock:
+            return (user_id, calendar_id) in self._states
+
+    def reset(self, user_id=None, calendar_id=None):
+        """Drop stored events (all users when user_id is None, all calendars when calendar_id is None)"""
+        with self._lock:
+            if user_id is None:
+                self._states.clear()
+            else:
+                for key in [key for key in self._states
+                            if key[0] == user_id and (calendar_id is None or key[1] == calendar_id)]:
+                    del self._states[key]
+
+    def _sync_mode(self, state, now):
+        """Return 'full', 'incremental' or None when the state is fresh"""
+        # Periodic full syncs pull in recurring instances that drift into the
+        # horizon, which incremental syncs never report
+        if (
+            state.window_start is None
+            or now - state.full_synced_at >= self.full_sync_interval
+            or (state.sync_token is None and now - state.synced_at >= self.ttl)
+        ):
+            return 'full'
+        if now - state.synced_at >= self.ttl:
+            return 'incremental'
+        return None
+
+    def _refresh(self, user, calendar_id, state):
+        """Bring a calendar state up to date if it is stale"""
+        mode = self._sync_mode(state, self.clock())
+        if mode == 'full':
+            self._full_sync(user, calendar_id, state)
+        elif mode == 'incremental':
+            try:
+                self._incremental_sync(user, calendar_id, state)
+            except HttpError as error:
+                # 410 Gone means the sync token expired
+                if error.resp.status != 410:
+                    raise
+                self._full_sync(user, calendar_id, state)
+
+    def sync_many(self, user, calendar_ids):
+        """Bring several calendars up to date using batched API requests.
+
+        Every round sends the next page of each stale calendar in one batch.
+        Returns {calendar_id: error} for calendars that could not be synced.
+        """
+        states = {calendar_id: self._state(user.id, calendar_id) for calendar_id in calendar_ids}
+        # Lock in a fixed order; single-calendar readers only ever hold one
+        ordered = sorted(states)
+        for calendar_id in ordered:
+            states[calendar_id].lock.acquire()
+        try:
+            for state in states.values():
+                self._adopt_shared(state)
+            now = self.clock()
+            modes = {calendar_id: self._sync_mode(state, now) for calendar_id, state in states.items()}
+            incremental = [calendar_id for calendar_id, mode in modes.items() if mode == 'incremental']
+            full = [calendar_id for calendar_id, mode in modes.items() if mode == 'full']
+            if not incremental and not full:
+                return {}
+
+            service = self.service_factory(user)
+            errors = {}
+
+            results = execute_paged(
+                service,
+                lambda calendar_id, page_token: self._changes_request(service, calendar_id, states[calendar_id], page_token),
+                incremental
+            )
+            for calendar_id, (pages, error) in results.items():
+                if error is None:
+                    self._apply_changes(states[calendar_id], pages)
+                elif isinstance(error, HttpError) and error.resp.status == 410:
+                    full.append(calendar_id)
+                else:
+                    errors[calendar_id] = error
+
+            window = self._full_window()
+            results = execute_paged(
+                service,
+                lambda calendar_id, page_token: self._window_request(service, calendar_id, window, page_token),
+                full
+            )
+            for calendar_id, (pages, error) in results.items():
+                if error is None:
+                    self._apply_full(states[calendar_id], pages, window)
+                else:
+                    errors[calendar_id] = error
+            return errors
+        finally:
+            for calendar_id in ordered:
+                states[calendar_id].lock.release()
+
+    def _full_window(self):
+        """Synced range for a full sync: lookback days before today to the horizon"""
+        now = datetime.utcnow()
+        window_start = datetime.combine(now.date(), datetime.min.time()) - timedelta(days=self.lookback_days)
+        return window_start, window_start + timedelta(days=self.lookback_days + self.horizon_days)
+
+    def _window_request(self, service, calendar_id, window, page_token):
+        return service.events().list(
+            calendarId=calendar_id,
+            timeMin=window[0].isoformat() + 'Z',
+            timeMax=window[1].isoformat() + 'Z',
+            singleEvents=True,
+            showDeleted=False,
+            pageToken=page_token
+        )
+
+    def _changes_request(self, service, calendar_id, state, page_token):
+        return service.events().list(
+            calendarId=calendar_id,
+            syncToken=state.sync_token,
+            singleEvents=True,
+            pageToken=page_token
+        )
+
+    def _full_sync(self, user, calendar_id, state):
+        """Replace the stored events with a fresh listing"""
+        window = self._full_window()
+        service = self.service_factory(user)
+        pages = []
+        page_token = None
+        while True:
+            result = self._window_request(service, calendar_id, window, page_token).execute()
+            pages.append(result)
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                break
+        self._apply_full(state, pages, window)
+
+    def _incremental_sync(self, user, calendar_id, state):
+        """Apply changes since the last sync token"""
+        service = self.service_factory(user)
+        pages = []
+        page_token = None
+        while True:
+            result = self._changes_request(service, calendar_id, state, page_token).execute()
+            pages.append(result)
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                break
+        self._apply_changes(state, pages)
+
+    def _apply_full(self, state, pages, window):
+        events = {}
+        for result in pages:
+            for event in result.get('items', []):
+                events[event['id']] = event
+
+        state.events = events
+        state._index = None
+        state.sync_token = pages[-1].get('nextSyncToken')
+        state.window_start, state.window_end = window
+        state.synced_at = state.full_synced_at = self.clock()
+        self._publish(state)
+        self._notify(state)
+
+    def _apply_changes(self, state, pages):
+        changed = False
+        for result in pages:
+            items = result.get('items', [])
+            if items:
+                state._index = None
+                changed = True
+            for event in items:
+                if event.get('status') == 'cancelled':
+                    state.events.pop(event['id'], None)
+                else:
+                    state.events[event['id']] = event
+
+        state.sync_token = pages[-1].get('nextSyncToken', state.sync_token)
+        state.synced_at = self.clock()
+        self._publish(state)
+        if changed:
+            self._notify(state)
+
+    def _list_window(self, user, calendar_id, time_min, time_max):
+        """Fetch a window straight from Google without caching it"""
+        service = self.service_factory(user)
+        items = []
+        page_token = None
+        while True:
+            result = service.events().list(
+                calendarId=calendar_id,
+                timeMin=time_min.isoformat() + 'Z',
+                timeMax=time_max.isoformat() + 'Z',
+                singleEvents=True,
+                orderBy='startTime',
+                pageToken=page_token
+            ).execute()
+            items.extend(result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return items
+
+def _invalidated_key(user_id):
+    return f'events-invalidated:{user_id}'
+
+# Process-wide store used by the routes
+event_store = EventStore()
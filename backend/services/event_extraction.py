@@ -0,0 +1,373 @@
+"""
+Event extraction from email candidates with a content-addressed result cache.
+
+Before extraction, a candidate's subject and body are normalized:
+- Re:/Fwd: prefixes, forwarding headers and ``>`` quote markers are removed;
+- Unicode is NFKC-folded and whitespace is collapsed.
+
+The cache key is a sha256 of the normalized text, the day the mail arrived
+(the model needs it for relative dates like "this Friday"), the model and the
+prompt version. So a message seen again on a later scan is a hit, and so is
+the same newsletter sent to many users or forwarded on the same day.
+
+Results live in ``extraction_results``, including "no event found", which
+most mail is. The least recently used rows are evicted past
+``EXTRACTION_CACHE_MAX_ENTRIES``. Misses go to the model in parallel.
+Identical content requested while a call is in flight waits for that call
+instead of making its own. Failed calls are not cached.
+
+The model client is anything with a ``model`` name and an
+``extract(content, reference_date)`` method. ``EXTRACTION_CLIENT=stub``
+swaps in a local regex stand-in for development and benchmarks.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..models import db, ExtractionResult
+
+# Bump when the prompt or result format changes; old entries stop matching
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = 'You are an expert at extracting event information from emails. Extract event details in a structured format.'
+
+EVENT_FIELDS = ('event_name', 'date', 'time', 'timezone', 'location', 'description')
+
+_SUBJECT_PREFIX_RE = re.compile(r'^(?:\s*(?:re|fwd?|fw|aw|wg)\s*(?:\[\d+\])?\s*:)+\s*', re.IGNORECASE)
+_FORWARD_MARKER_RE = re.compile(r'^-{2,}\s*(?:forwarded message|original message)\s*-{2,}$', re.IGNORECASE)
+_HEADER_LINE_RE = re.compile(r'^(?:from|sent|date|subject|to|cc|reply-to)\s*:', re.IGNORECASE)
+_WROTE_RE = re.compile(r'^on\b.{0,200}\bwrote:$', re.IGNORECASE)
+_QUOTE_RE = re.compile(r'^(?:>\s?)+')
+_SPACE_RE = re.compile(r'\s+')
+_JSON_RE = re.compile(r'\{[\s\S]*\}')
+
+class ExtractionError(Exception):
+    """The model call failed or returned something unusable"""
+
+def normalize_email(subject, text):
+    """Subject and body reduced to what identifies the message for extraction"""
+    subject = _SUBJECT_PREFIX_RE.sub('', unicodedata.normalize('NFKC', subject or ''))
+    lines = []
+    in_headers = False
+    for line in unicodedata.normalize('NFKC', text or '').splitlines():
+        line = _SPACE_RE.sub(' ', _QUOTE_RE.sub('', line.strip())).strip()
+        if _FORWARD_MARKER_RE.match(line):
+            # A forward is keyed by what it forwards, not the note above it
+            lines = []
+            in_headers = True
+            continue
+        if in_headers:
+            if not line or _HEADER_LINE_RE.match(line):
+                continue
+            in_headers = False
+        if line and not _WROTE_RE.match(line):
+            lines.append(line)
+    return '\n'.join([_SPACE_RE.sub(' ', subject).strip()] + lines)
+
+def content_key(content, reference_date, model):
+    """Cache key for normalized content as sent to a model"""
+    material = f'{PROMPT_VERSION}\0{model}\0{reference_date}\0{content}'
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def build_prompt(content, reference_date):
+    return f"""
+Please extract event information from this email. Return ONLY a JSON object with the following structure:
+
+{{
+  "event_name": "Name of the event",
+  "date": "Event date in YYYY-MM-DD format",
+  "time": "Event time in HH:MM format (24-hour)",
+  "timezone": "Timezone (e.g., EST, PST, UTC)",
+  "location": "Event location if mentioned",
+  "description": "Brief event description",
+  "confidence": "High/Medium/Low based on clarity of information"
+}}
+
+If no event is found, return:
+{{
+  "event_name": null,
+  "date": null,
+  "time": null,
+  "timezone": null,
+  "location": null,
+  "description": null,
+  "confidence": "None"
+}}
+
+The email was received on {reference_date}. The first line is its subject.
+
+Email content:
+{content}
+
+Extract the event information:"""
+
+def parse_response(text):
+    """Event dict from a model reply, or None when it found no event"""
+    match = _JSON_RE.search(text or '')
+    if not match:
+        raise ExtractionError('No JSON found in model response')
+    try:
+        data = json.loads(match.group(0))
+    except ValueError as e:
+        raise ExtractionError(f'Invalid JSON in model response: {e}')
+    if not isinstance(data, dict) or not data.get('event_name'):
+        return None
+    event = {field: data.get(field) or None for field in EVENT_FIELDS}
+    event['confidence'] = data.get('confidence') or 'Low'
+    event['source'] = 'AI'
+    return event
+
+class OpenAIClient:
+    """Chat-completions extraction (the prompt the popup used to send itself)"""
+
+    def __init__(self, api_key=None, model=None, base_url=None, timeout=None):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.model = model or os.getenv('EXTRACTION_MODEL', 'gpt-4o-mini')
+        self.url = (base_url or os.getenv('OPENAI_BASE_URL', 'https://api.openai.com/v1')).rstrip('/') + '/chat/completions'
+        self.timeout = timeout or float(os.getenv('EXTRACTION_TIMEOUT', 30))
+        self._session = requests.Session()
+
+    def extract(self, content, reference_date):
+        if not self.api_key:
+            raise ExtractionError('OPENAI_API_KEY is not set')
+        response = self._session.post(
+            self.url,
+            headers={'Authorization': f'Bearer {self.api_key}'},
+            json={
+                'model': self.model,
+                'messages': [
+                    {'role': 'system', 'content': SYSTEM_PROMPT},
+                    {'role': 'user', 'content': build_prompt(content, reference_date)}
+                ],
+                'temperature': 0.1,  # Low temperature for consistent extraction
+                'max_tokens': 500
+            },
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            raise ExtractionError(f'OpenAI API error: {response.status_code}')
+        return parse_response(response.json()['choices'][0]['message']['content'])
+
+class StubClient:
+    """Local stand-in for the model: a time and date regex after a fixed delay"""
+
+    model = 'stub'
+
+    _TIME_RE = re.compile(r'\b([01]?\d|2[0-3]):([0-5]\d)\b')
+    _DATE_RE = re.compile(r'\b(\d{4}-\d{2}-\d{2})\b')
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def extract(self, content, reference_date):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        found = self._TIME_RE.search(content)
+        if not found:
+            return None
+        date = self._DATE_RE.search(content)
+        subject = content.split('\n', 1)[0]
+        return {
+            'event_name': subject or 'Unknown Event',
+            'date': date.group(1) if date else reference_date,
+            'time': f'{int(found.group(1)):02d}:{found.group(2)}',
+            'timezone': None,
+            'location': None,
+            'description': subject,
+            'confidence': 'Low',
+            'source': 'Stub'
+        }
+
+def make_client():
+    if os.getenv('EXTRACTION_CLIENT', 'openai').lower() == 'stub':
+        return StubClient()
+    return OpenAIClient()
+
+class _Flight:
+    """One in-progress model call that identical requests wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class ExtractionService:
+    """Cached, coalesced event extraction for EmailCandidate rows"""
+
+    def __init__(self, client=None, max_entries=None, max_chars=None, workers=None,
+                 touch_interval=None, clock=datetime.utcnow):
+        self.client = client or make_client()
+        self.max_entries = max_entries or int(os.getenv('EXTRACTION_CACHE_MAX_ENTRIES', 50000))
+        self.max_chars = max_chars or int(os.getenv('EXTRACTION_MAX_CHARS', 8000))
+        self.workers = workers or int(os.getenv('EXTRACTION_WORKERS', 4))
+        # Recency only needs to be coarse for LRU; hits skip the write in between
+        self.touch_interval = timedelta(seconds=touch_interval if touch_interval is not None else 3600)
+        self.clock = clock
+        self._flights = {}
+        self._counts = {'hits': 0, 'misses': 0, 'coalesced': 0, 'errors': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced'] + stats['errors']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def extract_many(self, candidates):
+        """(event or None, status) per candidate; status is hit, miss, coalesced, error or empty"""
+        now = self.clock()
+        keys, contents = [], {}
+        for candidate in candidates:
+            if not candidate.body:
+                keys.append(None)
+                continue
+            content = normalize_email(candidate.subject, candidate.body)[:self.max_chars]
+            reference_date = (candidate.received_at or now).date().isoformat()
+            key = content_key(content, reference_date, self.client.model)
+            keys.append(key)
+            contents[key] = (content, reference_date)
+
+        events = self._lookup(list(contents), now)
+        status = {key: 'hit' for key in events}
+        missing = [key for key in contents if key not in events]
+        if missing:
+            computed, computed_status = self._compute(missing, contents, now)
+            events.update(computed)
+            status.update(computed_status)
+
+        results = []
+        seen = set()
+        counts = {'hit': 0, 'miss': 0, 'coalesced': 0, 'error': 0}
+        for key in keys:
+            if key is None:
+                results.append((None, 'empty'))
+                continue
+            key_status = status[key]
+            if key in seen and key_status == 'miss':
+                # A duplicate in the same batch shares the one model call
+                key_status = 'coalesced'
+            seen.add(key)
+            counts[key_status] += 1
+            results.append((events.get(key), key_status))
+
+        with self._lock:
+            self._counts['hits'] += counts['hit']
+            self._counts['misses'] += counts['miss']
+            self._counts['coalesced'] += counts['coalesced']
+            self._counts['errors'] += counts['error']
+        return results
+
+    def _lookup(self, keys, now):
+        """Cached events for the keys, refreshing the recency of stale entries"""
+        if not keys:
+            return {}
+        rows = db.session.execute(
+            select(ExtractionResult.content_hash, ExtractionResult.result, ExtractionResult.last_used_at)
+            .where(ExtractionResult.content_hash.in_(keys))
+        ).all()
+        stale = [row.content_hash for row in rows if row.last_used_at < now - self.touch_interval]
+        if stale:
+            db.session.execute(
+                update(ExtractionResult).where(ExtractionResult.content_hash.in_(stale)).values(last_used_at=now)
+            )
+            db.session.commit()
+        return {row.content_hash: json.loads(row.result) for row in rows}
+
+    def _compute(self, keys, contents, now):
+        """Call the model for keys no other request is computing, and wait for the rest"""
+        led, joined = [], []
+        with self._lock:
+            for key in keys:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = _Flight()
+                    self._flights[key] = flight
+                    led.append((key, flight))
+                else:
+                    joined.append((key, flight))
+
+        # Model calls take seconds: give the connection back to the pool meanwhile
+        db.session.commit()
+
+        # Finish our own calls before waiting on anyone else's, so two
+        # requests that each lead part of the other's batch cannot deadlock
+        if led:
+            try:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(led))) as executor:
+                    outcomes = list(executor.map(self._call, [contents[key] for key, _ in led]))
+                for (key, flight), (event, error) in zip(led, outcomes):
+                    flight.result, flight.error = event, error
+                self._store([(key, flight.result) for key, flight in led if flight.error is None], now)
+            finally:
+                with self._lock:
+                    for key, _ in led:
+                        del self._flights[key]
+                for _, flight in led:
+                    flight.done.set()
+
+        events, status = {}, {}
+        for key, flight in led:
+            events[key] = flight.result
+            status[key] = 'miss' if flight.error is None else 'error'
+        for key, flight in joined:
+            flight.done.wait()
+            events[key] = flight.result
+            status[key] = 'coalesced' if flight.error is None else 'error'
+        return events, status
+
+    def _call(self, item):
+        content, reference_date = item
+        try:
+            return self.client.extract(content, reference_date), None
+        except Exception as e:
+            return None, e
+
+    def _store(self, items, now):
+        if not items:
+            return
+        db.session.add_all(self._row(key, event, now) for key, event in items)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another worker stored some of the same content first
+            db.session.rollback()
+            existing = set(db.session.scalars(
+                select(ExtractionResult.content_hash)
+                .where(ExtractionResult.content_hash.in_([key for key, _ in items]))
+            ))
+            db.session.add_all(self._row(key, event, now) for key, event in items if key not in existing)
+            db.session.commit()
+        self._evict()
+
+    def _row(self, key, event, now):
+        return ExtractionResult(content_hash=key, result=json.dumps(event), model=self.client.model,
+                                created_at=now, last_used_at=now)
+
+    def _evict(self):
+        """Drop the least recently used entries beyond max_entries"""
+        excess = db.session.scalar(select(func.count()).select_from(ExtractionResult)) - self.max_entries
+        if excess <= 0:
+            return
+        oldest = select(ExtractionResult.content_hash).order_by(ExtractionResult.last_used_at).limit(excess)
+        db.session.execute(delete(ExtractionResult).where(ExtractionResult.content_hash.in_(oldest)))
+        db.session.commit()
+        with self._lock:
+            self._counts['evictions'] += excess
+
+# Process-wide service used by the routes
+extraction_service = ExtractionService()
@@ -0,0 +1,299 @@
+"""
+Incremental Gmail scanning for event candidates.
+
+Each user has a scan state: the monitored senders and the Gmail ``historyId``
+reached by the last scan. The first scan lists recent mail from the senders
+with a search query. So does any scan after the history has expired, which
+Gmail reports as 404. Later scans read ``history.list`` from the watermark,
+so a mailbox with no new mail costs one API call.
+
+New messages are fetched in batch requests. History reports every new
+message, so a ``format=metadata`` fetch (From, Subject and Date only) checks
+the sender first. Only matching messages are fetched with ``format=full`` for
+their body. Search results are already limited to the senders and go straight
+to the full fetch. Matches are stored as EmailCandidate rows, so the popup
+reads precomputed candidates instead of calling Gmail itself.
+"""
+
+import base64
+import html
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from email.utils import parseaddr
+
+import click
+from flask import current_app
+from googleapiclient.errors import HttpError
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from ..models import db, User, EmailCandidate, EmailScanState
+from .google_batch import execute_batch
+from .google_client import get_gmail_service
+
+METADATA_HEADERS = ['From', 'Subject', 'Date']
+
+# Messages added with these labels are never candidates (search skips them too)
+SKIP_LABELS = {'DRAFT', 'SPAM', 'TRASH'}
+
+_SCRIPT_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+
+def normalize_senders(values):
+    """Lower-cased, de-duplicated sender addresses or domains"""
+    senders = []
+    for value in values:
+        value = value.strip().lower()
+        if value and value not in senders:
+            senders.append(value)
+    return senders
+
+def sender_matches(from_header, senders):
+    """Check a From header against addresses and domain entries (example.com or @example.com)"""
+    address = parseaddr(from_header)[1].lower()
+    for sender in senders:
+        if address == sender:
+            return True
+        domain = sender.lstrip('@')
+        if '@' not in domain and address.endswith('@' + domain):
+            return True
+    return False
+
+def search_query(senders, days):
+    """Gmail search for recent mail from any of the senders"""
+    return '{' + ' '.join(f'from:{sender}' for sender in senders) + '}' + f' newer_than:{days}d'
+
+def message_headers(message):
+    """Headers of a message keyed by lower-cased name"""
+    return {header['name'].lower(): header['value'] for header in message.get('payload', {}).get('headers', [])}
+
+def _decode(data):
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4)).decode('utf-8', errors='replace')
+
+def _find_part(part, mime_type):
+    """Decoded body of the first part with a MIME type, depth first"""
+    if part.get('mimeType') == mime_type and part.get('body', {}).get('data'):
+        return _decode(part['body']['data'])
+    for child in part.get('parts', []):
+        text = _find_part(child, mime_type)
+        if text:
+            return text
+    return None
+
+def message_text(payload):
+    """Plain text of a message payload; HTML is stripped when there is no text part"""
+    text = _find_part(payload, 'text/plain')
+    if text:
+        return text
+    markup = _find_part(payload, 'text/html')
+    if not markup:
+        return ''
+    text = html.unescape(_TAG_RE.sub(' ', _SCRIPT_RE.sub(' ', markup)))
+    return '\n'.join(line.strip() for line in _SPACE_RE.sub(' ', text).splitlines() if line.strip())
+
+class GmailScanner:
+    """Per-user incremental Gmail scans into EmailCandidate rows"""
+
+    def __init__(self, service_factory=None, lookback_days=None, max_messages=None,
+                 body_chars=None, retention_days=None, workers=None):
+        self.service_factory = service_factory or get_gmail_service
+        self.lookback_days = lookback_days or int(os.getenv('EMAIL_SCAN_LOOKBACK_DAYS', 30))
+        self.max_messages = max_messages or int(os.getenv('EMAIL_SCAN_MAX_MESSAGES', 200))
+        self.body_chars = body_chars or int(os.getenv('EMAIL_BODY_MAX_CHARS', 20000))
+        self.retention = timedelta(days=retention_days or int(os.getenv('EMAIL_CANDIDATE_RETENTION_DAYS', 30)))
+        self.workers = workers or int(os.getenv('EMAIL_SCAN_WORKERS', 4))
+        self._scanning = set()
+        self._lock = threading.Lock()
+
+    def scan(self, user, now=None):
+        """Store new mail from the user's monitored senders; returns scan stats"""
+        with self._lock:
+            if user.id in self._scanning:
+                # The running scan stores the same messages
+                return {'mode': 'busy', 'listed': 0, 'metadata': 0, 'full': 0, 'stored': 0, 'failed': 0}
+            self._scanning.add(user.id)
+        try:
+            return self._scan(user, now or datetime.utcnow())
+        finally:
+            with self._lock:
+                self._scanning.discard(user.id)
+
+    def _scan(self, user, now):
+        stats = {'mode': None, 'listed': 0, 'metadata': 0, 'full': 0, 'stored': 0, 'failed': 0}
+        state = db.session.get(EmailScanState, user.id)
+        senders = state.sender_list if state else []
+        if not senders:
+            return stats
+
+        service = self.service_factory(user)
+        message_ids = None
+        if state.history_id:
+            try:
+                message_ids, history_id = self._history(service, state.history_id)
+                stats['mode'] = 'incremental'
+            except HttpError as error:
+                # 404 means the watermark is older than the history Gmail keeps
+                if error.resp.status != 404:
+                    raise
+        if message_ids is None:
+            message_ids, history_id = self._search(service, senders)
+            stats['mode'] = 'full'
+        stats['listed'] = len(message_ids)
+
+        known = set()
+        if message_ids:
+            known = set(db.session.scalars(
+                select(EmailCandidate.message_id)
+                .where(EmailCandidate.user_id == user.id, EmailCandidate.message_id.in_(message_ids))
+            ))
+        new_ids = [message_id for message_id in message_ids if message_id not in known]
+
+        if stats['mode'] == 'full':
+            # Search results are already from the senders
+            matching, failed = new_ids, []
+        else:
+            metadata, failed = self._fetch(service, new_ids, format='metadata', metadataHeaders=METADATA_HEADERS)
+            matching = [
+                message_id for message_id in new_ids
+                if message_id in metadata and sender_matches(message_headers(metadata[message_id]).get('from', ''), senders)
+            ]
+            stats['metadata'] = len(new_ids)
+        full, failed_full = self._fetch(service, matching, format='full')
+        stats.update(full=len(matching), failed=len(failed) + len(failed_full))
+
+        for message_id in matching:
+            # from: also matches display names, so check the address itself
+            if message_id in full and sender_matches(message_headers(full[message_id]).get('from', ''), senders):
+                db.session.add(self._candidate(user.id, full[message_id]))
+                stats['stored'] += 1
+        db.session.execute(
+            delete(EmailCandidate)
+            .where(EmailCandidate.user_id == user.id, EmailCandidate.received_at < now - self.retention)
+        )
+
+        # After a failed fetch the watermark stays put so the next scan retries
+        # those messages; the ones stored now are skipped as known
+        if not failed and not failed_full:
+            state.history_id = history_id
+        state.scanned_at = now
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A scan in another worker stored the same messages first
+            db.session.rollback()
+            stats['stored'] = 0
+        return stats
+
+    def _history(self, service, start_history_id):
+        """Message ids added since a historyId, and the historyId to continue from"""
+        message_ids = []
+        seen = set()
+        page_token = None
+        while True:
+            result = service.users().history().list(
+                userId='me',
+                startHistoryId=start_history_id,
+                historyTypes=['messageAdded'],
+                pageToken=page_token
+            ).execute()
+            for record in result.get('history', []):
+                for added in record.get('messagesAdded', []):
+                    message = added['message']
+                    if message['id'] not in seen and not SKIP_LABELS.intersection(message.get('labelIds', [])):
+                        seen.add(message['id'])
+                        message_ids.append(message['id'])
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return message_ids, result.get('historyId', start_history_id)
+
+    def _search(self, service, senders):
+        """Recent message ids from the senders, and the historyId to continue from"""
+        # Read the watermark first: mail that arrives during the listing is
+        # picked up by the next history read instead of being missed
+        history_id = service.users().getProfile(userId='me').execute()['historyId']
+        message_ids = []
+        page_token = None
+        while len(message_ids) < self.max_messages:
+            result = service.users().messages().list(
+                userId='me',
+                q=search_query(senders, self.lookback_days),
+                maxResults=min(500, self.max_messages - len(message_ids)),
+                pageToken=page_token
+            ).execute()
+            message_ids.extend(message['id'] for message in result.get('messages', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                break
+        return message_ids, history_id
+
+    def _fetch(self, service, message_ids, **params):
+        """messages.get for many ids in batch requests; returns ({id: message}, failed ids)"""
+        requests = {
+            message_id: service.users().messages().get(userId='me', id=message_id, **params)
+            for message_id in message_ids
+        }
+        messages, failed = {}, []
+        for message_id, (message, error) in execute_batch(service, requests).items():
+            if error is None:
+                messages[message_id] = message
+            elif not (isinstance(error, HttpError) and error.resp.status == 404):
+                # 404: deleted since it was listed, nothing to retry
+                failed.append(message_id)
+        return messages, failed
+
+    def _candidate(self, user_id, message):
+        headers = message_headers(message)
+        internal_date = message.get('internalDate')
+        return EmailCandidate(
+            user_id=user_id,
+            message_id=message['id'],
+            thread_id=message.get('threadId'),
+            sender=headers.get('from', '')[:255],
+            subject=headers.get('subject', '')[:500],
+            date=headers.get('date', '')[:255],
+            received_at=datetime.utcfromtimestamp(int(internal_date) / 1000) if internal_date else None,
+            snippet=html.unescape(message.get('snippet', '')),
+            body=message_text(message.get('payload', {}))[:self.body_chars]
+        )
+
+    def scan_all(self):
+        """Scan every user with monitored senders (needs an app context); returns totals"""
+        user_ids = db.session.scalars(
+            select(EmailScanState.user_id).where(EmailScanState.senders.isnot(None))
+        ).all()
+        db.session.commit()
+        app = current_app._get_current_object()
+
+        def run(user_id):
+            with app.app_context():
+                try:
+                    return self.scan(db.session.get(User, user_id))
+                except Exception as e:
+                    app.logger.warning('Email scan failed for user %s: %s', user_id, e)
+                    return None
+                finally:
+                    db.session.remove()
+
+        totals = {'users': len(user_ids), 'stored': 0, 'errors': 0}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for stats in executor.map(run, user_ids):
+                if stats is None:
+                    totals['errors'] += 1
+                else:
+                    totals['stored'] += stats['stored']
+        return totals
+
+# Process-wide scanner used by the routes and the scan-email command
+gmail_scanner = GmailScanner()
+
+def init_app(app):
+    """Register the scan-email command"""
+    @app.cli.command('scan-email')
+    def scan_email_command():
+        """Scan every user's Gmail for new candidates"""
+        totals = gmail_scanner.scan_all()
+        click.echo(f"Stored {totals['stored']} candidates for {totals['users']} users ({totals['errors']} failed)")
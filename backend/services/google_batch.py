@@ -0,0 +1,63 @@
+"""
+Google API batch requests.
+
+``new_batch_http_request()`` sends up to 50 API calls as one multipart HTTP
+round-trip. ``execute_batch`` runs any number of independent requests in as
+few batches as possible and hands each caller its own response or error.
+``execute_paged`` does the same for list calls that follow ``nextPageToken``:
+every round batches the next page of each listing that still has one, so N
+paged listings cost as many round-trips as the longest one instead of the sum.
+"""
+
+MAX_BATCH_SIZE = 50
+
+def execute_batch(service, requests):
+    """Execute {key: HttpRequest} in batches; returns {key: (response, error)}"""
+    results = {}
+    items = list(requests.items())
+    for offset in range(0, len(items), MAX_BATCH_SIZE):
+        chunk = items[offset:offset + MAX_BATCH_SIZE]
+
+        if len(chunk) == 1:
+            # A single call is cheaper without the multipart envelope
+            key, request = chunk[0]
+            try:
+                results[key] = (request.execute(), None)
+            except Exception as e:
+                results[key] = (None, e)
+            continue
+
+        keys = {}
+
+        def callback(request_id, response, exception):
+            results[keys[request_id]] = (response, exception)
+
+        batch = service.new_batch_http_request(callback=callback)
+        for index, (key, request) in enumerate(chunk):
+            keys[str(index)] = key
+            batch.add(request, request_id=str(index))
+        batch.execute()
+    return results
+
+def execute_paged(service, make_request, keys):
+    """Follow nextPageToken for several listings at once.
+
+    ``make_request(key, page_token)`` returns the HttpRequest for one page.
+    Returns {key: (pages, error)} where pages is the list of page responses in
+    order.
+    """
+    pages = {key: [] for key in keys}
+    errors = {}
+    pending = {key: None for key in keys}
+    while pending:
+        requests = {key: make_request(key, page_token) for key, page_token in pending.items()}
+        pending = {}
+        for key, (response, error) in execute_batch(service, requests).items():
+            if error is not None:
+                errors[key] = error
+                continue
+            pages[key].append(response)
+            if response.get('nextPageToken'):
+                pending[key] = response['nextPageToken']
+
+    return {key: (pages[key], errors.get(key)) for key in keys}
@@ -0,0 +1,93 @@
+"""
+Shared Google API client factory.
+
+Building a client with ``googleapiclient.discovery.build`` reads and parses the
+discovery document and creates a fresh HTTP transport on every call. This module
+parses each discovery document once per process, keeps one keep-alive
+``httplib2.Http`` per worker thread and only wraps it with the user's
+credentials per request. Credentials come from the token manager, which keeps
+access tokens refreshed in the background.
+"""
+
+import json
+import os
+import threading
+from time import perf_counter
+
+import httplib2
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build_from_document
+
+from .metrics import observe_google
+from .token_manager import get_token_uri, token_manager
+
+_discovery_docs = {}
+_discovery_lock = threading.Lock()
+_local = threading.local()
+
+def get_discovery_document(service_name, version):
+    """Return the parsed discovery document for a Google API (cached per process)"""
+    key = (service_name, version)
+    doc = _discovery_docs.get(key)
+    if doc is None:
+        with _discovery_lock:
+            doc = _discovery_docs.get(key)
+            if doc is None:
+                # Static documents ship with google-api-python-client, so no
+                # network round-trip is needed. The client library applies
+                # idempotent fix-ups to the dict, which makes sharing it safe.
+                content = discovery_cache.get_static_doc(service_name, version)
+                if content is None:
+                    raise ValueError(f'No discovery document for {service_name} {version}')
+                doc = json.loads(content)
+                _discovery_docs[key] = doc
+    return doc
+
+class InstrumentedHttp(httplib2.Http):
+    """httplib2.Http that records each request's API, status and duration"""
+
+    def request(self, uri, *args, **kwargs):
+        started = perf_counter()
+        try:
+            response, content = super().request(uri, *args, **kwargs)
+        except Exception:
+            observe_google(uri, started, 'error')
+            raise
+        observe_google(uri, started, response.status)
+        return response, content
+
+def get_pooled_http():
+    """Return this thread's keep-alive HTTP transport"""
+    http = getattr(_local, 'http', None)
+    if http is None:
+        # httplib2.Http is not thread-safe, so each worker thread owns one and
+        # reuses its open connections across requests.
+        timeout = int(os.getenv('GOOGLE_API_TIMEOUT', 30))
+        http = InstrumentedHttp(timeout=timeout)
+        _local.http = http
+    return http
+
+def build_credentials(user):
+    """Build OAuth credentials for a user"""
+    return Credentials(
+        token=user.access_token,
+        refresh_token=user.refresh_token,
+        token_uri=get_token_uri(),
+        client_id=os.getenv('GOOGLE_CLIENT_ID'),
+        client_secret=os.getenv('GOOGLE_CLIENT_SECRET')
+    )
+
+def get_service(service_name, version, credentials):
+    """Build a Google API client bound to credentials over the pooled transport"""
+    http = AuthorizedHttp(credentials, http=get_pooled_http())
+    return build_from_document(get_discovery_document(service_name, version), http=http)
+
+def get_calendar_service(user):
+    """Get Google Calendar service with user's credentials"""
+    return get_service('calendar', 'v3', token_manager.get_credentials(user))
+
+def get_gmail_service(user):
+    """Get Gmail service with user's credentials"""
+    return get_service('gmail', 'v1', token_manager.get_credentials(user))
@@ -0,0 +1,90 @@
+"""
+Sorted interval index over calendar events.
+
+Each event is parsed once into epoch seconds and kept in arrays sorted by start
+time, so window queries are answered with ``bisect`` in O(log n + k) instead of
+re-parsing and re-sorting every event per request. Events longer than
+``LONG_EVENT_SECONDS`` (all-day and multi-day entries) live in a separate list
+so they do not widen the overlap scan for ordinary meetings.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from datetime import datetime
+from heapq import merge
+
+LONG_EVENT_SECONDS = 6 * 3600
+
+_EPOCH = datetime(1970, 1, 1)
+
+IndexedEvent = namedtuple('IndexedEvent', 'start end start_dt end_dt is_all_day event')
+
+def parse_event_time(value):
+    """Parse a Google event start/end value (aware for timed, naive for all-day)"""
+    if 'T' in value:  # Has time
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return datetime.fromisoformat(value)  # All-day event
+
+def to_epoch(dt):
+    """Convert a datetime to epoch seconds, treating naive values as UTC"""
+    if dt.tzinfo is not None:
+        return dt.timestamp()
+    return (dt - _EPOCH).total_seconds()
+
+def index_event(event):
+    """Parse a Google event once into an IndexedEvent"""
+    start = event['start'].get('dateTime', event['start'].get('date'))
+    end = event['end'].get('dateTime', event['end'].get('date'))
+    start_dt = parse_event_time(start)
+    end_dt = parse_event_time(end)
+    return IndexedEvent(to_epoch(start_dt), to_epoch(end_dt), start_dt, end_dt, 'T' not in start, event)
+
+class EventIndex:
+    """Immutable start-sorted index supporting overlap and start-range queries"""
+
+    def __init__(self, entries):
+        entries = sorted(entries, key=lambda entry: entry.start)
+        self._short = [entry for entry in entries if entry.end - entry.start <= LONG_EVENT_SECONDS]
+        self._long = [entry for entry in entries if entry.end - entry.start > LONG_EVENT_SECONDS]
+        self._short_starts = [entry.start for entry in self._short]
+        self._long_starts = [entry.start for entry in self._long]
+        self._max_short = max((entry.end - entry.start for entry in self._short), default=0)
+        self._max_long = max((entry.end - entry.start for entry in self._long), default=0)
+
+    @classmethod
+    def from_events(cls, events):
+        """Build an index from raw Google event dicts"""
+        return cls(index_event(event) for event in events)
+
+    def __len__(self):
+        return len(self._short) + len(self._long)
+
+    def overlapping(self, time_min, time_max):
+        """Return entries overlapping [time_min, time_max) (epoch seconds) by start"""
+        # A short event that overlaps must start after time_min - max duration
+        lo = bisect_left(self._short_starts, time_min - self._max_short)
+        hi = bisect_left(self._short_starts, time_max)
+        short = [entry for entry in self._short[lo:hi] if entry.end > time_min]
+
+        lo = bisect_left(self._long_starts, time_min - self._max_long)
+        hi = bisect_left(self._long_starts, time_max)
+        long = [entry for entry in self._long[lo:hi] if entry.end > time_min]
+
+        if not long:
+            return short
+        return list(merge(short, long, key=lambda entry: entry.start))
+
+    def starting_between(self, time_min, time_max):
+        """Return entries whose start lies in [time_min, time_max] (epoch seconds)"""
+        short = self._short[
+            bisect_left(self._short_starts, time_min):
+            bisect_right(self._short_starts, time_max)
+        ]
+        long = self._long[
+            bisect_left(self._long_starts, time_min):
+            bisect_right(self._long_starts, time_max)
+        ]
+
+        if not long:
+            return short
+        return list(merge(short, long, key=lambda entry: entry.start))
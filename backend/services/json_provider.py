@@ -0,0 +1,50 @@
+"""
+Fast JSON provider for ``app.json``.
+
+When orjson is installed, ``jsonify`` and ``request.get_json`` go through it
+and responses are built from its bytes directly instead of encoding a str.
+Without orjson the app keeps Flask's default provider. Output matches the
+default provider's except that keys keep their insertion order and non-ASCII
+text is sent as UTF-8 instead of ``\\u`` escapes; dates still go through
+Flask's ``default`` hook and serialize as HTTP dates.
+"""
+
+import os
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """DefaultJSONProvider backed by orjson"""
+
+    sort_keys = False
+
+    def _options(self, indent=False):
+        # Datetimes go to default() so they keep Flask's format
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._options(bool(kwargs.get('indent')))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent) | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def init_app(app):
+    """Use the orjson provider when available and not disabled"""
+    if orjson is not None and os.getenv('FAST_JSON_ENABLED', 'True').lower() == 'true':
+        app.json = OrjsonProvider(app)
@@ -0,0 +1,151 @@
+"""
+Pooled SMTP delivery.
+
+Opening an SMTP connection, running STARTTLS and logging in costs several
+round-trips per message. The pool keeps a few authenticated connections open
+and reuses them across messages and threads, reconnecting when the server
+drops one. Transient failures are retried with exponential backoff.
+"""
+
+import os
+import queue
+import smtplib
+import socket
+import threading
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from .metrics import SMTP_SEND_LATENCY
+
+def is_transient(error):
+    """Dropped connections, timeouts and 4xx replies are worth retrying, anything else is not"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    # SMTPException subclasses OSError: refused recipients or sender and
+    # malformed data fail the same way on every attempt
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    return isinstance(error, (ConnectionError, socket.timeout))
+
+def build_message(to_email, subject, html_content, text_content=None, from_email=None):
+    """Build a multipart/alternative message (plaintext part first when given)"""
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = from_email or os.getenv('SMTP_USERNAME') or os.getenv('NOTIFICATION_EMAIL')
+    msg['To'] = to_email
+
+    if text_content is not None:
+        msg.attach(MIMEText(text_content, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    return msg
+
+class SMTPPool:
+    """Small pool of persistent, authenticated SMTP connections"""
+
+    def __init__(self, host=None, port=None, username=None, password=None, use_tls=None,
+                 size=None, max_retries=None, backoff=0.5, timeout=30):
+        self.host = host or os.getenv('SMTP_SERVER')
+        self.port = int(port or os.getenv('SMTP_PORT', 587))
+        self.username = username if username is not None else os.getenv('SMTP_USERNAME')
+        self.password = password if password is not None else os.getenv('SMTP_PASSWORD')
+        if use_tls is None:
+            use_tls = os.getenv('SMTP_USE_TLS', 'True').lower() == 'true'
+        self.use_tls = use_tls
+        self.size = int(size or os.getenv('SMTP_POOL_SIZE', 4))
+        self.max_retries = int(max_retries if max_retries is not None else os.getenv('SMTP_MAX_RETRIES', 3))
+        self.backoff = backoff
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.use_tls:
+            server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        return server
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return self._connect()
+            except Exception:
+                self._slots.release()
+                raise
+
+    def _release(self, server, healthy=True):
+        if healthy:
+            self._idle.put(server)
+        else:
+            try:
+                server.close()
+            except Exception:
+                pass
+        self._slots.release()
+
+    def send(self, msg):
+        """Send a message over a pooled connection, retrying transient failures"""
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                self._send_once(msg)
+                SMTP_SEND_LATENCY.observe(time.perf_counter() - started, 'sent')
+                return
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient(e):
+                    SMTP_SEND_LATENCY.observe(time.perf_counter() - started, 'failed')
+                    raise
+            time.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    def _send_once(self, msg):
+        server = self._acquire()
+        try:
+            server.send_message(msg)
+        except smtplib.SMTPResponseException as e:
+            # smtplib already reset the transaction; 421 means the server is closing
+            self._release(server, healthy=e.smtp_code != 421)
+            raise
+        except Exception:
+            self._release(server, healthy=False)
+            raise
+        self._release(server)
+
+    def close(self):
+        """Quit every idle connection"""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                server.quit()
+            except Exception:
+                pass
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Return the process-wide SMTP pool, created from the environment"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPPool()
+    return _pool
+
+def send_email(to_email, subject, html_content, text_content=None):
+    """Send email using configured SMTP settings"""
+    try:
+        get_pool().send(build_message(to_email, subject, html_content, text_content))
+    except Exception as e:
+        raise Exception(f"SMTP error: {str(e)}")
@@ -0,0 +1,234 @@
+"""
+Request, Google API, SQL, SMTP and cache instrumentation.
+
+Metrics are plain in-process counters and fixed-bucket histograms, so an
+observation is a bisect and a few integer additions under a lock. ``/metrics``
+renders them in the Prometheus text format. Each gunicorn worker keeps its own
+numbers; scrape workers individually (or aggregate with ``sum``) when running
+several.
+
+Endpoints are labelled with their URL rule, never the raw path, to keep the
+number of series bounded.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Fixed-bucket histogram with labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        # Index len(buckets) is the +Inf bucket
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(labels, (list(counts), total, count)) for labels, (counts, total, count) in self._series.items()]
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket
+                le = 'le="+Inf"' if bound == '+Inf' else f'le="{bound}"'
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {count}'
+
+class Registry:
+    """Metrics plus collectors evaluated at scrape time"""
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def histogram(self, *args, **kwargs):
+        metric = Histogram(*args, **kwargs)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn):
+        """Register fn() -> iterable of (name, kind, documentation, [(labels dict, value)])"""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        for collect in self._collectors:
+            for name, kind, documentation, samples in collect():
+                lines.append(f'# HELP {name} {documentation}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_labels(labels.keys(), labels.values())} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    'agendify_http_request_duration_seconds', 'HTTP request latency by endpoint',
+    ('method', 'endpoint', 'status')
+)
+REQUEST_QUERIES = registry.histogram(
+    'agendify_http_request_db_queries', 'SQL statements executed per HTTP request',
+    ('endpoint',), buckets=COUNT_BUCKETS
+)
+DB_QUERY_LATENCY = registry.histogram(
+    'agendify_db_query_duration_seconds', 'SQL statement execution time',
+    ('operation',), buckets=QUERY_BUCKETS
+)
+GOOGLE_API_LATENCY = registry.histogram(
+    'agendify_google_api_request_duration_seconds', 'Google API HTTP requests by API and status',
+    ('api', 'status')
+)
+SMTP_SEND_LATENCY = registry.histogram(
+    'agendify_smtp_send_duration_seconds', 'SMTP message sends including retries',
+    ('outcome',)
+)
+
+@registry.collector
+def _cache_metrics():
+    from .cache import get_cache
+    from .session_auth import user_cache
+
+    caches = [({'cache': 'shared', 'backend': get_cache().backend}, get_cache().stats()),
+              ({'cache': 'users', 'backend': 'memory'}, user_cache.cache.stats())]
+    hits, misses, ratios, evictions, errors = [], [], [], [], []
+    for labels, stats in caches:
+        lookups = stats['hits'] + stats['misses']
+        hits.append((dict(labels, result='hit'), stats['hits']))
+        misses.append((dict(labels, result='miss'), stats['misses']))
+        ratios.append((labels, stats['hits'] / lookups if lookups else 0.0))
+        evictions.append((labels, stats['evictions']))
+        errors.append((labels, stats['errors']))
+    return [
+        ('agendify_cache_requests_total', 'counter', 'Cache lookups by result', hits + misses),
+        ('agendify_cache_hit_ratio', 'gauge', 'Share of cache lookups that hit', ratios),
+        ('agendify_cache_evictions_total', 'counter', 'Entries evicted to stay within the size bound', evictions),
+        ('agendify_cache_errors_total', 'counter', 'Cache backend errors', errors)
+    ]
+
+@registry.collector
+def _extraction_metrics():
+    from .event_extraction import extraction_service
+
+    stats = extraction_service.stats()
+    return [
+        ('agendify_extraction_requests_total', 'counter', 'Event extraction lookups by cache result',
+         [({'result': result}, stats[key]) for result, key in
+          (('hit', 'hits'), ('miss', 'misses'), ('coalesced', 'coalesced'), ('error', 'errors'))]),
+        ('agendify_extraction_hit_ratio', 'gauge', 'Share of extraction lookups answered from the cache',
+         [({}, stats['hit_rate'])]),
+        ('agendify_extraction_evictions_total', 'counter', 'Cached extractions evicted as least recently used',
+         [({}, stats['evictions'])])
+    ]
+
+_local = threading.local()
+
+def _statement_operation(statement):
+    head = statement.lstrip()[:16].split(None, 1)
+    return head[0].upper() if head else 'OTHER'
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if not starts:
+        return
+    DB_QUERY_LATENCY.observe(perf_counter() - starts.pop(), _statement_operation(statement))
+    _local.queries = getattr(_local, 'queries', 0) + 1
+
+_sql_instrumented = False
+
+def instrument_sql():
+    """Time every SQL statement on every engine (once per process)"""
+    global _sql_instrumented
+    if _sql_instrumented:
+        return
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    _sql_instrumented = True
+
+def google_api_name(uri):
+    """Label for a Google API URL: calendar, gmail, batch, oauth2, ..."""
+    path = uri.split('://', 1)[-1]
+    host, _, path = path.partition('/')
+    if path.startswith('batch'):
+        return 'batch'
+    if host.startswith('www.googleapis.com') or host.startswith('googleapis.com'):
+        return path.split('/', 1)[0] or 'googleapis'
+    return host.split('.', 1)[0]
+
+def observe_google(uri, started, status):
+    GOOGLE_API_LATENCY.observe(perf_counter() - started, google_api_name(uri), str(status))
+
+def init_app(app):
+    """Register request timing hooks, SQL listeners and the /metrics route"""
+    if os.getenv('METRICS_ENABLED', 'True').lower() != 'true':
+        return
+
+    instrument_sql()
+    token = os.getenv('METRICS_TOKEN')
+
+    @app.before_request
+    def start_request_timer():
+        g.metrics_start = perf_counter()
+        _local.queries = 0
+
+    @app.after_request
+    def record_request(response):
+        started = g.pop('metrics_start', None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            REQUEST_LATENCY.observe(perf_counter() - started, request.method, endpoint, str(response.status_code))
+            REQUEST_QUERIES.observe(getattr(_local, 'queries', 0), endpoint)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(registry.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,185 @@
+"""
+Server-Sent Events hub for upcoming-item notifications.
+
+One scheduler thread per worker recomputes upcoming items once per tick for
+each user with an open stream and fans the result out to all of that user's
+subscribers, instead of every client polling ``/api/notifications/upcoming``.
+Messages are formatted once per user and shared by every subscriber queue.
+Under gunicorn's gevent worker the thread and queues are cooperative, so one
+worker holds thousands of idle streams.
+"""
+
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+from ..models import db, User
+from .upcoming import get_upcoming_items
+
+def lead_minutes_from_env():
+    """Reminder lead times from NOTIFICATION_LEAD_MINUTES, loosest first"""
+    values = os.getenv('NOTIFICATION_LEAD_MINUTES', '15,5,0')
+    return sorted((int(value) for value in values.split(',') if value.strip()), reverse=True)
+
+def format_sse(event, data):
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+class Subscription:
+    """One open stream: a bounded queue of pre-formatted SSE messages"""
+
+    def __init__(self, user_id, maxsize):
+        self.user_id = user_id
+        self.queue = queue.Queue(maxsize=maxsize)
+        # Set when the hub drops the stream; it ends once the queue drains
+        self.closed = False
+
+    def put(self, message):
+        """Enqueue a message, dropping the oldest one if the client is behind"""
+        while True:
+            try:
+                self.queue.put_nowait(message)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+class NotificationHub:
+    """Per-worker registry of streams and the scheduler that feeds them"""
+
+    def __init__(self, compute=None, interval=None, lead_minutes=None, queue_size=100):
+        self.compute = compute
+        self.interval = interval if interval is not None else int(os.getenv('NOTIFICATION_TICK_SECONDS', 30))
+        self.lead_minutes = sorted(lead_minutes, reverse=True) if lead_minutes is not None else lead_minutes_from_env()
+        # Turned off when the reminder scheduler fires reminders for every user
+        self.reminders = True
+        self.queue_size = queue_size
+        self._subscribers = {}
+        self._snapshots = {}
+        self._fired = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def subscribe(self, user_id, now=None):
+        """Register a stream and queue the user's current snapshot"""
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            snapshot = self._snapshots.get(user_id)
+
+        if snapshot is not None:
+            subscription.put(snapshot[1])
+        elif self.compute is not None:
+            # First stream for this user on this worker: compute right away
+            # (publishing to the new stream) rather than waiting for a tick
+            try:
+                self.refresh_user(user_id, now or datetime.utcnow())
+            except Exception as e:
+                # No stream is served for a failed start, so nothing would
+                # unsubscribe it later; the client retries after the error
+                self.unsubscribe(subscription)
+                subscription.put(format_sse('error', {'error': str(e)}))
+                subscription.closed = True
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove a stream, forgetting the user's state once no streams remain"""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+                self._snapshots.pop(subscription.user_id, None)
+                self._fired.pop(subscription.user_id, None)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, user_id, event, data):
+        """Send one event to every stream of a user"""
+        message = format_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            subscription.put(message)
+        return message
+
+    def refresh_user(self, user_id, now):
+        """Recompute a user's upcoming items and push what changed"""
+        items = self.compute(user_id, now)
+
+        # Snapshot only changes when the set of items changes; clients derive
+        # the countdown from start_time
+        key = tuple((item['type'], item['id'], item['start_time']) for item in items)
+        with self._lock:
+            previous = self._snapshots.get(user_id)
+        if previous is None or previous[0] != key:
+            message = self.publish(user_id, 'upcoming', {'upcoming_items': items, 'count': len(items)})
+            with self._lock:
+                if user_id in self._subscribers:
+                    self._snapshots[user_id] = (key, message)
+
+        if not self.reminders:
+            return
+
+        # "Starting in N minutes" reminders: fire the tightest lead time an
+        # item has reached, once, and skip the looser ones it already passed
+        fired = self._fired.get(user_id, set())
+        still_upcoming = set()
+        for item in items:
+            item_key = (item['type'], item['id'], item['start_time'])
+            still_upcoming.add(item_key)
+            reached = [lead for lead in self.lead_minutes if item['minutes_until'] <= lead]
+            if reached and (item_key, reached[-1]) not in fired:
+                fired.update((item_key, lead) for lead in reached)
+                self.publish(user_id, 'reminder', dict(item, lead_minutes=reached[-1]))
+        with self._lock:
+            if user_id in self._subscribers:
+                self._fired[user_id] = {entry for entry in fired if entry[0] in still_upcoming}
+
+    def tick(self, now=None):
+        """Refresh every user that currently has an open stream"""
+        now = now or datetime.utcnow()
+        with self._lock:
+            user_ids = list(self._subscribers)
+        for user_id in user_ids:
+            try:
+                self.refresh_user(user_id, now)
+            except Exception as e:
+                self.publish(user_id, 'error', {'error': str(e)})
+        return len(user_ids)
+
+    def start(self, app):
+        """Start the scheduler thread for this worker (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, args=(app,), name='notification-hub', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, app):
+        while not self._stop.wait(self.interval):
+            with app.app_context():
+                try:
+                    self.tick()
+                finally:
+                    db.session.remove()
+
+def compute_for_user(user_id, now):
+    """Default compute function: upcoming items for a user id (needs an app context)"""
+    user = db.session.get(User, user_id)
+    return get_upcoming_items(user, now) if user else []
+
+# Process-wide hub used by the stream endpoint
+notification_hub = NotificationHub(compute=compute_for_user)
@@ -0,0 +1,67 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row on a page, encoded as opaque
+base64url JSON. The next page is selected with a row-value style predicate over
+the same ORDER BY, so the database seeks through the index instead of
+counting past an OFFSET.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import and_, false, or_
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        return datetime.fromisoformat(value['dt'])
+    return value
+
+def encode_cursor(values):
+    """Encode a row's sort key as an opaque cursor string"""
+    raw = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, size):
+    """Decode a cursor string, raising ValueError when it is malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    try:
+        return [_decode_value(value) for value in values]
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError('Invalid cursor') from e
+
+def _after(column, descending, value):
+    """Rows strictly after value in a NULLS LAST ordering of one column"""
+    if value is None:
+        return false()
+    return or_(column < value if descending else column > value, column.is_(None))
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+def keyset_filter(keys, values):
+    """Build the predicate selecting rows after `values` for (column, descending) keys"""
+    clauses = []
+    for position, (column, descending) in enumerate(keys):
+        prefix = [_equal(keys[i][0], values[i]) for i in range(position)]
+        clauses.append(and_(*prefix, _after(column, descending, values[position])))
+    return or_(*clauses)
+
+def keyset_order(keys):
+    """ORDER BY clauses matching keyset_filter (NULLS LAST in both directions)"""
+    return [
+        (column.desc() if descending else column.asc()).nullslast()
+        for column, descending in keys
+    ]
@@ -0,0 +1,197 @@
+"""
+Opt-in SQL profiler: slow statements, N+1 patterns and query budgets.
+
+With ``QUERY_PROFILER_ENABLED`` set, SQLAlchemy cursor events record every
+statement executed while a request (or a ``profiled()`` block such as the
+digest job) is running:
+
+- statements slower than ``QUERY_SLOW_MS`` are logged with their parameters
+  and the database's EXPLAIN output;
+- statement shapes (whitespace and bind parameters normalized, IN lists
+  collapsed) repeated ``QUERY_REPEAT_THRESHOLD`` or more times are logged as
+  N+1 suspects;
+- responses carry ``X-Query-Count`` and ``X-Query-Time-Ms``.
+
+In test mode (``app.testing`` or ``QUERY_PROFILER_STRICT``) a request to an
+endpoint listed in ``QUERY_BUDGETS`` that runs more statements than its budget
+raises ``QueryBudgetExceeded``. Lower a budget whenever an endpoint gets
+cheaper; raise one only with a reason in the commit.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from time import perf_counter
+
+from flask import request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Statements per request for the key endpoints. /auth/me is requested first
+# with a fresh session, so it pays for loading the user; later requests find
+# the user in the session cache.
+QUERY_BUDGETS = {
+    ('GET', '/auth/me'): 1,
+    ('GET', '/api/tasks/'): 2,
+    ('GET', '/api/tasks/today'): 2,
+    ('GET', '/api/tasks/<int:task_id>'): 2,
+    ('GET', '/api/tasks/changes'): 1,
+    # Creates, update, toggle and delete in one batch (see check_query_budgets)
+    ('POST', '/api/tasks/batch'): 8,
+    ('GET', '/api/agenda/'): 2,
+    ('GET', '/api/calendar/events/today'): 0,
+    ('GET', '/api/notifications/upcoming'): 1,
+    ('GET', '/api/email/candidates'): 1,
+    # Every candidate a miss: lookup, insert and the eviction count
+    ('POST', '/api/email/extract'): 4,
+}
+
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN',
+    'postgresql': 'EXPLAIN',
+    'mysql': 'EXPLAIN',
+    'mariadb': 'EXPLAIN',
+}
+
+_WHITESPACE = re.compile(r'\s+')
+_BINDS = re.compile(r'%\(\w+\)s|%s|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+class QueryBudgetExceeded(AssertionError):
+    """An endpoint ran more SQL statements than its budget allows"""
+
+def statement_shape(statement):
+    """Normalize a statement so repeated executions compare equal"""
+    shape = _BINDS.sub('?', _WHITESPACE.sub(' ', statement.strip()))
+    return _IN_LIST.sub('(?)', shape)
+
+class QueryProfile:
+    """Statements recorded for one request or block"""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.elapsed = 0.0
+        self.shapes = Counter()
+
+    def repeated(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+class QueryProfiler:
+    """SQLAlchemy cursor hooks feeding per-thread profiles"""
+
+    def __init__(self, slow_ms=None, repeat_threshold=None, explain=True, logger=None):
+        self.slow = (slow_ms if slow_ms is not None else float(os.getenv('QUERY_SLOW_MS', 100))) / 1000
+        self.repeat_threshold = repeat_threshold or int(os.getenv('QUERY_REPEAT_THRESHOLD', 5))
+        self.explain = explain
+        self.logger = logger or logging.getLogger(__name__)
+        self._local = threading.local()
+        self._installed = False
+
+    def install(self):
+        if not self._installed:
+            event.listen(Engine, 'before_cursor_execute', self._before)
+            event.listen(Engine, 'after_cursor_execute', self._after)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            event.remove(Engine, 'before_cursor_execute', self._before)
+            event.remove(Engine, 'after_cursor_execute', self._after)
+            self._installed = False
+
+    def begin(self, name):
+        self._local.profile = QueryProfile(name)
+        return self._local.profile
+
+    def end(self):
+        """Finish the current thread's profile and log N+1 suspects"""
+        profile = getattr(self._local, 'profile', None)
+        self._local.profile = None
+        if profile is not None:
+            for shape, count in profile.repeated(self.repeat_threshold):
+                self.logger.warning('Possible N+1 in %s: %d x %s', profile.name, count, shape)
+        return profile
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'profile', None) is not None:
+            conn.info.setdefault('profiler_start', []).append(perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        profile = getattr(self._local, 'profile', None)
+        starts = conn.info.get('profiler_start')
+        if profile is None or not starts:
+            return
+        elapsed = perf_counter() - starts.pop()
+        profile.count += 1
+        profile.elapsed += elapsed
+        profile.shapes[statement_shape(statement)] += 1
+
+        if elapsed >= self.slow:
+            plan = self._explain(conn, statement, parameters) if self.explain and not executemany else None
+            self.logger.warning(
+                'Slow query in %s (%.1fms): %s\nParameters: %r%s',
+                profile.name, elapsed * 1000, statement, parameters,
+                f'\nPlan:\n{plan}' if plan else ''
+            )
+
+    def _explain(self, conn, statement, parameters):
+        """EXPLAIN a SELECT on a raw cursor, so no events fire for it"""
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if prefix is None or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(f'{prefix} {statement}', parameters)
+            return '\n'.join(' | '.join(str(column) for column in row) for row in cursor.fetchall())
+        except Exception as e:
+            return f'EXPLAIN failed: {e}'
+        finally:
+            cursor.close()
+
+profiler = QueryProfiler()
+
+@contextmanager
+def profiled(name):
+    """Profile the statements of a block outside a request (no-op unless enabled)"""
+    if not profiler._installed:
+        yield None
+        return
+    profile = profiler.begin(name)
+    try:
+        yield profile
+    finally:
+        profiler.end()
+
+def init_app(app):
+    """Install the profiler hooks when QUERY_PROFILER_ENABLED is set"""
+    if os.getenv('QUERY_PROFILER_ENABLED', 'False').lower() != 'true':
+        return
+
+    profiler.logger = app.logger
+    profiler.install()
+    strict = os.getenv('QUERY_PROFILER_STRICT', 'False').lower() == 'true'
+
+    @app.before_request
+    def begin_query_profile():
+        profiler.begin(f'{request.method} {request.path}')
+
+    @app.after_request
+    def end_query_profile(response):
+        profile = profiler.end()
+        if profile is None:
+            return response
+        response.headers['X-Query-Count'] = str(profile.count)
+        response.headers['X-Query-Time-Ms'] = f'{profile.elapsed * 1000:.2f}'
+
+        rule = request.url_rule.rule if request.url_rule is not None else None
+        budget = QUERY_BUDGETS.get((request.method, rule))
+        if (strict or app.testing) and budget is not None and profile.count > budget:
+            raise QueryBudgetExceeded(
+                f'{request.method} {rule} ran {profile.count} queries (budget {budget}): '
+                + '; '.join(f'{count} x {shape}' for shape, count in profile.shapes.most_common(5))
+            )
+        return response
@@ -0,0 +1,360 @@
+"""
+Reminder scheduler for every user's tasks and cached calendar events.
+
+Reminder times live in a hierarchical timing wheel with one-minute ticks.
+Level 0 has one slot per minute for the next 64 minutes. Each higher level
+covers 64 times as much with coarser slots, and its entries move down a level
+when their slot comes round. Scheduling and cancelling are O(1), and an entry
+moves at most once per level, so firing costs O(1) amortized per reminder no
+matter how many are pending. Cascades run in slices with the scheduler lock
+released in between, so schedule calls never wait behind a large one. Each
+item gets one reminder per lead time in ``NOTIFICATION_LEAD_MINUTES``, and
+the leads already sent are remembered until the item starts, so a later sync
+or edit that keeps its time never sends them again.
+
+The wheel is loaded from every uncompleted task and then updated
+incrementally. Each minute it reads tasks whose ``updated_at`` passed its
+watermark, which covers creates, edits and toggles from any worker. The event
+store reports every calendar sync. Due reminders go to the user's open
+notification streams, and streams belong to one worker, so every worker that
+serves streams runs a scheduler. The hub's own per-tick reminder check is
+switched off while the scheduler runs.
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from ..models import db, Task
+from .event_cache import event_store
+from .interval_index import to_epoch
+from .notification_hub import lead_minutes_from_env, notification_hub
+from .upcoming import event_item, task_item
+
+TASK_COLUMNS = (Task.id, Task.user_id, Task.title, Task.description, Task.due_at, Task.completed, Task.priority)
+
+# Same window as task delta sync: rows committed late with an older
+# updated_at are read again on the next poll
+POLL_SAFETY_WINDOW = timedelta(seconds=int(os.getenv('TASK_SYNC_SAFETY_WINDOW', 5)))
+
+# Reminders come from the same calendar as the upcoming items
+REMINDER_CALENDAR = 'primary'
+
+# Entries a cascade moves per lock hold (about a millisecond)
+CASCADE_SLICE = 1000
+
+def to_minute(epoch):
+    return int(epoch // 60)
+
+class TimingWheel:
+    """Hierarchical timing wheel keyed by integer minutes"""
+
+    def __init__(self, now, bits=6, levels=4):
+        self.bits = bits
+        self.mask = (1 << bits) - 1
+        self.levels = [[{} for _ in range(1 << bits)] for _ in range(levels)]
+        # Entries beyond the top level (64**4 minutes, about 32 years)
+        self.overflow = {}
+        self.current = now
+        self._slots = {}
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def schedule(self, key, due, value=None):
+        """Add or move an entry for minute `due` (the next tick if that already passed)"""
+        self.cancel(key)
+        self._place(key, max(due, self.current + 1), value)
+
+    def cancel(self, key):
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            del slot[key]
+
+    def _place(self, key, due, value):
+        # The highest bit where due and the current minute differ picks the
+        # level: everything above it is shared, so due lies in that level's span
+        level = max((due ^ self.current).bit_length() - 1, 0) // self.bits
+        if level < len(self.levels):
+            slot = self.levels[level][(due >> (self.bits * level)) & self.mask]
+        else:
+            slot = self.overflow
+        slot[key] = (due, value)
+        self._slots[key] = slot
+
+    def step(self):
+        """Move to the next minute; returns the slots to cascade before fire(), coarsest first"""
+        self.current += 1
+        minute = self.current
+        slots = []
+        # Crossing a boundary brings the next coarse slot down
+        if minute & ((1 << (self.bits * len(self.levels))) - 1) == 0:
+            slots.append(self.overflow)
+        for level in range(len(self.levels) - 1, 0, -1):
+            if minute & ((1 << (self.bits * level)) - 1) == 0:
+                slots.append(self.levels[level][(minute >> (self.bits * level)) & self.mask])
+        return slots
+
+    def cascade(self, slot, limit=None):
+        """Re-place up to `limit` entries of a slot a level down; True once it is empty"""
+        moved = 0
+        while slot and (limit is None or moved < limit):
+            key, (due, value) = slot.popitem()
+            self._place(key, due, value)
+            moved += 1
+        return not slot
+
+    def fire(self):
+        """Remove and return [(key, due, value)] for the entries due this minute"""
+        slot = self.levels[0][self.current & self.mask]
+        fired = []
+        for key, (due, value) in slot.items():
+            del self._slots[key]
+            fired.append((key, due, value))
+        slot.clear()
+        return fired
+
+    def advance(self, now):
+        """Move to minute `now`; returns [(key, due, value)] for every entry that came due"""
+        fired = []
+        while self.current < now:
+            for slot in self.step():
+                self.cascade(slot)
+            fired.extend(self.fire())
+        return fired
+
+class ReminderScheduler:
+    """All users' reminders in one timing wheel, fired on the minute"""
+
+    def __init__(self, handler=None, lead_minutes=None, load_batch=None, clock=time.time):
+        self.handler = handler or publish_reminder
+        self.lead_minutes = sorted(lead_minutes, reverse=True) if lead_minutes is not None else lead_minutes_from_env()
+        self.load_batch = load_batch or int(os.getenv('REMINDER_LOAD_BATCH', 5000))
+        self.clock = clock
+        self.wheel = TimingWheel(to_minute(clock()))
+        # (user_id, type, id) -> (start epoch, upcoming item)
+        self._items = {}
+        # (user_id, calendar_id) -> item keys scheduled from that calendar
+        self._calendars = {}
+        # item key -> (start minute, leads already fired), kept until the start passes
+        self._fired = {}
+        # start minute -> item keys in _fired, to forget them on the minute
+        self._fired_until = {}
+        self._watermark = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def stats(self):
+        with self._lock:
+            return {'items': len(self._items), 'pending': len(self.wheel), 'minute': self.wheel.current}
+
+    def schedule_item(self, user_id, item, start, catch_up=True):
+        """Add or update an item's reminders; `start` is epoch seconds"""
+        key = (user_id, item['type'], item['id'])
+        start_minute = to_minute(start)
+        with self._lock:
+            previous = self._items.get(key)
+            self._items[key] = (start, item)
+            if previous is not None and to_minute(previous[0]) == start_minute:
+                # Same time: pending reminders stay and fired ones are not repeated
+                return
+
+            for lead in self.lead_minutes:
+                self.wheel.cancel(key + (lead,))
+            current = self.wheel.current
+            passed = None
+            for lead in self.lead_minutes:
+                if start_minute - lead > current:
+                    self.wheel.schedule(key + (lead,), start_minute - lead)
+                else:
+                    passed = lead
+
+            # Like the hub: an item that already passed its looser lead times
+            # gets the tightest one it reached on the next tick, unless that
+            # one was already sent for this start time
+            fired = self._fired.get(key)
+            if fired is not None and fired[0] == start_minute and passed in fired[1]:
+                passed = None
+            if catch_up and passed is not None and start_minute >= current:
+                self.wheel.schedule(key + (passed,), current + 1)
+            if not self._pending(key):
+                del self._items[key]
+
+    def cancel_item(self, key):
+        with self._lock:
+            self._items.pop(key, None)
+            for lead in self.lead_minutes:
+                self.wheel.cancel(key + (lead,))
+
+    def _pending(self, key):
+        return any(key + (lead,) in self.wheel for lead in self.lead_minutes)
+
+    def apply_tasks(self, rows, now, catch_up=True):
+        """Schedule or cancel reminders for task rows (TASK_COLUMNS)"""
+        for row in rows:
+            if row.completed or row.due_at is None:
+                self.cancel_item((row.user_id, 'task', row.id))
+            else:
+                self.schedule_item(row.user_id, task_item(row, now), to_epoch(row.due_at), catch_up)
+
+    def load(self, now=None):
+        """Schedule every uncompleted task due from now on (needs an app context)"""
+        now = datetime.utcfromtimestamp(now if now is not None else self.clock())
+        watermark = now - POLL_SAFETY_WINDOW
+        result = db.session.execute(
+            select(*TASK_COLUMNS)
+            .where(Task.due_at >= now, Task.completed == False)
+            .execution_options(yield_per=self.load_batch)
+        )
+        for rows in result.partitions():
+            self.apply_tasks(rows, now, catch_up=False)
+        self._watermark = watermark
+
+    def poll_tasks(self, now=None):
+        """Apply tasks created, edited, toggled or completed since the last poll"""
+        now = datetime.utcfromtimestamp(now if now is not None else self.clock())
+        watermark = now - POLL_SAFETY_WINDOW
+        rows = db.session.execute(select(*TASK_COLUMNS).where(Task.updated_at > self._watermark)).all()
+        self.apply_tasks(rows, now)
+        self._watermark = watermark
+        return len(rows)
+
+    def calendar_synced(self, state):
+        """EventStore listener: reschedule the timed events of a synced calendar"""
+        if state.calendar_id != REMINDER_CALENDAR or state.window_end is None:
+            return
+        now = self.clock()
+        calendar = (state.user_id, state.calendar_id)
+        # The first sync after start-up only schedules; nothing is caught up
+        catch_up = calendar in self._calendars
+
+        keys = set()
+        for entry in state.index().starting_between(now, to_epoch(state.window_end)):
+            if not entry.is_all_day:  # Has time
+                item = event_item(entry, now)
+                keys.add((state.user_id, item['type'], item['id']))
+                self.schedule_item(state.user_id, item, entry.start, catch_up)
+        for key in self._calendars.get(calendar, set()) - keys:
+            self.cancel_item(key)
+        self._calendars[calendar] = keys
+
+    def tick(self, now=None):
+        """Apply task changes, then deliver every reminder due by now; returns the number delivered"""
+        now = now if now is not None else self.clock()
+        if self._watermark is None:
+            self.load(now)
+        else:
+            self.poll_tasks(now)
+
+        return self._deliver(self.advance(to_minute(now)), now)
+
+    def advance(self, minute):
+        """Move the wheel to a minute; returns [(item key, lead, (start, item))] that came due"""
+        due = []
+        while True:
+            with self._lock:
+                if self.wheel.current >= minute:
+                    return due
+                slots = self.wheel.step()
+            # A cascade can move hundreds of thousands of entries; hand the lock
+            # back between slices so schedule_item callers (calendar syncs in
+            # request threads) never wait long
+            for slot in slots:
+                while True:
+                    with self._lock:
+                        if self.wheel.cascade(slot, CASCADE_SLICE):
+                            break
+            with self._lock:
+                for key, _, _ in self.wheel.fire():
+                    item_key, lead = key[:3], key[3]
+                    entry = self._items.get(item_key)
+                    if entry is None:
+                        continue
+                    due.append((item_key, lead, entry))
+                    self._record_fired(item_key, to_minute(entry[0]), lead)
+                    if not self._pending(item_key):
+                        del self._items[item_key]
+                self._forget_fired(self.wheel.current - 1)
+
+    def _record_fired(self, key, start_minute, lead):
+        fired = self._fired.get(key)
+        if fired is None or fired[0] != start_minute:
+            fired = self._fired[key] = (start_minute, set())
+            self._fired_until.setdefault(start_minute, set()).add(key)
+        fired[1].add(lead)
+
+    def _forget_fired(self, minute):
+        """Drop the fired leads of items that started by `minute`"""
+        for key in self._fired_until.pop(minute, ()):
+            fired = self._fired.get(key)
+            # Rescheduled items are listed under their newer start too
+            if fired is not None and fired[0] <= minute:
+                del self._fired[key]
+
+    def _deliver(self, due, now):
+        if not due:
+            return 0
+
+        # Deletes do not move updated_at: skip reminders for tasks that are gone
+        task_ids = [item_key[2] for item_key, _, _ in due if item_key[1] == 'task']
+        live = set()
+        if task_ids:
+            live = set(db.session.scalars(
+                select(Task.id).where(Task.id.in_(task_ids), Task.completed == False)
+            ))
+
+        delivered = 0
+        for (user_id, item_type, item_id), lead, (start, item) in due:
+            if item_type == 'task' and item_id not in live:
+                continue
+            self.handler(user_id, dict(item, minutes_until=int((start - now) / 60), lead_minutes=lead))
+            delivered += 1
+        return delivered
+
+    def start(self, app):
+        """Start the scheduler thread for this worker (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.wheel = TimingWheel(to_minute(self.clock()))
+            self._thread = threading.Thread(target=self._run, args=(app,), name='reminder-scheduler', daemon=True)
+            self._thread.start()
+        notification_hub.reminders = False
+        event_store.listeners.append(self.calendar_synced)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, app):
+        # Wake at the start of every minute
+        while not self._stop.wait(60 - self.clock() % 60):
+            with app.app_context():
+                try:
+                    self.tick()
+                except Exception as e:
+                    app.logger.warning('Reminder tick failed: %s', e)
+                finally:
+                    db.session.remove()
+
+def publish_reminder(user_id, item):
+    """Default handler: push the reminder to the user's open streams"""
+    notification_hub.publish(user_id, 'reminder', item)
+
+# Process-wide scheduler
+reminder_scheduler = ReminderScheduler()
+
+def init_app(app):
+    """Start the scheduler with the first request of each worker"""
+    if os.getenv('REMINDER_SCHEDULER_ENABLED', 'False').lower() != 'true':
+        return
+
+    @app.before_request
+    def start_reminder_scheduler():
+        reminder_scheduler.start(app)
@@ -0,0 +1,117 @@
+"""
+Session authentication without a database hit per request.
+
+Logging in stores short-lived claims in Flask's signed session cookie: the
+user id, the user's version (``updated_at``, which changes whenever tokens or
+the profile are written) and the time they were issued. While the claims are
+younger than ``SESSION_CLAIM_TTL`` the user loader answers from a bounded,
+TTL-evicting per-process cache of user snapshots whose version matches the
+claims. Older claims, cache misses and version mismatches load the row once and
+re-issue the claims, so a change made through another worker reaches every
+session within the claim TTL.
+
+Snapshots are plain objects, not ORM instances, so they can be shared between
+requests and threads. Keep ``USER_CACHE_TTL`` below ``TOKEN_REFRESH_MARGIN``:
+a cached access token must stay valid until the snapshot is reloaded.
+"""
+
+import os
+import time
+
+from flask import session
+from flask_login import UserMixin
+from sqlalchemy import select
+
+from ..models import db, User
+from .cache import MemoryCache
+
+CLAIMS_KEY = 'auth_claims'
+
+USER_FIELDS = (
+    'id', 'email', 'name', 'picture', 'access_token', 'refresh_token',
+    'token_expiry', 'created_at', 'updated_at'
+)
+
+class CachedUser(UserMixin):
+    """Read-only snapshot of a users row, used as current_user"""
+
+    def __init__(self, **fields):
+        self.__dict__.update(fields)
+
+    @property
+    def version(self):
+        return user_version(self)
+
+    to_dict = User.to_dict
+
+    def __repr__(self):
+        return f'<CachedUser {self.email}>'
+
+def user_version(user):
+    return user.updated_at.isoformat() if user.updated_at else ''
+
+class UserCache:
+    """Bounded, TTL-evicting cache of user snapshots for this process"""
+
+    def __init__(self, max_entries=None, ttl=None, claim_ttl=None, clock=time.time):
+        self.ttl = ttl if ttl is not None else int(os.getenv('USER_CACHE_TTL', 60))
+        self.claim_ttl = claim_ttl if claim_ttl is not None else int(os.getenv('SESSION_CLAIM_TTL', 300))
+        self.cache = MemoryCache(
+            max_entries=max_entries or int(os.getenv('USER_CACHE_SIZE', 10000)),
+            default_ttl=self.ttl
+        )
+        self.clock = clock
+
+    def load(self, user_id):
+        """Read a user row into a snapshot and cache it; None if the user is gone"""
+        columns = [getattr(User, field) for field in USER_FIELDS]
+        row = db.session.execute(select(*columns).where(User.id == user_id)).first()
+        if row is None:
+            self.cache.delete(user_id)
+            return None
+        user = CachedUser(**row._asdict())
+        self.cache.set(user_id, user)
+        return user
+
+    def get(self, user_id, version=None):
+        """Cached snapshot, only if it matches the version when one is given"""
+        user = self.cache.get(user_id)
+        if user is None or (version is not None and user.version != version):
+            return None
+        return user
+
+    def invalidate(self, user_id):
+        self.cache.delete(user_id)
+
+    def issue_claims(self, user):
+        session[CLAIMS_KEY] = [user.id, user_version(user), int(self.clock())]
+
+    def clear_claims(self):
+        session.pop(CLAIMS_KEY, None)
+
+    def load_user(self, user_id):
+        """Flask-Login user_loader"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        claims = session.get(CLAIMS_KEY)
+        if claims and claims[0] == user_id and self.clock() - claims[2] < self.claim_ttl:
+            user = self.get(user_id, claims[1])
+            if user is not None:
+                return user
+
+        user = self.load(user_id)
+        if user is not None:
+            self.issue_claims(user)
+        else:
+            self.clear_claims()
+        return user
+
+# Process-wide cache used by the login manager
+user_cache = UserCache()
+
+def init_app(app, login_manager):
+    """Resolve sessions through the cached loader"""
+    login_manager.user_loader(user_cache.load_user)
@@ -0,0 +1,288 @@
+"""
+Google OAuth access token manager.
+
+Access tokens are kept in memory per user. A background thread refreshes
+tokens that will expire within ``TOKEN_REFRESH_MARGIN`` seconds for users seen
+within ``TOKEN_REFRESH_ACTIVE_WINDOW`` seconds, so request handlers are handed
+a still-valid token and never wait on Google's token endpoint. Each worker
+only refreshes users it served, after re-reading the shared cache and the
+stored expiry, so a token another worker already refreshed is adopted rather
+than refreshed again. Refreshes are single-flight per user: concurrent callers
+wait for the one refresh already running instead of each calling the endpoint
+and racing to commit the result. A blocking refresh only happens when a token
+has already expired (for example right after a worker starts). With a shared
+cache backend a refreshed token is also published there, so a worker holding an
+expired copy picks up another worker's refresh instead of calling Google again.
+"""
+
+import os
+import threading
+from time import perf_counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import requests
+from flask import current_app
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from sqlalchemy import or_, select, update
+
+from ..models import db, User
+from .cache import get_cache
+from .metrics import observe_google
+from .session_auth import user_cache
+
+def get_token_uri():
+    return os.getenv('GOOGLE_TOKEN_URI', 'https://oauth2.googleapis.com/token')
+
+class _Flight:
+    """One in-progress refresh that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class TokenManager:
+    """In-memory access tokens with background, single-flight refreshes"""
+
+    def __init__(self, refresh_fn=None, margin=None, interval=None, workers=None,
+                 failure_backoff=None, active_window=None, cache=None, clock=datetime.utcnow):
+        self.refresh_fn = refresh_fn or self._refresh_with_google
+        self.margin = timedelta(seconds=margin if margin is not None else int(os.getenv('TOKEN_REFRESH_MARGIN', 600)))
+        self.interval = interval if interval is not None else int(os.getenv('TOKEN_REFRESH_INTERVAL', 60))
+        self.workers = workers or int(os.getenv('TOKEN_REFRESH_WORKERS', 4))
+        self.failure_backoff = timedelta(seconds=failure_backoff if failure_backoff is not None else 900)
+        self.active_window = timedelta(seconds=active_window if active_window is not None else int(os.getenv('TOKEN_REFRESH_ACTIVE_WINDOW', 3600)))
+        self.cache = cache
+        self.clock = clock
+        self._tokens = {}
+        self._flights = {}
+        self._retry_at = {}
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _refresh_with_google(self, refresh_token):
+        """Exchange a refresh token at the token endpoint; returns (token, expiry)"""
+        credentials = Credentials(
+            token=None,
+            refresh_token=refresh_token,
+            token_uri=get_token_uri(),
+            client_id=os.getenv('GOOGLE_CLIENT_ID'),
+            client_secret=os.getenv('GOOGLE_CLIENT_SECRET')
+        )
+        started = perf_counter()
+        try:
+            credentials.refresh(Request(session=self._session))
+        except Exception:
+            observe_google(get_token_uri(), started, 'error')
+            raise
+        observe_google(get_token_uri(), started, 200)
+        return credentials.token, credentials.expiry
+
+    def get_token(self, user):
+        """Return (access_token, expiry) for a user, refreshing only if already expired"""
+        with self._lock:
+            self._last_used[user.id] = self.clock()
+            entry = self._tokens.get(user.id)
+            # Another worker may have refreshed and persisted a newer token
+            if user.access_token and (entry is None or (
+                user.token_expiry and entry[1] and user.token_expiry > entry[1]
+            )):
+                entry = (user.access_token, user.token_expiry)
+                self._tokens[user.id] = entry
+
+        if self._expired(entry):
+            entry = self._shared_token(user.id) or entry
+        if self._expired(entry) and user.refresh_token:
+            entry = self.refresh(user.id, user.refresh_token)
+        return entry or (None, None)
+
+    def _expired(self, entry):
+        return entry is None or (entry[1] is not None and entry[1] <= self.clock())
+
+    def _shared_cache(self):
+        cache = self.cache or get_cache()
+        return cache if cache.shared else None
+
+    def _shared_token(self, user_id):
+        """A still-valid token refreshed by another worker, if any"""
+        shared = self._shared_cache()
+        entry = shared.get(_token_key(user_id)) if shared is not None else None
+        # JSON hands the (token, expiry) pair back as a list
+        entry = tuple(entry) if entry is not None else None
+        if self._expired(entry):
+            return None
+        with self._lock:
+            self._tokens[user_id] = entry
+        return entry
+
+    def _publish(self, user_id, token, expiry):
+        shared = self._shared_cache()
+        if shared is None:
+            return
+        ttl = (expiry - self.clock()).total_seconds() if expiry is not None else None
+        if ttl is None or ttl > 0:
+            shared.set(_token_key(user_id), (token, expiry), ttl)
+
+    def get_credentials(self, user):
+        """Build Credentials for a user from the in-memory token"""
+        token, expiry = self.get_token(user)
+        return Credentials(
+            token=token,
+            expiry=expiry,
+            refresh_token=user.refresh_token,
+            token_uri=get_token_uri(),
+            client_id=os.getenv('GOOGLE_CLIENT_ID'),
+            client_secret=os.getenv('GOOGLE_CLIENT_SECRET')
+        )
+
+    def refresh(self, user_id, refresh_token):
+        """Refresh a user's token, joining a refresh already in flight"""
+        with self._lock:
+            flight = self._flights.get(user_id)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[user_id] = flight
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            token, expiry = self.refresh_fn(refresh_token)
+            flight.result = (token, expiry)
+            with self._lock:
+                self._tokens[user_id] = flight.result
+                self._retry_at.pop(user_id, None)
+            self._publish(user_id, token, expiry)
+        except Exception as e:
+            flight.error = e
+            with self._lock:
+                self._retry_at[user_id] = self.clock() + self.failure_backoff
+            raise
+        finally:
+            with self._lock:
+                del self._flights[user_id]
+            flight.done.set()
+
+        # Release the waiters first: they may hold every pooled connection,
+        # and the write needs one of its own
+        self._persist(user_id, token, expiry)
+        return flight.result
+
+    def _persist(self, user_id, token, expiry):
+        """Write the refreshed token on its own primary connection, leaving the caller's session alone"""
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(User).where(User.id == user_id).values(access_token=token, token_expiry=expiry)
+            )
+        # The row's version changed; drop this worker's stale snapshot
+        user_cache.invalidate(user_id)
+
+    def invalidate(self, user_id):
+        """Forget a user's in-memory token (after login or logout)"""
+        with self._lock:
+            self._tokens.pop(user_id, None)
+            self._retry_at.pop(user_id, None)
+        shared = self._shared_cache()
+        if shared is not None:
+            shared.delete(_token_key(user_id))
+
+    def refresh_due(self, now=None):
+        """Refresh recently used tokens expiring within the margin; returns the number refreshed"""
+        now = now or self.clock()
+        # Dormant users are refreshed on demand by their next request instead
+        with self._lock:
+            for user_id in [user_id for user_id, used in self._last_used.items() if used < now - self.active_window]:
+                del self._last_used[user_id]
+            active = list(self._last_used)
+        if not active:
+            return 0
+
+        rows = db.session.query(User.id, User.refresh_token).filter(
+            User.id.in_(active),
+            User.refresh_token.isnot(None),
+            or_(User.token_expiry.is_(None), User.token_expiry < now + self.margin)
+        ).all()
+        db.session.commit()
+
+        with self._lock:
+            due = [(user_id, token) for user_id, token in rows if self._retry_at.get(user_id, now) <= now]
+        if not due:
+            return 0
+
+        # Each worker thread needs its own app context and session
+        app = current_app._get_current_object()
+
+        def run(row):
+            with app.app_context():
+                try:
+                    if self._refreshed_elsewhere(row[0], now):
+                        return False
+                    self.refresh(*row)
+                    return True
+                except Exception:
+                    return False
+                finally:
+                    db.session.remove()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return sum(executor.map(run, due))
+
+    def _refreshed_elsewhere(self, user_id, now):
+        """Adopt a token another worker refreshed since the due query, if there is one"""
+        entry = self._shared_token(user_id)
+        if entry is None or entry[1] is None or entry[1] < now + self.margin:
+            row = db.session.execute(
+                select(User.access_token, User.token_expiry).where(User.id == user_id)
+            ).first()
+            db.session.commit()
+            entry = tuple(row) if row is not None else None
+        if entry is None or entry[1] is None or entry[1] < now + self.margin:
+            return False
+        with self._lock:
+            self._tokens[user_id] = entry
+        return True
+
+    def start(self, app):
+        """Start the refresher thread for this worker (idempotent)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, args=(app,), name='token-refresher', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, app):
+        while not self._stop.wait(self.interval):
+            with app.app_context():
+                try:
+                    self.refresh_due()
+                except Exception as e:
+                    app.logger.warning('Token refresh pass failed: %s', e)
+                finally:
+                    db.session.remove()
+
+def _token_key(user_id):
+    return f'oauth-token:{user_id}'
+
+# Process-wide manager used by the Google client factory
+token_manager = TokenManager()
+
+def init_app(app):
+    """Start the refresher with the first request of each worker"""
+    if os.getenv('TOKEN_REFRESHER_ENABLED', 'True').lower() != 'true':
+        return
+
+    @app.before_request
+    def start_token_refresher():
+        token_manager.start(app)
@@ -0,0 +1,74 @@
+"""
+Upcoming events and tasks for a user.
+
+Shared by the polling endpoint, the SSE notification hub and reminder jobs so
+every path computes the same items.
+"""
+
+from datetime import datetime, timedelta
+
+from googleapiclient.errors import HttpError
+
+from ..models import Task
+from .event_cache import event_store
+from .interval_index import to_epoch
+
+def event_item(entry, now_epoch):
+    """Upcoming item for a timed IndexedEvent"""
+    event = entry.event
+    return {
+        'id': event['id'],
+        'title': event.get('summary', ''),
+        'type': 'calendar_event',
+        'start_time': event['start']['dateTime'],
+        'minutes_until': int((entry.start - now_epoch) / 60),
+        'location': event.get('location', ''),
+        'description': event.get('description', '')
+    }
+
+def task_item(task, now):
+    """Upcoming item for a task (or a row with the same columns)"""
+    return {
+        'id': task.id,
+        'title': task.title,
+        'type': 'task',
+        'start_time': task.due_at.isoformat(),
+        'minutes_until': int((task.due_at - now).total_seconds() / 60),
+        'priority': task.priority,
+        'description': task.description
+    }
+
+def get_upcoming_items(user, now=None, hours=2):
+    """Return events and uncompleted tasks starting within the next `hours`, soonest first"""
+    now = now or datetime.utcnow()
+    window_end = now + timedelta(hours=hours)
+    
+    # Get calendar events
+    try:
+        events = event_store.get_starting(user, 'primary', now, window_end)
+    except HttpError:
+        events = []
+    
+    # Get tasks due in the window
+    tasks = Task.query.filter(
+        Task.user_id == user.id,
+        Task.due_at >= now,
+        Task.due_at <= window_end,
+        Task.completed == False
+    ).order_by(Task.due_at.asc()).all()
+    
+    upcoming_items = []
+    
+    # Add calendar events
+    now_epoch = to_epoch(now)
+    for entry in events:
+        if not entry.is_all_day:  # Has time
+            upcoming_items.append(event_item(entry, now_epoch))
+    
+    # Add tasks
+    for task in tasks:
+        upcoming_items.append(task_item(task, now))
+    
+    # Sort by time
+    upcoming_items.sort(key=lambda x: x['minutes_until'])
+    return upcoming_items
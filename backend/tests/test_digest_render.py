@@ -0,0 +1,53 @@
+"""
+Escaping in the daily digest: user-supplied values are escaped in the HTML
+part and left as written in the plaintext part.
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from backend.services.digest_render import render_digest
+from backend.services.interval_index import index_event
+
+TODAY = date(2024, 6, 1)
+NASTY = '<script>alert("x")</script> & co'
+ESCAPED = '&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt; &amp; co'
+
+def make_event(summary, location=''):
+    return index_event({
+        'id': 'e1',
+        'summary': summary,
+        'location': location,
+        'start': {'dateTime': '2024-06-01T09:30:00Z'},
+        'end': {'dateTime': '2024-06-01T10:00:00Z'}
+    })
+
+def make_task(title, priority='medium'):
+    return SimpleNamespace(title=title, due_at=datetime(2024, 6, 1, 14, 0), completed=False, priority=priority)
+
+def test_event_title_and_location_escaped_in_html():
+    html, text = render_digest(TODAY, [make_event(NASTY, location=NASTY)], [])
+
+    assert '<script>' not in html
+    assert html.count(ESCAPED) == 2
+    assert f'{NASTY} ({NASTY})' in text
+
+def test_task_title_and_priority_escaped_in_html():
+    html, text = render_digest(TODAY, [], [make_task(NASTY, priority='<b>"urgent" & now</b>')])
+
+    assert '<script>' not in html and '<b>' not in html
+    assert ESCAPED in html
+    # Priorities are title-cased before rendering
+    assert 'Priority: &lt;B&gt;&quot;Urgent&quot; &amp; Now&lt;/B&gt;' in html
+    assert NASTY in text
+    assert '(Priority: <B>"Urgent" & Now</B>)' in text
+
+def test_layout_markup_is_not_escaped():
+    html, _ = render_digest(TODAY, [make_event('Standup', location='Room 1')], [make_task('Write report', 'high')])
+
+    assert '<strong>09:30 AM</strong> - Standup' in html
+    assert '<em>📍 Room 1</em>' in html
+    assert '⏳ <strong>Write report</strong> - Due: 02:00 PM' in html
@@ -0,0 +1,81 @@
+"""
+Reminder delivery: each lead time fires once per start time, however often the
+calendar is synced or the task re-read after it fired.
+
+Run from the repository root:
+    python -m pytest backend/tests
+"""
+
+from datetime import datetime, timezone
+
+from backend.services.event_cache import CalendarState
+from backend.services.reminder_scheduler import ReminderScheduler, to_minute
+
+START = 1700000040  # on the minute
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def make_calendar(start):
+    state = CalendarState(user_id=1, calendar_id='primary')
+    state.events = {'e1': {
+        'id': 'e1',
+        'summary': 'Standup',
+        'start': {'dateTime': datetime.fromtimestamp(start, timezone.utc).isoformat()},
+        'end': {'dateTime': datetime.fromtimestamp(start + 1800, timezone.utc).isoformat()}
+    }}
+    state.window_end = datetime.utcfromtimestamp(start + 86400)
+    return state
+
+def fired_leads(due):
+    return [lead for _, lead, _ in due]
+
+def test_calendar_resync_after_reminder_does_not_repeat_it():
+    clock = Clock(START - 20 * 60)
+    scheduler = ReminderScheduler(handler=lambda user_id, item: None, lead_minutes=[15, 5], clock=clock)
+    state = make_calendar(START)
+
+    leads = []
+    # One sync per minute while a stream is open
+    while clock.now <= START:
+        scheduler.calendar_synced(state)
+        leads += fired_leads(scheduler.advance(to_minute(clock.now)))
+        clock.now += 60
+
+    assert leads == [15, 5]
+
+def test_task_reread_after_reminder_does_not_repeat_it():
+    clock = Clock(START - 10 * 60)
+    scheduler = ReminderScheduler(handler=lambda user_id, item: None, lead_minutes=[15, 5], clock=clock)
+    item = {'id': 7, 'type': 'task', 'title': 'Report'}
+
+    leads = []
+    while clock.now <= START:
+        # A poll inside the safety window reads the same row again
+        scheduler.schedule_item(1, item, START)
+        leads += fired_leads(scheduler.advance(to_minute(clock.now)))
+        clock.now += 60
+
+    assert leads == [15, 5]
+
+def test_moved_item_gets_reminders_for_its_new_time():
+    clock = Clock(START - 6 * 60)
+    scheduler = ReminderScheduler(handler=lambda user_id, item: None, lead_minutes=[15, 5], clock=clock)
+    item = {'id': 7, 'type': 'task', 'title': 'Report'}
+
+    scheduler.schedule_item(1, item, START, catch_up=False)
+    clock.now += 60
+    assert fired_leads(scheduler.advance(to_minute(clock.now))) == [5]
+
+    scheduler.schedule_item(1, item, START + 3600)
+    clock.now = START + 3600 - 15 * 60
+    assert fired_leads(scheduler.advance(to_minute(clock.now))) == [15]
+    assert scheduler._fired == {(1, 'task', 7): (to_minute(START + 3600), {15})}
+
+    clock.now = START + 3600 + 60
+    assert fired_leads(scheduler.advance(to_minute(clock.now))) == [5]
+    assert scheduler._fired == {} and scheduler._fired_until == {}
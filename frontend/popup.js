@@ -1,4 +1,7 @@
 // Chrome Extension Popup Logic
+// Backend that scans Gmail and stores candidate emails (see manifest host_permissions)
+const AGENDIFY_API_URL = 'http://localhost:5000';
+
 class AgendifyPopup {
   constructor() {
     this.isAuthenticated = false;
@@ -746,29 +749,19 @@ class AgendifyPopup {
         return;
       }
 
-      // Use real Gmail API to scan actual emails
-      const emailService = new (await import('./src/services/emailService.js')).default(this.accessToken);
-      
-      // Get emails from the last week from monitored addresses
-      const monitoredEmails = this.monitoredEmails;
-      console.log('Scanning emails from addresses:', monitoredEmails);
-      console.log('Monitored emails array:', this.monitoredEmails);
-      console.log('Monitored emails length:', this.monitoredEmails.length);
-      
-      // Get emails from the last 7 days
-      const oneWeekAgo = new Date();
-      oneWeekAgo.setDate(oneWeekAgo.getDate() - 7);
-      
-      console.log('Searching emails from:', oneWeekAgo.toISOString(), 'to', new Date().toISOString());
-      
-      const emailIds = await emailService.getEmailsFromDateRange(monitoredEmails, oneWeekAgo, new Date());
-      console.log('Found emails:', emailIds.length);
+      // The backend keeps the monitored senders and scans Gmail incrementally
+      // (one Gmail call when nothing arrived); the popup only reads the results
+      console.log('Scanning emails from addresses:', this.monitoredEmails);
+      await this.backendRequest('/api/email/settings', { method: 'PUT', body: { senders: this.monitoredEmails } });
+      await this.backendRequest('/api/email/scan', { method: 'POST' });
+      const { candidates } = await this.backendRequest('/api/email/candidates');
+      console.log('Found emails:', candidates.length);
       
-      if (emailIds.length === 0) {
+      if (candidates.length === 0) {
         if (eventsListEl) {
           eventsListEl.innerHTML = `
             <div class="no-events">
-              <p>No emails found from monitored addresses in the last 7 days.</p>
+              <p>No emails found from monitored addresses.</p>
               <p>Make sure the email addresses are correct and you have recent emails.</p>
             </div>
           `;
@@ -779,42 +772,24 @@ class AgendifyPopup {
       
       const events = [];
       
-      // Process each real email
-      for (const emailId of emailIds) {
-        try {
-          const emailContent = await emailService.getEmailContent(emailId.id);
+      // Process each stored email
+      for (const emailContent of candidates) {
+        if (emailContent.text) {
+          // Extract event using pattern matching
+          const extractedEvent = this.extractEventWithPatterns(emailContent);
           
-          console.log('📧 Processing email:', {
-            subject: emailContent?.subject,
-            from: emailContent?.from,
-            hasText: !!emailContent?.text,
-            textLength: emailContent?.text?.length,
-            textPreview: emailContent?.text?.substring(0, 300)
-          });
+          console.log('🔍 Extraction result:', extractedEvent);
           
-          if (emailContent && emailContent.text) {
-            // Extract event using pattern matching
-            const extractedEvent = this.extractEventWithPatterns(emailContent);
-            
-            console.log('🔍 Extraction result:', extractedEvent);
-            
-            if (extractedEvent && extractedEvent.event_name) {
-              events.push({
-                ...extractedEvent,
-                emailId: emailId.id,
-                emailSubject: emailContent.subject,
-                emailFrom: emailContent.from,
-                emailDate: emailContent.date,
-                processed: false
-              });
-              console.log('✅ Event added to list');
-            } else {
-              console.log('❌ No event extracted from this email');
-            }
+          if (extractedEvent && extractedEvent.event_name) {
+            events.push({
+              ...extractedEvent,
+              emailId: emailContent.message_id,
+              emailSubject: emailContent.subject,
+              emailFrom: emailContent.from,
+              emailDate: emailContent.date,
+              processed: false
+            });
           }
-        } catch (emailError) {
-          console.error('Failed to process email:', emailId.id, emailError);
-          // Continue with other emails
         }
       }
 
@@ -855,10 +830,25 @@ class AgendifyPopup {
     }
   }
 
+  // Call the Agendify backend with the session cookie set at sign-in
+  async backendRequest(path, { method = 'GET', body } = {}) {
+    const response = await fetch(`${AGENDIFY_API_URL}${path}`, {
+      method,
+      credentials: 'include',
+      headers: body ? { 'Content-Type': 'application/json' } : {},
+      body: body ? JSON.stringify(body) : undefined
+    });
+    const data = await response.json().catch(() => ({}));
+    if (!response.ok) {
+      throw new Error(data.error || `Backend error: ${response.status}`);
+    }
+    return data;
+  }
+
   // Pattern matching event extraction (fallback when AI is not available)
   extractEventWithPatterns(emailContent) {
     const text = emailContent.text.toLowerCase();
-    const subject = emailContent.subject.toLowerCase();
+    const subject = (emailContent.subject || '').toLowerCase();
     
     console.log('🔍 Extracting event from:', { 
       subject, 
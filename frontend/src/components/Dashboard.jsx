@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react'
 import { useAuth } from '../contexts/AuthContext'
-import { calendarApi, tasksApi } from '../services/api'
+import { agendaApi, tasksApi } from '../services/api'
 import { format, parseISO } from 'date-fns'
 import { Calendar, Clock, CheckSquare, Plus, LogOut, Bell, Settings } from 'lucide-react'
 import TaskForm from './TaskForm'
@@ -21,13 +21,12 @@ function Dashboard() {
   const loadData = async () => {
     try {
       setLoading(true)
-      const [eventsData, tasksData] = await Promise.all([
-        calendarApi.getTodayEvents(),
-        tasksApi.getTodayTasks()
-      ])
+      const agenda = await agendaApi.getAgenda()
       
-      if (eventsData.success) setEvents(eventsData.events)
-      if (tasksData.success) setTasks(tasksData.tasks)
+      if (agenda.success) {
+        setEvents(agenda.items.filter(item => item.type === 'calendar_event'))
+        setTasks(agenda.items.filter(item => item.type === 'task'))
+      }
     } catch (error) {
       console.error('Failed to load data:', error)
     } finally {
@@ -1,7 +1,6 @@
 import React, { useState, useEffect } from 'react';
-import EmailService from '../services/emailService';
-import AIService from '../services/aiService';
 import CalendarService from '../services/calendarService';
+import { emailApi } from '../services/api';
 
 const EventApproval = ({ accessToken, onEventAdded }) => {
   const [monitoredEmails, setMonitoredEmails] = useState(['pennwitg@gmail.com']);
@@ -10,8 +9,6 @@ const EventApproval = ({ accessToken, onEventAdded }) => {
   const [error, setError] = useState(null);
 
   // Initialize services
-  const emailService = new EmailService(accessToken);
-  const aiService = new AIService(process.env.REACT_APP_OPENAI_API_KEY);
   const calendarService = new CalendarService(accessToken);
 
   // Load and process emails
@@ -27,31 +24,23 @@ const EventApproval = ({ accessToken, onEventAdded }) => {
     setError(null);
 
     try {
-      // Get recent emails from monitored addresses
-      const emailIds = await emailService.getRecentEmails(monitoredEmails);
+      // The backend keeps the monitored senders and scans Gmail incrementally
+      // (one Gmail call when nothing arrived), then extracts events with
+      // results cached by email content, so seen mail costs no model call
+      await emailApi.updateSettings({ senders: monitoredEmails });
+      await emailApi.scan();
+      const { extractions } = await emailApi.extract();
       
-      const events = [];
-      
-      // Process each email
-      for (const emailId of emailIds) {
-        const emailContent = await emailService.getEmailContent(emailId.id);
-        
-        if (emailContent && emailContent.text) {
-          // Extract event using AI
-          const extractedEvent = await aiService.extractEventFromEmail(emailContent);
-          
-          if (extractedEvent && extractedEvent.event_name) {
-            events.push({
-              ...extractedEvent,
-              emailId: emailId.id,
-              emailSubject: emailContent.subject,
-              emailFrom: emailContent.from,
-              emailDate: emailContent.date,
-              processed: false
-            });
-          }
-        }
-      }
+      const events = extractions
+        .filter(extraction => extraction.event && extraction.event.event_name)
+        .map(extraction => ({
+          ...extraction.event,
+          emailId: extraction.message_id,
+          emailSubject: extraction.subject,
+          emailFrom: extraction.from,
+          emailDate: extraction.date,
+          processed: false
+        }));
 
       setExtractedEvents(events);
     } catch (error) {
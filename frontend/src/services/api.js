@@ -60,6 +60,11 @@ export const tasksApi = {
   toggleTask: (id) => api.post(`/api/tasks/${id}/toggle`).then(res => res.data),
 }
 
+// Agenda API (events and tasks merged server-side, revalidated with ETags)
+export const agendaApi = {
+  getAgenda: (params) => api.get('/api/agenda', { params }).then(res => res.data),
+}
+
 // Notifications API
 export const notificationsApi = {
   getUpcoming: () => api.get('/api/notifications/upcoming').then(res => res.data),
@@ -67,4 +72,13 @@ export const notificationsApi = {
   testEmail: () => api.post('/api/notifications/test-email').then(res => res.data),
 }
 
+// Email API (Gmail scanned server-side; the popup reads stored candidates)
+export const emailApi = {
+  getSettings: () => api.get('/api/email/settings').then(res => res.data),
+  updateSettings: (data) => api.put('/api/email/settings', data).then(res => res.data),
+  scan: () => api.post('/api/email/scan').then(res => res.data),
+  getCandidates: (params) => api.get('/api/email/candidates', { params }).then(res => res.data),
+  extract: (data) => api.post('/api/email/extract', data).then(res => res.data),
+}
+
 export default api 
\ No newline at end of file